@@ -0,0 +1,110 @@
+import gzip
+import os
+import queue
+import tarfile
+import threading
+import zipfile
+
+# Streaming ZIP / tar.gz archives of selected log files.
+# The archive is written by a worker thread into a small bounded queue and sent while
+# it is produced, so neither the files nor the archive are ever fully buffered in memory.
+
+ARCHIVE_FORMATS = {
+    'zip': ('application/zip', '.zip'),
+    'tar.gz': ('application/gzip', '.tar.gz'),
+}
+QUEUE_CHUNKS = 16  # at most ~16 pending writes in memory
+COMPRESS_LEVEL = 6
+# Files that are already compressed are stored as-is in ZIPs (recompressing costs CPU for nothing)
+COMPRESSED_SUFFIXES = ('.gz', '.zip', '.zst', '.bz2', '.xz', '.7z', '.tgz')
+
+_DONE = object()
+
+
+class _StreamCancelled(Exception):
+    pass
+
+
+class _QueueSink:
+    """
+    Write-only file object that hands written bytes to the consuming generator
+    """
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self.cancelled = threading.Event()
+
+    def write(self, data):
+        if self.cancelled.is_set():
+            raise _StreamCancelled()
+        if data:
+            self.queue.put(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def _existing_files(folder_path, names):
+    for name in names:
+        file_path = os.path.join(folder_path, name)
+        if os.path.basename(name) == name and os.path.isfile(file_path):
+            yield name, file_path
+
+
+def write_zip(target, folder_path, names):
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as zip_file:
+        for name, file_path in _existing_files(folder_path, names):
+            compress_type = zipfile.ZIP_STORED if name.lower().endswith(COMPRESSED_SUFFIXES) else zipfile.ZIP_DEFLATED
+            zip_file.write(file_path, name, compress_type=compress_type)
+
+
+def write_tar_gz(target, folder_path, names):
+    with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=COMPRESS_LEVEL) as gzip_file:
+        with tarfile.open(fileobj=gzip_file, mode="w|") as tar_file:
+            for name, file_path in _existing_files(folder_path, names):
+                tar_file.add(file_path, arcname=name, recursive=False)
+
+
+def iter_archive(folder_path, names, archive_format='zip'):
+    """
+    Yield an archive ('zip' or 'tar.gz') of the given files chunk by chunk
+    """
+    writer = write_tar_gz if archive_format == 'tar.gz' else write_zip
+    sink = _QueueSink()
+    errors = []
+
+    def produce():
+        try:
+            writer(sink, folder_path, names)
+        except _StreamCancelled:
+            pass
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Always unblock the consumer, unless it already went away
+            while not sink.cancelled.is_set():
+                try:
+                    sink.queue.put(_DONE, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+
+    worker = threading.Thread(target=produce, name="archive-writer", daemon=True)
+    worker.start()
+    try:
+        while True:
+            chunk = sink.queue.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        # Consumer stopped (finished or client disconnected): stop the writer
+        sink.cancelled.set()
+        while True:
+            try:
+                sink.queue.get_nowait()
+            except queue.Empty:
+                break
+        worker.join(timeout=5)
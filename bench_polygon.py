@@ -0,0 +1,55 @@
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from polygon_engine import lte_polygon_commands, rnc_polygon_csv, rnc_polygon_table
+
+# Benchmark of the polygon engine on a synthetic sheet with 15 DMS corners per cell:
+# LTE eutranCellPolygon commands (generateLTE / convert_ciq_polygon) and the RNC corner
+# table + CSV (polygon_app).
+#   python bench_polygon.py --rows 1000 10000 50000
+
+
+def synthetic_sheet(rows, corners=15, seed=1):
+    rng = random.Random(seed)
+
+    def dms(max_degrees):
+        return f"{rng.randint(0, max_degrees - 1)}°{rng.randint(0, 59):02d}'{rng.uniform(0, 59.99):.2f}\""
+
+    data = {'eNBName': [f"ENB{i // 3}" for i in range(rows)],
+            'EutranCellFDDId': [f"CELL{i}" for i in range(rows)],
+            'Sector': [f"CELL{i}" for i in range(rows)]}
+    for k in range(1, corners + 1):
+        # 'Corner N' (latitude) followed by its unnamed longitude column, as in the CIQ
+        data[f'Corner {k}'] = [dms(90) for _ in range(rows)]
+        data[f'Unnamed: {2 * k + 2}'] = [dms(180) for _ in range(rows)]
+    return pd.DataFrame(data)
+
+
+def bench(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Polygon engine benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'lte commands':>14} {'rnc table+csv':>14}")
+    for rows in args.rows:
+        sheet = synthetic_sheet(rows)
+        lte = bench(lambda: lte_polygon_commands(sheet), args.repeat)
+        rnc = bench(lambda: rnc_polygon_csv(rnc_polygon_table(sheet)), args.repeat)
+        print(f"{rows:>8} {lte * 1000:>11.1f} ms {rnc * 1000:>11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
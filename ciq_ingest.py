@@ -0,0 +1,86 @@
+import functools
+import hashlib
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+
+from ciq_repository import REPO_DIR, add_ciq_file
+
+# Upload ingestion for the CIQ repository.
+# The upload is streamed to disk in chunks (hashed on the way), then the sheet names are
+# read from the workbook manifest (xl/workbook.xml inside the xlsx ZIP) without parsing any
+# sheet, so a CIQ without the sheets a page needs is rejected within milliseconds. A valid
+# upload is stored right away and parsed on a background thread (ciq_repository) while the
+# user goes on with the page.
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+WORKBOOK_PART = "xl/workbook.xml"
+INCOMING_DIR = os.path.join(REPO_DIR, "incoming")  # same file system as the blobs
+
+
+def workbook_sheets(path):
+    """
+    Sheet names of an xlsx workbook, in workbook order, from its manifest only
+    """
+    try:
+        with zipfile.ZipFile(path) as workbook, workbook.open(WORKBOOK_PART) as manifest:
+            return tuple(element.get('name') for _, element in ET.iterparse(manifest)
+                         if element.tag.rsplit('}', 1)[-1] == 'sheet')
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        raise ValueError("not an Excel workbook (.xlsx)")
+
+
+@functools.lru_cache(maxsize=64)
+def stored_sheets(path):
+    """
+    workbook_sheets of a repository blob (content-addressed, so it never changes)
+    """
+    return workbook_sheets(path)
+
+
+def missing_sheets(sheet_names, required_sheets):
+    """
+    Sheets missing from a workbook. required_sheets lists alternatives (lists of sheet names),
+    any one of which is enough; the alternative closest to complete is reported.
+    """
+    if not required_sheets:
+        return []
+    missing = [[sheet for sheet in alternative if sheet not in sheet_names] for alternative in required_sheets]
+    return min(missing, key=len)
+
+
+def stream_upload(uploaded_file):
+    """
+    Write an uploaded file to INCOMING_DIR chunk by chunk. Returns (path, sha256).
+    """
+    os.makedirs(INCOMING_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    fd, path = tempfile.mkstemp(suffix=".xlsx", dir=INCOMING_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: uploaded_file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+
+def ingest_upload(uploaded_file, required_sheets=None):
+    """
+    Stream, check and store an uploaded CIQ; its parse runs in the background.
+    Returns the repository version entry. Raises ValueError (nothing is stored) when the
+    file is not a workbook or lacks the required sheets.
+    """
+    path, digest = stream_upload(uploaded_file)
+    try:
+        missing = missing_sheets(workbook_sheets(path), required_sheets)
+        if missing:
+            raise ValueError(f"missing sheet(s): {', '.join(missing)}")
+    except ValueError:
+        os.remove(path)
+        raise
+    return add_ciq_file(path, digest, uploaded_file.name)
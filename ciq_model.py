@@ -0,0 +1,202 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Typed CIQ model.
+# Sheets are read once, key columns are converted to compact dtypes (categoricals for
+# names, narrow nullable integers for numeric parameters) and all typed columns are
+# validated in one vectorized pass so bad rows are reported before anything is generated.
+
+# dtype per column for each CIQ sheet; columns missing from a sheet are skipped
+CIQ_DTYPES = {
+    'eUtran Parameters': {
+        'eNBName': 'category',
+        'EutranCellFDDId': 'category',
+        'eNBId': 'Int32',
+        'earfcnDl': 'Int32',
+        'earfcnUl': 'Int32',
+        'configuredMaxTxPower': 'Int32',
+        'cellRange': 'Int16',
+        'dlChannelBandwidth': 'Int32',
+        'qRxLevMin': 'Int16',
+        'latitude': 'float64',
+        'longitude': 'float64',
+    },
+    'PCI': {
+        'EutranCellFDDId': 'category',
+        'PCI': 'Int16',
+        'rachRootSequence': 'Int16',
+        'cellId': 'Int16',
+        'PhysicalLayerCellIdGroup': 'Int16',
+        'physicalLayerSubCellId': 'Int8',
+    },
+    'eNB Info': {
+        'eNodeB Name': 'category',
+        'tac': 'Int32',
+    },
+    'Cluster': {
+        'eNodeB Name': 'category',
+    },
+    'eUtranCellPolygon': {
+        'eNBName': 'category',
+        'EutranCellFDDId': 'category',
+    },
+    'eUtranCellCoverage': {
+        'EutranCellFDDId': 'category',
+        'posCellBearing': 'Int16',
+        'posCellOpeningAngle': 'Int16',
+        'posCellRadius': 'Int32',
+    },
+}
+
+ISSUE_COLUMNS = ['sheet', 'row', 'column', 'value', 'problem']
+
+
+@dataclass(slots=True)
+class CellRecord:
+    """
+    One LTE cell of the cell table (build_cell_table) with plain Python values; None where
+    the CIQ has no value (e.g. the PCI fields of a cell without a 'PCI' row)
+    """
+    enb_name: str
+    cell_name: str
+    sector_id: int
+    configured_max_tx_power: int
+    rach_root_sequence: int
+    cell_id: int
+    cell_range: int
+    earfcn_dl: int
+    earfcn_ul: int
+    dl_channel_bandwidth: int
+    q_rx_lev_min: int
+    physical_layer_cell_id_group: int
+    physical_layer_sub_cell_id: int
+    latitude: float
+    longitude: float
+    tac: int
+
+
+# Cell table column -> CellRecord field, in field order
+CELL_RECORD_COLUMNS = {
+    'eNBName': 'enb_name',
+    'EutranCellFDDId': 'cell_name',
+    'sectorId': 'sector_id',
+    'configuredMaxTxPower': 'configured_max_tx_power',
+    'rachRootSequence': 'rach_root_sequence',
+    'cellId': 'cell_id',
+    'cellRange': 'cell_range',
+    'earfcnDl': 'earfcn_dl',
+    'earfcnUl': 'earfcn_ul',
+    'dlChannelBandwidth': 'dl_channel_bandwidth',
+    'qRxLevMin': 'q_rx_lev_min',
+    'PhysicalLayerCellIdGroup': 'physical_layer_cell_id_group',
+    'physicalLayerSubCellId': 'physical_layer_sub_cell_id',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'tac': 'tac',
+}
+
+
+def _issues(sheet, df, mask, column, problem):
+    """
+    Issue rows for the rows selected by mask (row = Excel row number, header is row 1)
+    """
+    bad = df.loc[mask, column]
+    return pd.DataFrame({
+        'sheet': sheet,
+        'row': bad.index + 2,
+        'column': column,
+        'value': bad.astype(str).values,
+        'problem': problem,
+    })
+
+
+def apply_dtypes(sheet, df):
+    """
+    Convert the typed columns of one sheet. Columns with values that do not fit the dtype
+    are left unconverted and reported. Returns (typed DataFrame, issues DataFrame).
+    """
+    issues = []
+    df = df.copy()
+    for column, dtype in CIQ_DTYPES.get(sheet, {}).items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if dtype == 'category':
+            df[column] = values.astype('category')
+            continue
+
+        numeric = pd.to_numeric(values, errors='coerce')
+        checks = [(values.notna() & numeric.isna(), f"not a number (expected {dtype})")]
+        if dtype.startswith('Int'):
+            limits = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+            checks.append((numeric.notna() & (numeric != numeric.round()), "not an integer"))
+            checks.append((numeric.notna() & ((numeric < limits.min) | (numeric > limits.max)),
+                           f"out of range for {dtype}"))
+        column_issues = [_issues(sheet, df, mask, column, problem) for mask, problem in checks if mask.any()]
+        if column_issues:
+            issues.extend(column_issues)
+            continue  # keep original values so generation still behaves as before
+        df[column] = numeric.astype(dtype)
+    return df, pd.concat(issues, ignore_index=True) if issues else pd.DataFrame(columns=ISSUE_COLUMNS)
+
+
+def type_ciq(raw_sheets):
+    """
+    Apply the CIQ dtypes to already loaded sheets. Returns (sheets, issues).
+    """
+    sheets = {}
+    issues = []
+    for sheet, df in raw_sheets.items():
+        typed, sheet_issues = apply_dtypes(sheet, df)
+        sheets[sheet] = typed
+        if len(sheet_issues):
+            issues.append(sheet_issues)
+    return sheets, pd.concat(issues, ignore_index=True) if issues else pd.DataFrame(columns=ISSUE_COLUMNS)
+
+
+PCI_COLUMNS = ['EutranCellFDDId', 'rachRootSequence', 'cellId', 'sectorId', 'PhysicalLayerCellIdGroup', 'physicalLayerSubCellId']
+
+
+def _nullable_ints(df):
+    """
+    Plain numpy integer columns converted to Int64, so missing values stay integers
+    """
+    return df.astype({column: 'Int64' for column in df.columns if pd.api.types.is_integer_dtype(df[column])
+                      and not isinstance(df[column].dtype, pd.api.extensions.ExtensionDtype)})
+
+
+def build_cell_table(excel_data):
+    """
+    Denormalized per-cell table: 'eUtran Parameters' joined once with the 'PCI' columns and
+    the eNB's tac from 'eNB Info'. Per-eNB generation slices this instead of merging again.
+    """
+    params = excel_data['eUtran Parameters']
+    # Plain int columns (e.g. sectorId, tac) would turn float when a cell has no PCI row
+    # or its eNB no 'eNB Info' row
+    pci = _nullable_ints(excel_data['PCI'][PCI_COLUMNS])
+    cell_table = params.merge(pci, on='EutranCellFDDId', how='left')
+
+    # First 'eNB Info' row per eNB wins, like the per-eNB lookup did
+    enb_info = _nullable_ints(excel_data['eNB Info'].drop_duplicates('eNodeB Name')[['eNodeB Name', 'tac']])
+    tac = pd.Series(enb_info['tac'].array, index=enb_info['eNodeB Name'].astype(object).values)
+    cell_table['tac'] = cell_table['eNBName'].astype(object).map(tac)
+    return cell_table
+
+
+def _plain(value):
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def cell_records(cell_table, enbname=None):
+    """
+    Per-cell records (CellRecord) of the cell table, optionally of one eNB only
+    """
+    if enbname is not None:
+        cell_table = cell_table[cell_table['eNBName'] == enbname]
+    columns = [cell_table[column].to_numpy(dtype=object) if column in cell_table.columns else [None] * len(cell_table)
+               for column in CELL_RECORD_COLUMNS]
+    return [CellRecord(*map(_plain, values)) for values in zip(*columns)]
@@ -0,0 +1,64 @@
+import streamlit as st
+
+from ciq_ingest import ingest_upload, missing_sheets, stored_sheets
+from ciq_repository import is_parsing, list_ciqs
+from file_catalog import format_mtime, format_size
+from metrics import record_upload
+
+UPLOAD_NEW = "⬆️ Upload new CIQ..."
+
+
+def _version_label(entry):
+    return f"v{entry['version']} - {entry['file_name']} ({format_size(entry['size'])}, {format_mtime(entry['uploaded'])})"
+
+
+def _check_stored(entry, required_sheets):
+    """
+    The entry, or None (with an error shown) when the stored CIQ lacks the required sheets
+    """
+    try:
+        missing = missing_sheets(stored_sheets(entry['path']), required_sheets)
+    except (OSError, ValueError) as e:
+        missing = [str(e)]
+    if missing:
+        st.error(f"❌ {entry['file_name']}: missing sheet(s): {', '.join(missing)}")
+        return None
+    return entry
+
+
+def ciq_picker(page, label="Upload Excel file", required_sheets=None):
+    """
+    Select a CIQ from the shared repository or upload a new one (stored for everyone).
+    required_sheets lists alternative sheet sets the page needs (see ciq_ingest.missing_sheets);
+    a CIQ without them is rejected from its workbook manifest, before it is parsed.
+    Returns the selected repository entry (see ciq_repository.add_ciq) or None.
+    """
+    ciqs = list_ciqs()
+    choice = st.selectbox("CIQ", [UPLOAD_NEW] + list(ciqs), key=f"{page}_ciq_name")
+
+    if choice == UPLOAD_NEW:
+        uploaded_file = st.file_uploader(label, type=["xlsx"], key=f"{page}_ciq_upload")
+        if uploaded_file is None:
+            return None
+        # Ingest once per upload, not on every rerun: (file id, entry, error)
+        stored = st.session_state.get(f"{page}_ciq_stored")
+        if stored is None or stored[0] != uploaded_file.file_id:
+            record_upload(page, uploaded_file)
+            try:
+                stored = (uploaded_file.file_id, ingest_upload(uploaded_file, required_sheets), None)
+            except ValueError as e:
+                stored = (uploaded_file.file_id, None, f"{uploaded_file.name}: {e}")
+            st.session_state[f"{page}_ciq_stored"] = stored
+        if stored[1] is None:
+            st.error(f"❌ {stored[2]}")
+            return None
+        if is_parsing(stored[1]):
+            st.caption("⏳ CIQ stored, parsing in the background...")
+        return stored[1]
+
+    versions = ciqs[choice]
+    if len(versions) == 1:
+        st.caption(_version_label(versions[0]))
+        return _check_stored(versions[0], required_sheets)
+    entry = st.selectbox("Version", versions, format_func=_version_label, key=f"{page}_ciq_version_{choice}")
+    return _check_stored(entry, required_sheets)
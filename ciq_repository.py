@@ -0,0 +1,226 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from ciq_snapshot import (content_hash, headerless, load_workbook, read_header, read_manifest, read_snapshot_columns,
+                          snapshot_path)
+
+# Server-side CIQ repository.
+# A CIQ is uploaded once and stored by content hash (blobs/<sha256>.xlsx, with its compiled
+# snapshot next to it); index.json keeps the version history per CIQ name (file name
+# without extension). Every page picks a stored CIQ instead of uploading and parsing it again.
+# Streamed uploads (ciq_ingest) are parsed on a background thread; loads wait for that parse.
+
+REPO_DIR = os.environ.get("G2L_CIQ_REPO_DIR", "ciq_repository")
+INDEX_FILE = "index.json"
+PARSE_WORKERS = int(os.environ.get("G2L_CIQ_PARSE_WORKERS", "2"))
+
+_lock = threading.Lock()
+_executor = None
+_parsing = {}  # sha256 -> Future of a running snapshot parse (removed when it finishes)
+
+
+def _blob_path(digest):
+    return os.path.join(REPO_DIR, "blobs", f"{digest}.xlsx")
+
+
+@contextmanager
+def _locked_index():
+    """
+    Read-modify-write access to index.json, locked across threads and worker processes
+    """
+    os.makedirs(REPO_DIR, exist_ok=True)
+    with _lock, open(os.path.join(REPO_DIR, "index.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            index = _read_index()
+            yield index
+            tmp_path = os.path.join(REPO_DIR, f"{INDEX_FILE}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(index, f, indent=1)
+            os.replace(tmp_path, os.path.join(REPO_DIR, INDEX_FILE))
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_index():
+    try:
+        with open(os.path.join(REPO_DIR, INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'ciqs': {}}
+
+
+def _with_path(entry):
+    return dict(entry, path=_blob_path(entry['sha256']))
+
+
+def ciq_name(file_name):
+    return os.path.splitext(os.path.basename(file_name))[0]
+
+
+def _add_version(digest, name, file_name, size):
+    """
+    Index entry of the stored blob under the name (an existing version with that content is reused)
+    """
+    with _locked_index() as index:
+        versions = index['ciqs'].setdefault(name, [])
+        for entry in versions:
+            if entry['sha256'] == digest:
+                return _with_path(entry)
+        entry = {
+            'name': name,
+            'version': len(versions) + 1,
+            'sha256': digest,
+            'file_name': os.path.basename(file_name),
+            'size': size,
+            'uploaded': time.time(),
+        }
+        versions.append(entry)
+    return _with_path(entry)
+
+
+def add_ciq(data, file_name, name=None):
+    """
+    Store an uploaded CIQ (bytes) and pre-parse it into a snapshot.
+    Uploading a CIQ whose content is already stored under the name returns that version.
+    Returns the version entry (name, version, sha256, file_name, size, uploaded, path).
+    """
+    digest = content_hash(data)
+    name = name or ciq_name(file_name)
+    blob_path = _blob_path(digest)
+    if not os.path.exists(blob_path):
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, blob_path)
+    # Parse once now, so every later load is a snapshot load
+    load_workbook(blob_path, file_name, digest=digest)
+    return _add_version(digest, name, file_name, len(data))
+
+
+def add_ciq_file(path, digest, file_name, name=None):
+    """
+    Store a CIQ already written to disk under REPO_DIR (moved into the repository) and start
+    parsing it into a snapshot in the background (see is_parsing / wait_parsed).
+    Returns the version entry.
+    """
+    blob_path = _blob_path(digest)
+    size = os.path.getsize(path)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    if os.path.exists(blob_path):
+        os.remove(path)
+    else:
+        os.replace(path, blob_path)
+    entry = _add_version(digest, name or ciq_name(file_name), file_name, size)
+    parse_in_background(entry)
+    return entry
+
+
+def _parse(entry):
+    # The parsed sheets are not kept: the snapshot is what later loads read
+    load_workbook(entry['path'], entry.get('file_name', ''), digest=entry['sha256'])
+
+
+def _parse_done(digest, future):
+    with _lock:
+        if _parsing.get(digest) is future:
+            del _parsing[digest]
+
+
+def parse_in_background(entry):
+    """
+    Future of the snapshot parse of a stored CIQ (one per CIQ content while it runs)
+    """
+    global _executor
+    with _lock:
+        future = _parsing.get(entry['sha256'])
+        if future is not None:
+            return future
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="ciq-parse")
+        future = _executor.submit(_parse, entry)
+        _parsing[entry['sha256']] = future
+    # Outside the lock: the callback runs right away (and takes the lock) when the parse is already done
+    future.add_done_callback(lambda done: _parse_done(entry['sha256'], done))
+    return future
+
+
+def is_parsing(entry):
+    """
+    Whether a background parse of the CIQ is still running
+    """
+    return entry['sha256'] in _parsing
+
+
+def wait_parsed(entry):
+    """
+    Block until a background parse of the CIQ (if any) has finished; re-raises its error
+    """
+    future = _parsing.get(entry['sha256'])
+    if future is not None:
+        future.result()
+
+
+def list_ciqs():
+    """
+    Stored CIQs: {name: [version entries, newest first]}, most recently uploaded CIQ first
+    """
+    ciqs = {name: [_with_path(entry) for entry in reversed(versions)]
+            for name, versions in _read_index()['ciqs'].items() if versions}
+    return dict(sorted(ciqs.items(), key=lambda item: item[1][0]['uploaded'], reverse=True))
+
+
+def load_sheets(entry, sheets=None):
+    """
+    Sheets of a stored CIQ as pd.read_excel(sheet_name=None) returns them (from the snapshot)
+    """
+    wait_parsed(entry)
+    data, _ = load_workbook(entry['path'], entry.get('file_name', ''), sheets, digest=entry['sha256'])
+    return data
+
+
+def read_sheet(entry, sheet, header=0, skiprows=None):
+    """
+    One sheet of a stored CIQ like pd.read_excel(file, sheet, header=..., skiprows=...).
+    The snapshot is parsed with the first row as header; header=None (optionally with
+    skiprows=N) is rebuilt from it and the sheet's first row kept in the snapshot manifest.
+    """
+    sheets = load_sheets(entry, [sheet])
+    if sheet not in sheets:
+        raise ValueError(f"Worksheet named '{sheet}' not found")
+    df = sheets[sheet]
+    if header is not None:
+        if header != 0 or skiprows:
+            raise ValueError("only header=0 or header=None (with skiprows) are supported")
+        return df
+    return headerless(df, read_header(snapshot_path(entry['sha256'], entry['path']), sheet), skiprows or 0)
+
+
+def read_sheet_columns(entry, sheet, columns, rows=None):
+    """
+    Some columns of one sheet of a stored CIQ: read_sheet(entry, sheet, header=None) restricted
+    to the column positions and, optionally, the row positions (row 0 is the header row).
+    Only those columns and rows are read from the snapshot. The index is the sheet row position.
+    """
+    wait_parsed(entry)
+    path = snapshot_path(entry['sha256'], entry['path'])
+    if read_manifest(path) is None:
+        load_sheets(entry, [sheet])  # rebuilds the snapshot
+    rows = None if rows is None else np.asarray(rows, dtype=np.int64)
+    data_rows = None if rows is None else rows[rows > 0] - 1
+    snapshot = read_snapshot_columns(path, sheet, columns, data_rows)
+    if snapshot is None:
+        raise ValueError(f"Worksheet named '{sheet}' not found")
+    df, header = snapshot
+    # Column dtypes as read_sheet gives them: inferred together with the header cells
+    df = headerless(df, header).set_axis(df.columns, axis=1)
+    df.index = np.arange(len(df)) if rows is None else np.concatenate([[0], data_rows + 1])
+    return df if rows is None or (rows == 0).any() else df.iloc[1:]
@@ -0,0 +1,330 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Compiled CIQ snapshots.
+# A parsed workbook (all sheets, as pd.read_excel returns them) is written once as one
+# uncompressed Arrow IPC (Feather v2) file per sheet plus a manifest.json. Later loads of
+# the same workbook memory-map those files instead of parsing the xlsx again; the mapped
+# pages live in the OS page cache, so every worker process shares them.
+# Uploads are keyed by the SHA-256 of their content under SNAPSHOT_DIR; a workbook given
+# by path gets its snapshot next to it (<file>.snapshot/).
+# The manifest also keeps each sheet's first row as read with header=None (duplicate header
+# names are not mangled to 'X.1'), so header=None reads can be rebuilt exactly.
+
+SNAPSHOT_DIR = os.environ.get("G2L_CIQ_SNAPSHOT_DIR", "ciq_snapshots")
+SNAPSHOT_VERSION = 2
+MANIFEST = "manifest.json"
+
+
+def workbook_bytes(file):
+    """
+    Content of an uploaded file, a path or a binary file object
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    data = file.read()
+    file.seek(0)
+    return data
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def snapshot_path(digest, source_path=None):
+    if source_path is not None:
+        return f"{source_path}.snapshot"
+    return os.path.join(SNAPSHOT_DIR, digest)
+
+
+def _arrow_safe(df):
+    """
+    Positional column names and no mixed-type object columns (Arrow needs one type per column).
+    Returns (DataFrame, names of the columns that were converted to str).
+    """
+    df = df.copy()
+    df.columns = [f"c{i}" for i in range(len(df.columns))]
+    stringified = []
+    for i, column in enumerate(df.columns):
+        if df[column].dtype != object:
+            continue
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[column] = df[column].map(lambda value: None if pd.isna(value) else str(value))
+            stringified.append(i)
+    return df, stringified
+
+
+def parse_workbook(data):
+    """
+    Parse workbook bytes: (all sheets as pd.read_excel(sheet_name=None) returns them,
+    first row of each sheet as pd.read_excel(header=None) reads it)
+    """
+    sheets = pd.read_excel(io.BytesIO(data), sheet_name=None)
+    first_rows = pd.read_excel(io.BytesIO(data), sheet_name=None, header=None, nrows=1)
+    headers = {sheet: (list(df.iloc[0]) if len(df) else []) for sheet, df in first_rows.items()}
+    return sheets, headers
+
+
+def _json_cell(value):
+    if pd.isna(value):
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+
+def _header_cells(columns):
+    """
+    Header cells recovered from header=0 column names ('Unnamed: N' placeholders back to empty cells)
+    """
+    return [None if isinstance(column, str) and column.startswith("Unnamed: ") else _json_cell(column)
+            for column in columns]
+
+
+def write_snapshot(path, digest, sheets, source_name="", headers=None):
+    """
+    Write sheets (dict of DataFrames) as a snapshot directory; replaces it atomically.
+    headers are the raw first rows of the sheets (parse_workbook); without them the header
+    cells are recovered from the column names.
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    try:
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'sha256': digest,
+            'source_name': source_name,
+            'created': time.time(),
+            'sheets': [],
+        }
+        for i, (sheet, df) in enumerate(sheets.items()):
+            file_name = f"sheet_{i:03d}.arrow"
+            safe_df, stringified = _arrow_safe(df)
+            if headers is not None and sheet in headers:
+                header = [_json_cell(value) for value in headers[sheet]][:len(df.columns)]
+                header += [None] * (len(df.columns) - len(header))
+            else:
+                header = _header_cells(df.columns)
+            feather.write_feather(safe_df, os.path.join(tmp_path, file_name), compression='uncompressed')
+            manifest['sheets'].append({
+                'name': sheet,
+                'file': file_name,
+                'rows': len(df),
+                'columns': [column if isinstance(column, (int, float)) else str(column) for column in df.columns],
+                'header': header,
+                'stringified': stringified,
+            })
+        with open(os.path.join(tmp_path, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=1)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return manifest
+
+
+def _nan_nulls(df):
+    """
+    Empty cells of object columns as NaN (pd.read_excel), not the None Arrow gives back
+    """
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype == object:
+            nulls = pd.isna(values)
+            if nulls.any():
+                values = values.copy()
+                values[nulls] = np.nan
+                df[column] = values
+    return df
+
+
+def read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == SNAPSHOT_VERSION else None
+
+
+def read_snapshot(path, sheets=None):
+    """
+    Memory-map a snapshot; returns a dict of DataFrames (only the given sheets if set) or None
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        return None
+    result = {}
+    for entry in manifest['sheets']:
+        if sheets is not None and entry['name'] not in sheets:
+            continue
+        source = pa.memory_map(os.path.join(path, entry['file']), 'r')
+        table = pa.ipc.open_file(source).read_all()
+        df = _nan_nulls(table.to_pandas(split_blocks=True))
+        df.columns = entry['columns']
+        result[entry['name']] = df
+    return result
+
+
+def read_header(path, sheet):
+    """
+    First row of a snapshot sheet as pd.read_excel(header=None) reads it (NaN for empty
+    cells), or None when the snapshot or the sheet is missing
+    """
+    manifest = read_manifest(path)
+    entry = next((entry for entry in manifest['sheets'] if entry['name'] == sheet), None) if manifest else None
+    if entry is None:
+        return None
+    return [np.nan if value is None else value for value in entry['header']]
+
+
+def read_snapshot_columns(path, sheet, columns, rows=None):
+    """
+    Some columns (positions) of one snapshot sheet, optionally only some rows (positions);
+    only those columns are mapped. Returns (DataFrame with the positions as columns, their
+    header cells as read_header gives them), or None when the snapshot or the sheet is missing.
+    """
+    manifest = read_manifest(path)
+    entry = next((entry for entry in manifest['sheets'] if entry['name'] == sheet), None) if manifest else None
+    if entry is None:
+        return None
+    columns = [column for column in columns if column < len(entry['columns'])]
+    table = feather.read_table(os.path.join(path, entry['file']), columns=[f"c{i}" for i in columns],
+                               memory_map=True)
+    if rows is not None:
+        table = table.take(pa.array(rows, type=pa.int64()))
+    df = _nan_nulls(table.to_pandas(split_blocks=True))
+    df.columns = columns
+    return df, [np.nan if entry['header'][column] is None else entry['header'][column] for column in columns]
+
+
+def _excel_cells(df):
+    """
+    Float columns back to the cells pd.read_excel(header=None) yields: integral numbers as int.
+    A header=0 parse turns a column of integers float64 when any of its cells is empty.
+    """
+    df = df.copy()
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype.kind != 'f':
+            continue
+        integral = np.isfinite(values) & (values == np.round(values)) & (np.abs(values) < 2 ** 63)
+        if integral.any():
+            cells = values.astype(object)
+            cells[integral] = values[integral].astype(np.int64).astype(object)
+            df[column] = cells
+    return df
+
+
+def headerless(df, header, skiprows=0):
+    """
+    A sheet parsed with header=0 as pd.read_excel(header=None, skiprows=skiprows) reads it,
+    given its first row (read_header): positional columns, header cells as row 0.
+    """
+    positional = _excel_cells(df.set_axis(range(len(df.columns)), axis=1))
+    if skiprows:
+        # Rows 0..skiprows-1 of the sheet are dropped; row 0 is the header
+        return positional.iloc[skiprows - 1:].reset_index(drop=True).infer_objects()
+    header_row = pd.DataFrame([header], columns=positional.columns)
+    return pd.concat([header_row, positional], ignore_index=True).infer_objects()
+
+
+def check_snapshot(file_path):
+    """
+    Compare every snapshot sheet with a fresh parse of the workbook, with header=0 and
+    rebuilt as header=None (without and with skiprows=1). Returns a list of mismatch
+    messages (empty when identical).
+    """
+    data = workbook_bytes(file_path)
+    sheets, from_snapshot = load_workbook(file_path)
+    if not from_snapshot:
+        sheets, _ = load_workbook(file_path)  # just compiled: check what later loads will read
+    path = snapshot_path(content_hash(data), file_path)
+    problems = []
+    for sheet, expected in pd.read_excel(io.BytesIO(data), sheet_name=None, header=None).items():
+        for label, actual, baseline in (
+                ("header=0", sheets[sheet], pd.read_excel(io.BytesIO(data), sheet_name=sheet)),
+                ("header=None", headerless(sheets[sheet], read_header(path, sheet)), expected),
+                ("header=None, skiprows=1", headerless(sheets[sheet], None, 1),
+                 pd.read_excel(io.BytesIO(data), sheet_name=sheet, header=None, skiprows=1))):
+            try:
+                pd.testing.assert_frame_equal(actual, baseline, check_column_type=False)
+            except AssertionError as e:
+                problems.append(f"{sheet} ({label}): {e}")
+    return problems
+
+
+def compile_ciq(file, source_name=""):
+    """
+    Parse a workbook and write its snapshot (replacing an existing one). Returns the manifest.
+    """
+    data = workbook_bytes(file)
+    digest = content_hash(data)
+    source_path = file if isinstance(file, (str, os.PathLike)) else None
+    sheets, headers = parse_workbook(data)
+    return write_snapshot(snapshot_path(digest, source_path), digest, sheets, source_name or str(source_path or ""),
+                          headers)
+
+
+def load_workbook(file, source_name="", sheets=None, digest=None):
+    """
+    All sheets of a workbook (as pd.read_excel(sheet_name=None) returns them), from its
+    snapshot when there is one; otherwise the workbook is parsed and compiled.
+    digest is the known SHA-256 of the content (e.g. a content-addressed repository blob):
+    a snapshot load then neither reads nor hashes the workbook.
+    Returns (dict of DataFrames, True if the snapshot was used).
+    """
+    source_path = file if isinstance(file, (str, os.PathLike)) else None
+    data = None
+    if digest is None:
+        data = workbook_bytes(file)
+        digest = content_hash(data)
+    path = snapshot_path(digest, source_path)
+    manifest = read_manifest(path)
+    if manifest is not None and manifest['sha256'] == digest:
+        return read_snapshot(path, sheets), True
+
+    if data is None:
+        data = workbook_bytes(file)
+    parsed, headers = parse_workbook(data)
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        write_snapshot(path, digest, parsed, source_name or str(source_path or ""), headers)
+    except OSError as e:
+        print(f"Writing CIQ snapshot failed: {e}")
+    if sheets is not None:
+        parsed = {sheet: df for sheet, df in parsed.items() if sheet in sheets}
+    return parsed, False
+
+
+if __name__ == "__main__":
+    # Pre-compile CIQs: python ciq_snapshot.py CIQ_1.xlsx CIQ_2.xlsx ...
+    # Check snapshots against the workbooks: python ciq_snapshot.py --check CIQ_1.xlsx ...
+    if sys.argv[1:2] == ["--check"]:
+        failed = False
+        for file_path in sys.argv[2:]:
+            problems = check_snapshot(file_path)
+            failed = failed or bool(problems)
+            print(f"{file_path}: " + ("OK" if not problems else "\n  ".join(["MISMATCH"] + problems)))
+        sys.exit(1 if failed else 0)
+    for file_path in sys.argv[1:]:
+        started = time.time()
+        manifest = compile_ciq(file_path)
+        print(f"{file_path}: {len(manifest['sheets'])} sheets compiled in {time.time() - started:.2f} s")
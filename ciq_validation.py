@@ -0,0 +1,311 @@
+import numpy as np
+import pandas as pd
+
+from polygon_engine import detect_polygon_column_mapping
+from spatial_index import sites_outside_polygons
+
+# Up-front validation of an LTE CIQ.
+# Every check works on whole columns at once (no per-row Python loops), so a full workbook
+# is validated in a few milliseconds. The result is one report DataFrame with a row per
+# problem, shown before anything is generated instead of "Error: ..." strings ending up
+# inside the XML.
+
+REPORT_COLUMNS = ['severity', 'check', 'sheet', 'row', 'column', 'value', 'problem']
+ERROR = "error"
+WARNING = "warning"
+
+# Columns the generators read, per sheet
+REQUIRED_COLUMNS = {
+    'eUtran Parameters': ['eNBName', 'EutranCellFDDId', 'eNBId', 'earfcnDl', 'earfcnUl', 'configuredMaxTxPower',
+                          'cellRange', 'dlChannelBandwidth', 'qRxLevMin', 'latitude', 'longitude'],
+    'PCI': ['EutranCellFDDId', 'rachRootSequence', 'cellId', 'sectorId', 'PhysicalLayerCellIdGroup',
+            'physicalLayerSubCellId'],
+    'eNB Info': ['eNodeB Name', 'tac'],
+    'Cluster': ['eNodeB Name', 'FDN'],
+}
+
+# (sheet, column, min, max) value ranges
+RANGES = [
+    ('eUtran Parameters', 'eNBId', 0, 1048575),
+    ('eUtran Parameters', 'latitude', -90, 90),
+    ('eUtran Parameters', 'longitude', -180, 180),
+    ('PCI', 'PCI', 0, 503),
+    ('PCI', 'PhysicalLayerCellIdGroup', 0, 167),
+    ('PCI', 'physicalLayerSubCellId', 0, 2),
+    ('PCI', 'rachRootSequence', 0, 837),
+    ('PCI', 'cellId', 0, 255),
+    ('eNB Info', 'tac', 0, 65535),
+]
+
+# LTE FDD bands (3GPP TS 36.101): band, DL EARFCN low, DL EARFCN high, UL EARFCN low (None = DL only)
+FDD_BANDS = [
+    (1, 0, 599, 18000),
+    (2, 600, 1199, 18600),
+    (3, 1200, 1949, 19200),
+    (4, 1950, 2399, 19950),
+    (5, 2400, 2649, 20400),
+    (7, 2750, 3449, 20750),
+    (8, 3450, 3799, 21450),
+    (12, 5010, 5179, 23010),
+    (13, 5180, 5279, 23180),
+    (14, 5280, 5379, 23280),
+    (17, 5730, 5849, 23730),
+    (20, 6150, 6449, 24150),
+    (25, 8040, 8689, 26040),
+    (26, 8690, 9039, 26690),
+    (28, 9210, 9659, 27210),
+    (29, 9660, 9769, None),
+    (30, 9770, 9869, 27660),
+    (66, 66436, 67335, 131972),
+    (71, 68586, 68935, 133122),
+]
+
+# Degrees/minutes/seconds as read by polygon_engine.dms_to_decimal, e.g. 45°29'53.0"N or -73°33'1.0"W
+DMS_PATTERN = r"\s*(-?\d+)\s*°\s*(\d+)\s*'\s*([\d.]+)\s*\"?\s*([NSEW])?\s*"
+
+
+def _report(check, sheet, df, mask, column, problem, severity=ERROR):
+    """
+    Report rows for the rows of df selected by mask (row = Excel row number, header is row 1)
+    """
+    bad = df.loc[mask]
+    values = bad[column].astype(str).values if column in bad.columns else ""
+    return pd.DataFrame({
+        'severity': severity,
+        'check': check,
+        'sheet': sheet,
+        'row': bad.index + 2,
+        'column': column,
+        'value': values,
+        'problem': problem,
+    })
+
+
+def _keys(series):
+    """
+    Key column as stripped strings (NA stays NA) so '  ABC1' and 'ABC1' match
+    """
+    return series.astype("string").str.strip()
+
+
+def _numeric(series):
+    return pd.to_numeric(series.astype(object), errors='coerce')
+
+
+def check_structure(excel_data):
+    """
+    Missing sheets and missing columns
+    """
+    reports = []
+    for sheet, columns in REQUIRED_COLUMNS.items():
+        if sheet not in excel_data:
+            reports.append(pd.DataFrame([{'severity': ERROR, 'check': "structure", 'sheet': sheet, 'row': None,
+                                          'column': "", 'value': "", 'problem': "sheet is missing"}]))
+            continue
+        missing = [column for column in columns if column not in excel_data[sheet].columns]
+        if missing:
+            reports.append(pd.DataFrame({'severity': ERROR, 'check': "structure", 'sheet': sheet, 'row': None,
+                                         'column': missing, 'value': "", 'problem': "column is missing"}))
+    return reports
+
+
+def check_keys(excel_data):
+    """
+    Cross-sheet key integrity: every cell has a PCI row, every eNB is in 'eNB Info' and 'Cluster',
+    polygon/coverage rows refer to known cells
+    """
+    reports = []
+    params = excel_data.get('eUtran Parameters')
+    if params is None or 'EutranCellFDDId' not in params.columns:
+        return reports
+    cells = _keys(params['EutranCellFDDId'])
+
+    pci = excel_data.get('PCI')
+    if pci is not None and 'EutranCellFDDId' in pci.columns:
+        mask = cells.notna() & ~cells.isin(_keys(pci['EutranCellFDDId']).dropna())
+        reports.append(_report("keys", 'eUtran Parameters', params, mask, 'EutranCellFDDId', "cell has no row in 'PCI'"))
+        pci_cells = _keys(pci['EutranCellFDDId'])
+        mask = pci_cells.notna() & ~pci_cells.isin(cells.dropna())
+        reports.append(_report("keys", 'PCI', pci, mask, 'EutranCellFDDId',
+                               "cell not in 'eUtran Parameters'", WARNING))
+
+    if 'eNBName' in params.columns:
+        enbs = _keys(params['eNBName'])
+        first_row = ~enbs.duplicated()  # report each missing eNB once
+        for sheet in ('eNB Info', 'Cluster'):
+            other = excel_data.get(sheet)
+            if other is None or 'eNodeB Name' not in other.columns:
+                continue
+            mask = enbs.notna() & first_row & ~enbs.isin(_keys(other['eNodeB Name']).dropna())
+            reports.append(_report("keys", 'eUtran Parameters', params, mask, 'eNBName', f"eNB not in '{sheet}'"))
+
+    for sheet in ('eUtranCellPolygon', 'eUtranCellCoverage'):
+        other = excel_data.get(sheet)
+        if other is None or 'EutranCellFDDId' not in other.columns:
+            continue
+        other_cells = _keys(other['EutranCellFDDId'])
+        mask = other_cells.notna() & ~other_cells.isin(cells.dropna())
+        reports.append(_report("keys", sheet, other, mask, 'EutranCellFDDId',
+                               "cell not in 'eUtran Parameters'", WARNING))
+    return reports
+
+
+def check_duplicates(excel_data):
+    """
+    Duplicate keys within a sheet
+    """
+    reports = []
+    for sheet, column in (('eUtran Parameters', 'EutranCellFDDId'), ('PCI', 'EutranCellFDDId'),
+                          ('eNB Info', 'eNodeB Name'), ('Cluster', 'eNodeB Name')):
+        df = excel_data.get(sheet)
+        if df is None or column not in df.columns:
+            continue
+        keys = _keys(df[column])
+        mask = keys.notna() & keys.duplicated(keep=False)
+        reports.append(_report("duplicates", sheet, df, mask, column, f"duplicate {column}"))
+
+    # The same eNBId used by two different eNBs
+    params = excel_data.get('eUtran Parameters')
+    if params is not None and {'eNBName', 'eNBId'} <= set(params.columns):
+        pairs = pd.DataFrame({'enb': _keys(params['eNBName']), 'id': _numeric(params['eNBId'])}).dropna()
+        names_per_id = pairs.drop_duplicates().groupby('id')['enb'].transform('size')
+        mask = pd.Series(False, index=params.index)
+        mask.loc[names_per_id.index] = names_per_id.gt(1) & ~pairs.loc[names_per_id.index].duplicated()
+        reports.append(_report("duplicates", 'eUtran Parameters', params, mask, 'eNBId', "eNBId used by more than one eNB"))
+    return reports
+
+
+def check_ranges(excel_data):
+    """
+    Value ranges, the PCI computed from group/subcell, and earfcn bands
+    """
+    reports = []
+    for sheet, column, low, high in RANGES:
+        df = excel_data.get(sheet)
+        if df is None or column not in df.columns:
+            continue
+        values = _numeric(df[column])
+        mask = values.notna() & ((values < low) | (values > high))
+        reports.append(_report("ranges", sheet, df, mask, column, f"outside {low}..{high}"))
+
+    pci = excel_data.get('PCI')
+    if pci is not None and {'PhysicalLayerCellIdGroup', 'physicalLayerSubCellId'} <= set(pci.columns):
+        computed = 3 * _numeric(pci['PhysicalLayerCellIdGroup']) + _numeric(pci['physicalLayerSubCellId'])
+        mask = computed.notna() & ((computed < 0) | (computed > 503))
+        reports.append(_report("ranges", 'PCI', pci, mask, 'PhysicalLayerCellIdGroup',
+                               "PCI (3 x group + subcell) outside 0..503"))
+        if 'PCI' in pci.columns:
+            given = _numeric(pci['PCI'])
+            mask = computed.notna() & given.notna() & (computed != given)
+            reports.append(_report("ranges", 'PCI', pci, mask, 'PCI', "PCI does not match 3 x group + subcell"))
+
+    params = excel_data.get('eUtran Parameters')
+    if params is not None and 'earfcnDl' in params.columns:
+        reports.extend(check_earfcn(params))
+    return reports
+
+
+def check_earfcn(params):
+    """
+    earfcnDl must be in an FDD band and earfcnUl must be its paired uplink channel
+    """
+    bands = np.array([band for band, _, _, _ in FDD_BANDS])
+    dl_low = np.array([low for _, low, _, _ in FDD_BANDS])
+    dl_high = np.array([high for _, _, high, _ in FDD_BANDS])
+    ul_low = np.array([np.nan if ul is None else ul for _, _, _, ul in FDD_BANDS])
+
+    dl = _numeric(params['earfcnDl']).to_numpy(dtype=float, na_value=np.nan)
+    band_index = np.clip(np.searchsorted(dl_low, dl, side='right') - 1, 0, len(bands) - 1)
+    in_band = ~np.isnan(dl) & (dl >= dl_low[band_index]) & (dl <= dl_high[band_index])
+    reports = [_report("ranges", 'eUtran Parameters', params,
+                       pd.Series(~np.isnan(dl) & ~in_band, index=params.index), 'earfcnDl', "earfcnDl not in an LTE FDD band")]
+
+    if 'earfcnUl' in params.columns:
+        ul = _numeric(params['earfcnUl']).to_numpy(dtype=float, na_value=np.nan)
+        expected = ul_low[band_index] + (dl - dl_low[band_index])
+        checked = in_band & ~np.isnan(ul) & ~np.isnan(expected)
+        mask = pd.Series(checked & (ul != expected), index=params.index)
+        report = _report("ranges", 'eUtran Parameters', params, mask, 'earfcnUl', "")
+        report['problem'] = [f"band {bands[i]}: expected earfcnUl {int(e)}"
+                             for i, e in zip(band_index[mask.to_numpy()], expected[mask.to_numpy()])]
+        reports.append(report)
+    return reports
+
+
+def check_dms(excel_data):
+    """
+    Polygon corner coordinates must be DMS (or decimal) and within valid degree ranges
+    """
+    reports = []
+    for sheet in ('eUtranCellPolygon', 'PolygonData'):
+        df = excel_data.get(sheet)
+        if df is None:
+            continue
+        for lat_column, lon_column in detect_polygon_column_mapping(df):
+            for column, max_degrees in ((lat_column, 90), (lon_column, 180)):
+                text = df[column].astype("string").str.strip()
+                text = text.mask(text == "")
+                parts = text.str.fullmatch(DMS_PATTERN)
+                decimal = pd.to_numeric(text, errors='coerce')
+                mask = text.notna() & ~parts.fillna(False) & decimal.isna()
+                reports.append(_report("dms", sheet, df, mask, column, "not a DMS (45°29'53.0\"N) or decimal value"))
+
+                dms = text.str.extract(DMS_PATTERN)
+                degrees = pd.to_numeric(dms[0], errors='coerce').abs()
+                minutes = pd.to_numeric(dms[1], errors='coerce')
+                seconds = pd.to_numeric(dms[2], errors='coerce')
+                value = degrees + minutes / 60 + seconds / 3600
+                mask = degrees.notna() & ((minutes >= 60) | (seconds >= 60) | (value > max_degrees))
+                mask |= decimal.notna() & (decimal.abs() > max_degrees)
+                reports.append(_report("dms", sheet, df, mask, column, f"coordinate outside ±{max_degrees}° or minutes/seconds ≥ 60"))
+    return reports
+
+
+def check_sites(excel_data):
+    """
+    The site of a cell (eUtran Parameters latitude/longitude) should lie inside its own polygon
+    """
+    if any(column not in excel_data.get('eUtran Parameters', pd.DataFrame()).columns
+           for column in ('EutranCellFDDId', 'eNBName', 'latitude', 'longitude')):
+        return []
+    outside = sites_outside_polygons(excel_data)
+    if outside is None or not len(outside):
+        return []
+    params = excel_data['eUtran Parameters']
+    report = _report("sites", 'eUtran Parameters', params, params.index.isin(outside.index), 'EutranCellFDDId',
+                     "site is outside the cell's eUtranCellPolygon", severity=WARNING)
+    distance = outside['distance_m'].reindex(report['row'].to_numpy() - 2).to_numpy()
+    report['problem'] = [f"site is outside the cell's eUtranCellPolygon ({value / 1000:.1f} km away)"
+                         for value in distance]
+    return [report]
+
+
+def validate_ciq(excel_data, type_issues=None):
+    """
+    Validate a loaded CIQ (dict of sheet DataFrames). type_issues are the dtype issues
+    from ciq_model.type_ciq and are included in the report. Returns the report DataFrame.
+    """
+    reports = []
+    if type_issues is not None and len(type_issues):
+        reports.append(type_issues.assign(severity=ERROR, check="types"))
+    reports += check_structure(excel_data)
+    reports += check_keys(excel_data)
+    reports += check_duplicates(excel_data)
+    reports += check_ranges(excel_data)
+    reports += check_dms(excel_data)
+    reports += check_sites(excel_data)
+    reports = [report for report in reports if len(report)]
+    if not reports:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    report = pd.concat(reports, ignore_index=True)[REPORT_COLUMNS]
+    report['row'] = report['row'].astype('Int64')
+    return report.sort_values(['severity', 'sheet', 'row'], kind='stable').reset_index(drop=True)
+
+
+def summarize_report(report):
+    """
+    Number of problems per severity and check
+    """
+    if not len(report):
+        return pd.DataFrame(columns=['severity', 'check', 'count'])
+    return report.groupby(['severity', 'check']).size().reset_index(name='count')
@@ -1,125 +1,7 @@
 import pandas as pd
 import streamlit as st
-import re
 
-def convert_degree_to_decimal(degree_str):
-    """
-    Convert degree format (e.g., "45°29'53.0"N") to decimal format
-    """
-    if pd.isna(degree_str) or degree_str == '':
-        return None
-    
-    # Remove any whitespace
-    degree_str = str(degree_str).strip()
-    
-    # Pattern to match degrees, minutes, seconds format
-    # Example: 45°29'53.0"N or -73°33'1.0"W
-    pattern = r"(-?\d+)°(\d+)'([\d.]+)\"?([NSEW])?"
-    match = re.match(pattern, degree_str)
-    
-    if match:
-        degrees = int(match.group(1))
-        minutes = int(match.group(2))
-        seconds = float(match.group(3))
-        direction = match.group(4) if match.group(4) else ''
-        
-        # Convert to decimal
-        decimal = abs(degrees) + minutes/60 + seconds/3600
-        
-        # Apply sign based on direction or original sign
-        if degrees < 0 or direction in ['S', 'W']:
-            decimal = -decimal
-            
-        return decimal
-    else:
-        # Try to parse as already decimal format
-        try:
-            return float(degree_str)
-        except:
-            return None
-
-def format_coordinate_for_polygon(coord):
-    """
-    Convert decimal coordinate to the specific format required for polygon
-    Maximum 8 digits as per requirement
-    """
-    if coord is None:
-        return None
-    
-    # Convert to the required format and ensure max 8 digits
-    formatted = round(float(coord) * (10 ** 7))
-    
-    # Convert to string and limit to 8 digits
-    coord_str = str(abs(formatted))
-    if len(coord_str) > 8:
-        coord_str = coord_str[:8]
-    
-    # Convert back to int and restore sign
-    result = int(coord_str)
-    if coord < 0:  # Use original coord sign, not formatted
-        result = -result
-        
-    return result
-
-def generate_polygon_command(row, column_mappings=None):
-    """
-    Generate the polygon command for a single row
-    Based on CIQ_LTE.xlsx format where:
-    - Corner X columns contain latitude values
-    - Unnamed: Y columns contain longitude values (paired with Corner columns)
-    """
-    cell_id = row['EutranCellFDDId']
-    corners = []
-    
-    # Use provided mappings or default mappings
-    if column_mappings is None:
-        corner_mappings = [
-            ('Corner 1', 'Unnamed: 3'),
-            ('Corner 2', 'Unnamed: 5'), 
-            ('Corner 3', 'Unnamed: 7'),
-            ('Corner 4', 'Unnamed: 9'),
-            ('Corner 5', 'Unnamed: 11'),
-            ('Corner 6', 'Unnamed: 13'),
-            ('Corner 7', 'Unnamed: 15'),
-            ('Corner 8', 'Unnamed: 17'),
-            ('Corner 9', 'Unnamed: 19'),
-            ('Corner 10', 'Unnamed: 21'),
-            ('Corner 11', 'Unnamed: 23'),
-            ('Corner 12', 'Unnamed: 25'),
-            ('Corner 13', 'Unnamed: 27'),
-            ('Corner 14', 'Unnamed: 29'),
-            ('Corner 15', 'Unnamed: 31')
-        ]
-    else:
-        corner_mappings = column_mappings
-    
-    for lat_col, lon_col in corner_mappings:
-        if lat_col in row.index and lon_col in row.index:
-            lat_degree = row[lat_col]
-            lon_degree = row[lon_col]
-            
-            if pd.notna(lat_degree) and pd.notna(lon_degree) and lat_degree != '' and lon_degree != '':
-                # Convert to decimal
-                lat_decimal = convert_degree_to_decimal(lat_degree)
-                lon_decimal = convert_degree_to_decimal(lon_degree)
-                
-                if lat_decimal is not None and lon_decimal is not None:
-                    # For North American coordinates, longitude should typically be negative
-                    # If longitude is positive and appears to be North American (typical range), make it negative
-                    if lon_decimal > 0 and 60 <= lon_decimal <= 180:
-                        lon_decimal = -lon_decimal
-                    
-                    # Format for polygon using the specified calculation
-                    lat_formatted = format_coordinate_for_polygon(lat_decimal)
-                    lon_formatted = format_coordinate_for_polygon(lon_decimal)
-                    
-                    corners.append(f"cornerLatitude={lat_formatted},cornerLongitude={lon_formatted}")
-    
-    if corners:
-        corner_string = ";".join(corners)
-        return f"set EUtranCellFDD={cell_id} eutranCellPolygon {corner_string};"
-    else:
-        return f"# No valid corners found for {cell_id}"
+from polygon_engine import detect_polygon_column_mapping, lte_polygon_commands, polygon_geometry_report
 
 def generate_coverage_command(row):
     """
@@ -153,14 +35,15 @@ def load_excel_and_convert(file_path):
         # Detect the correct column mapping for this file
         column_mappings = detect_polygon_column_mapping(polygon_data)
         
-        # Generate polygon commands
-        commands = []
-        for idx, row in polygon_data.iterrows():
-            if pd.notna(row['EutranCellFDDId']) and row['EutranCellFDDId'] != '':
-                command = generate_polygon_command(row, column_mappings)
-                commands.append(command)
+        # Generate polygon commands (whole sheet at once)
+        commands = lte_polygon_commands(polygon_data, column_mappings)
         
-        return commands, f"Successfully processed {len(commands)} cells from eUtranCellPolygon sheet"
+        message = f"Successfully processed {len(commands)} cells from eUtranCellPolygon sheet"
+        report = polygon_geometry_report(polygon_data, column_mappings)
+        invalid_count = int((~report['valid'] & (report['corners_in'] > 0)).sum())
+        if invalid_count:
+            message += f" ({invalid_count} invalid polygon(s) skipped, see the comment lines)"
+        return commands, message
         
     except Exception as e:
         return None, f"Error reading Excel file: {str(e)}"
@@ -188,27 +71,6 @@ def load_excel_and_convert_coverage(file_path):
     except Exception as e:
         return None, f"Error reading Excel file: {str(e)}"
 
-def detect_polygon_column_mapping(polygon_data):
-    """
-    Detect the correct column mapping for polygon data based on the actual columns in the file
-    """
-    columns = list(polygon_data.columns)
-    mappings = []
-    
-    # Look for Corner columns and their corresponding Unnamed columns
-    for i in range(1, 16):  # Check up to 15 corners
-        corner_col = f'Corner {i}'
-        if corner_col in columns:
-            corner_idx = columns.index(corner_col)
-            
-            # The longitude column should be the very next column after Corner
-            # and it should be an Unnamed column
-            if corner_idx + 1 < len(columns) and columns[corner_idx + 1].startswith('Unnamed:'):
-                lon_col = columns[corner_idx + 1]
-                mappings.append((corner_col, lon_col))
-    
-    return mappings
-
 # Streamlit App Interface
 def main():
     st.title("CIQ LTE Polygon & Coverage Converter")
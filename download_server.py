@@ -0,0 +1,275 @@
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from archive_stream import ARCHIVE_FORMATS, iter_archive
+from file_catalog import LOG_FOLDERS
+
+# Side-car HTTP server for the log download pages.
+# Files are streamed from disk in chunks only when a link is clicked (with HTTP Range
+# support for resumed/partial downloads), so rendering a page never reads file content.
+# Several files can also be fetched as one streamed ZIP / tar.gz archive.
+# Links are signed with a per-process secret and expire, so only links handed out by
+# the Streamlit pages are served.
+
+# Loopback only by default; listening on other interfaces (or behind a proxy) is an explicit choice
+DOWNLOAD_HOST = os.environ.get("G2L_DOWNLOAD_HOST", "127.0.0.1")
+DOWNLOAD_PORT = int(os.environ.get("G2L_DOWNLOAD_PORT", "8502"))
+# Public base URL as seen by the browser, e.g. "https://tools.example.com/files".
+# When empty the host of the current Streamlit request is used with DOWNLOAD_PORT.
+DOWNLOAD_URL = os.environ.get("G2L_DOWNLOAD_URL", "")
+LINK_TTL = int(os.environ.get("G2L_DOWNLOAD_TTL", "3600"))  # seconds
+
+CHUNK_SIZE = 256 * 1024
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+_secret = secrets.token_bytes(32)
+_lock = threading.Lock()
+_server = None
+
+
+def _sign(message):
+    return hmac.new(_secret, message.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def folder_key(folder_path):
+    """
+    Map a folder path to its key in LOG_FOLDERS (None if the folder is not served)
+    """
+    folder_path = os.path.abspath(folder_path)
+    for key, path in LOG_FOLDERS.items():
+        if os.path.abspath(path) == folder_path:
+            return key
+    return None
+
+
+def _base_url():
+    if DOWNLOAD_URL:
+        return DOWNLOAD_URL.rstrip("/")
+    host = None
+    try:
+        import streamlit as st
+        host = st.context.headers.get("Host")
+    except Exception:
+        pass
+    hostname = host.rsplit(":", 1)[0] if host else socket.gethostname()
+    return f"http://{hostname}:{DOWNLOAD_PORT}"
+
+
+def signed_path(path, ttl=LINK_TTL):
+    """
+    Append an expiry and signature to a server path (path must already be URL-quoted)
+    """
+    expires = int(time.time()) + ttl
+    separator = "&" if "?" in path else "?"
+    unsigned = f"{path}{separator}expires={expires}"
+    return f"{unsigned}&sig={_sign(unsigned)}"
+
+
+def verify_path(raw_path):
+    """
+    Check the signature and expiry of a request path produced by signed_path
+    """
+    unsigned, _, sig = raw_path.rpartition("&sig=")
+    if not unsigned or not hmac.compare_digest(_sign(unsigned), sig):
+        return False
+    expires = parse_qs(urlsplit(unsigned).query).get("expires", ["0"])[0]
+    return expires.isdigit() and int(expires) >= time.time()
+
+
+def download_url(folder_path, name):
+    """
+    Signed URL that streams one file from a served log folder
+    """
+    key = folder_key(folder_path)
+    if key is None:
+        raise ValueError(f"Folder is not served for download: {folder_path}")
+    return _base_url() + signed_path(f"/files/{quote(key)}/{quote(name)}")
+
+
+def archive_url(folder_path, names, archive_format='zip'):
+    """
+    Signed URL that streams the selected files of a log folder as one archive
+    """
+    key = folder_key(folder_path)
+    if key is None:
+        raise ValueError(f"Folder is not served for download: {folder_path}")
+    query = "&".join(f"name={quote(name)}" for name in names)
+    return _base_url() + signed_path(f"/archive/{quote(key)}?format={quote(archive_format)}&{query}")
+
+
+def resolve_file(key, name):
+    """
+    Absolute path of a file inside a served folder, or None (rejects path traversal)
+    """
+    folder_path = LOG_FOLDERS.get(key)
+    if folder_path is None or not name or "/" in name or "\\" in name or name in (".", ".."):
+        return None
+    file_path = os.path.join(folder_path, name)
+    return file_path if os.path.isfile(file_path) else None
+
+
+def parse_range(header, file_size):
+    """
+    Parse a single 'bytes=start-end' Range header.
+    Returns (start, end) inclusive, None for no/unsupported range, or False if unsatisfiable.
+    """
+    if not header:
+        return None
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None  # multi-range or malformed: serve the whole file
+    if match.group(1) == "":
+        length = int(match.group(2))  # suffix range: last N bytes
+        if length == 0:
+            return False
+        return max(file_size - length, 0), file_size - 1
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else file_size - 1
+    if start >= file_size or end < start:
+        return False
+    return start, min(end, file_size - 1)
+
+
+def copy_file_range(source, destination, start, length, chunk_size=CHUNK_SIZE):
+    """
+    Copy length bytes from source (starting at start) to destination in chunks
+    """
+    source.seek(start)
+    remaining = length
+    while remaining > 0:
+        chunk = source.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        destination.write(chunk)
+        remaining -= len(chunk)
+
+
+def content_disposition(filename):
+    ascii_name = filename.encode("ascii", "replace").decode("ascii").replace('"', "")
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+
+class DownloadHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self._dispatch(send_body=False)
+
+    def do_GET(self):
+        self._dispatch(send_body=True)
+
+    def _dispatch(self, send_body):
+        if not verify_path(self.path):
+            self.send_error(403, "Invalid or expired link")
+            return
+        path = urlsplit(self.path).path
+        if path.startswith("/files/"):
+            self._serve_file(path, send_body)
+            return
+        if path.startswith("/archive/"):
+            self._serve_archive(path, send_body)
+            return
+        self.send_error(404)
+
+    def _serve_file(self, path, send_body):
+        parts = path[len("/files/"):].split("/")
+        if len(parts) != 2:
+            self.send_error(404)
+            return
+        key, name = unquote(parts[0]), unquote(parts[1])
+        file_path = resolve_file(key, name)
+        if file_path is None:
+            self.send_error(404, "File not found")
+            return
+
+        try:
+            source = open(file_path, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        with source:
+            file_size = os.fstat(source.fileno()).st_size
+            byte_range = parse_range(self.headers.get("Range"), file_size)
+            if byte_range is False:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{file_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if byte_range is None:
+                start, end = 0, file_size - 1
+                self.send_response(200)
+            else:
+                start, end = byte_range
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{file_size}")
+            length = max(end - start + 1, 0)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Disposition", content_disposition(name))
+            self.end_headers()
+            if send_body:
+                try:
+                    copy_file_range(source, self.wfile, start, length)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client cancelled the download
+
+    def _serve_archive(self, path, send_body):
+        key = unquote(path[len("/archive/"):])
+        folder_path = LOG_FOLDERS.get(key)
+        params = parse_qs(urlsplit(self.path).query)
+        archive_format = params.get("format", ["zip"])[0]
+        names = [name for name in params.get("name", []) if resolve_file(key, name)]
+        if folder_path is None or archive_format not in ARCHIVE_FORMATS or not names:
+            self.send_error(404, "Nothing to archive")
+            return
+
+        content_type, suffix = ARCHIVE_FORMATS[archive_format]
+        archive_name = f"{key}_{time.strftime('%Y%m%d_%H%M%S')}{suffix}"
+        # Size is unknown while streaming: no Content-Length, the connection is closed at the end
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Disposition", content_disposition(archive_name))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        if not send_body:
+            return
+        chunks = iter_archive(folder_path, names, archive_format)
+        try:
+            for chunk in chunks:
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cancelled the download
+        finally:
+            chunks.close()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_download_server(host=DOWNLOAD_HOST, port=DOWNLOAD_PORT):
+    """
+    Start the download side-car once per process (safe to call on every rerun)
+    """
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), DownloadHandler)
+        except OSError as e:
+            print(f"Download server not started on {host}:{port}: {e}")
+            _server = False
+            return _server
+        _server.daemon_threads = True
+        thread = threading.Thread(target=_server.serve_forever, name="download-server", daemon=True)
+        thread.start()
+    return _server
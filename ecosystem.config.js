@@ -5,6 +5,11 @@ module.exports = {
     args   : "run main_page.py --server.port 8501 --server.headless true", // Argumen untuk streamlit
     cwd    : "/var/www/irsmigration", // Direktori kerja (lokasi main_page.py)
     interpreter: "none", // PENTING: Beritahu PM2 untuk tidak menggunakan interpreter (seperti Node.js)
-    exec_mode: "fork"   // Mode eksekusi standar
+    exec_mode: "fork",  // Mode eksekusi standar
+    env: {
+      G2L_METRICS_PORT: "9108", // Endpoint Prometheus: http://127.0.0.1:9108/metrics
+      G2L_DOWNLOAD_PORT: "8502", // Download server untuk halaman log (streamed, Range support)
+      G2L_DOWNLOAD_HOST: "0.0.0.0" // Dibuka ke jaringan agar link download bisa diakses browser (default hanya 127.0.0.1)
+    }
   }]
 }
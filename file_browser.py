@@ -0,0 +1,195 @@
+import math
+import os
+
+import streamlit as st
+
+from archive_stream import ARCHIVE_FORMATS
+from download_server import archive_url, download_url, start_download_server
+from file_catalog import format_mtime, format_size, query_files, remove_file, sync_folder
+from folder_watcher import folder_version, is_watched, start_folder_watcher
+from retention import apply_retention, folder_key, folder_rule, format_report, last_reports, plan_retention, start_retention_scheduler
+
+# Shared paginated file browser for the log download pages.
+# Sorting, filtering and paging are done by the SQLite catalog, so only the rows of the
+# visible page are materialized as Streamlit widgets, whatever the folder size.
+# The folder watcher keeps the catalog current; open pages poll its version counter
+# and rerun when new dumps arrive, so no manual rescan is needed.
+# The retention scheduler runs in the background; each folder shows its dry-run report
+# and applies it only after confirmation.
+
+REFRESH_CHECK = "3s"
+
+PAGE_SIZES = [25, 50, 100, 200]
+SORT_OPTIONS = {"Date": "date", "Name": "name", "Size": "size"}
+COLUMN_WIDTHS = [0.4, 0.2, 0.2, 0.15, 0.15]
+
+
+def _delete_cell(folder_to_scan, file_name, state_key):
+    # Logika Konfirmasi Delete
+    if st.session_state[state_key] == file_name:
+        confirm_col, cancel_col = st.columns(2)
+        with confirm_col:
+            if st.button("Yes", key=f"confirm_delete_{file_name}", help="Click for deletion confirmation."):
+                try:
+                    remove_file(folder_to_scan, file_name)
+                    st.success(f"File '{file_name}' is deleted.")
+                    st.session_state[state_key] = None
+                    st.rerun()
+                except OSError as e:
+                    st.error(f"Failed to delete '{file_name}': {e}")
+        with cancel_col:
+            if st.button("No", key=f"cancel_delete_{file_name}", help="Click for cancel deletion."):
+                st.session_state[state_key] = None
+                st.rerun()
+    else:
+        if st.button("Delete", key=f"delete_btn_{file_name}"):
+            st.session_state[state_key] = file_name
+            st.warning(f"Are you sure to delete '{file_name}'? Click Confirm.")
+            st.rerun()
+
+
+@st.fragment(run_every=REFRESH_CHECK)
+def _auto_refresh(folder_to_scan, version_key):
+    # Push refresh: rerun the page when the watcher reports a change in the folder
+    version = folder_version(folder_to_scan)
+    if st.session_state.get(version_key) is None:
+        st.session_state[version_key] = version
+    elif st.session_state[version_key] != version:
+        st.session_state[version_key] = version
+        st.rerun()
+
+
+def _archive_picker(folder_to_scan, page_names, key):
+    # Multi-select download: selected files are streamed as one compressed archive
+    with st.expander("Download selected files as archive"):
+        select_all = st.checkbox("Select all files on this page", key=f"archive_all_{key}")
+        if select_all:
+            selected = page_names
+        else:
+            selected = st.multiselect("Files", page_names, key=f"archive_files_{key}")
+        archive_format = st.radio("Format", list(ARCHIVE_FORMATS), horizontal=True, key=f"archive_format_{key}")
+        if selected:
+            st.link_button(f"Download {len(selected)} files ({archive_format})",
+                           archive_url(folder_to_scan, selected, archive_format))
+
+
+def _retention_panel(folder_to_scan, key):
+    # Dry run first; the plan is applied only after an explicit confirmation
+    plan_key = f"retention_plan_{key}"
+    with st.expander("Retention (compress / clean up old dumps)"):
+        scheduled = last_reports.get(folder_key(folder_to_scan))
+        if scheduled:
+            mode = "dry run" if scheduled['dry_run'] else "applied"
+            st.caption(f"Last scheduled run ({mode}): {format_mtime(scheduled['ran_at'])}, "
+                       f"{len(scheduled['actions'])} action(s)")
+        if st.button("Dry run", key=f"retention_dry_run_{key}"):
+            st.session_state[plan_key] = plan_retention(folder_to_scan, folder_rule(folder_to_scan))
+        actions = st.session_state.get(plan_key)
+        if actions is None:
+            return
+        if actions:
+            st.dataframe(format_report(actions), use_container_width=True, hide_index=True)
+        pending = [action for action in actions if action['action'] != 'skip']
+        if not pending:
+            st.info("Nothing to do.")
+            return
+        if st.checkbox(f"I confirm applying these {len(pending)} action(s)", key=f"retention_confirm_{key}"):
+            if st.button("Apply", key=f"retention_apply_{key}"):
+                errors = apply_retention(folder_to_scan, pending)
+                st.session_state[plan_key] = None
+                if errors:
+                    st.error("\n".join(errors))
+                else:
+                    st.success(f"{len(pending)} action(s) applied.")
+
+
+def file_browser_page(title, folder_to_scan, allow_delete=True):
+    """
+    Render a paginated, sortable and searchable file table for one log folder
+    """
+    st.title(title)
+    st.markdown("---")
+    start_download_server()
+    start_folder_watcher()
+    start_retention_scheduler()
+
+    key = os.path.basename(os.path.normpath(folder_to_scan))
+    state_key = f"file_to_delete_{key}"
+    page_key = f"file_page_{key}"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = None
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+
+    # Tombol Refresh
+    if st.button("Refresh Folder"):
+        st.session_state[state_key] = None
+        sync_folder(folder_to_scan, force=True)
+        st.rerun()
+
+    if not os.path.isdir(folder_to_scan):
+        st.error(f"Directory not found: `{folder_to_scan}`")
+        st.stop()
+
+    # Watched folders are kept current in the background; otherwise check on render
+    if not is_watched(folder_to_scan) or folder_version(folder_to_scan) == 0:
+        sync_folder(folder_to_scan)
+    _auto_refresh(folder_to_scan, f"file_version_{key}")
+
+    search_col, sort_col, order_col, size_col = st.columns([0.4, 0.2, 0.2, 0.2])
+    with search_col:
+        search = st.text_input("Search file name", key=f"file_search_{key}")
+    with sort_col:
+        sort_label = st.selectbox("Sort by", list(SORT_OPTIONS), key=f"file_sort_{key}")
+    with order_col:
+        descending = st.selectbox("Order", ["Descending", "Ascending"], key=f"file_order_{key}") == "Descending"
+    with size_col:
+        page_size = st.selectbox("Files per page", PAGE_SIZES, index=1, key=f"file_page_size_{key}")
+
+    _, total = query_files(folder_to_scan, search, limit=0)
+    if total == 0:
+        st.warning(f"No file in folder: `{folder_to_scan}`.")
+        return
+
+    page_count = max(math.ceil(total / page_size), 1)
+    st.session_state[page_key] = min(st.session_state[page_key], page_count)
+    page = st.number_input(f"Page (1 - {page_count})", min_value=1, max_value=page_count, key=page_key)
+
+    offset = (page - 1) * page_size
+    files_info, _ = query_files(folder_to_scan, search, SORT_OPTIONS[sort_label], descending, page_size, offset)
+    st.caption(f"Showing {offset + 1} - {offset + len(files_info)} of {total} files")
+    st.markdown("---")
+
+    # Struktur Kolom: Nama File | Ukuran | Tanggal Dibuat | Download | Delete
+    col1, col2, col3, col4, col5 = st.columns(COLUMN_WIDTHS)
+    with col1:
+        st.write("**File Name**")
+    with col2:
+        st.write("**Size**")
+    with col3:
+        st.write("**Date Created**")
+    with col4:
+        st.write("**Download**")
+    with col5:
+        st.write("**Delete**" if allow_delete else "")
+    st.markdown("---")
+
+    _archive_picker(folder_to_scan, [file_data['name'] for file_data in files_info], key)
+    if allow_delete:
+        _retention_panel(folder_to_scan, key)
+
+    for file_data in files_info:
+        col1_file, col2_size, col3_date, col4_download, col5_delete = st.columns(COLUMN_WIDTHS)
+
+        with col1_file:
+            st.write(file_data['name'])
+        with col2_size:
+            st.write(format_size(file_data['size']))
+        with col3_date:
+            st.write(format_mtime(file_data['mtime']))
+        with col4_download:
+            # File dibaca hanya saat link diklik (streamed oleh download server)
+            st.link_button("Download", download_url(folder_to_scan, file_data['name']))
+        if allow_delete:
+            with col5_delete:
+                _delete_cell(folder_to_scan, file_data['name'], state_key)
@@ -0,0 +1,158 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+# Shared SQLite index of the FTP log directories used by the download pages.
+# Each folder is rescanned incrementally with os.scandir: only files whose size/mtime
+# changed are written, and unchanged folders (same directory mtime) are not rescanned
+# until RESCAN_INTERVAL has passed (file size changes do not touch the directory mtime).
+
+CATALOG_DB = os.environ.get("G2L_CATALOG_DB", "file_catalog.sqlite")
+RESCAN_INTERVAL = float(os.environ.get("G2L_CATALOG_RESCAN", "60"))  # seconds
+
+LOG_ROOT = "/home/ftpwisbay/log"
+LOG_FOLDERS = {
+    'bscallip': f"{LOG_ROOT}/bscallip",
+    'migration': f"{LOG_ROOT}/migration",
+    'rbsdump': f"{LOG_ROOT}/rbsdump",
+    'ModumpRNC': f"{LOG_ROOT}/ModumpRNC",
+}
+
+SORT_COLUMNS = {'name': 'name', 'size': 'size', 'date': 'mtime'}
+
+_local = threading.local()
+_sync_lock = threading.Lock()
+
+
+def _connect():
+    """
+    One SQLite connection per thread (Streamlit runs each session in its own thread)
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(CATALOG_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                folder TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                PRIMARY KEY (folder, name)
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_mtime ON files (folder, mtime);
+            CREATE INDEX IF NOT EXISTS idx_files_size ON files (folder, size);
+            CREATE TABLE IF NOT EXISTS folders (
+                folder TEXT PRIMARY KEY,
+                dir_mtime INTEGER NOT NULL,
+                scanned_at REAL NOT NULL
+            );
+        """)
+        _local.conn = conn
+    return conn
+
+
+def format_size(file_size_bytes):
+    # Konversi ke KB, MB, atau GB untuk tampilan yang lebih mudah dibaca
+    if file_size_bytes < 1024:
+        return f"{file_size_bytes} bytes"
+    elif file_size_bytes < 1024 * 1024:
+        return f"{file_size_bytes / 1024:.2f} KB"
+    elif file_size_bytes < 1024 * 1024 * 1024:
+        return f"{file_size_bytes / (1024 * 1024):.2f} MB"
+    else:
+        return f"{file_size_bytes / (1024 * 1024 * 1024):.2f} GB"
+
+
+def format_mtime(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def sync_folder(folder_path, force=False):
+    """
+    Bring the catalog of one folder up to date. Returns True if any file was added, changed or removed.
+    """
+    if not os.path.isdir(folder_path):
+        return False
+    folder_path = os.path.abspath(folder_path)
+    conn = _connect()
+    dir_mtime = os.stat(folder_path).st_mtime_ns
+
+    row = conn.execute("SELECT dir_mtime, scanned_at FROM folders WHERE folder = ?", (folder_path,)).fetchone()
+    if not force and row is not None and row[0] == dir_mtime and time.time() - row[1] < RESCAN_INTERVAL:
+        return False
+
+    with _sync_lock:
+        existing = {name: (size, mtime) for name, size, mtime in
+                    conn.execute("SELECT name, size, mtime FROM files WHERE folder = ?", (folder_path,))}
+        changed = []
+        seen = set()
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # deleted while scanning
+                seen.add(entry.name)
+                if existing.get(entry.name) != (stat.st_size, stat.st_mtime):
+                    changed.append((folder_path, entry.name, stat.st_size, stat.st_mtime))
+        removed = [(folder_path, name) for name in existing.keys() - seen]
+
+        with conn:
+            if changed:
+                conn.executemany("INSERT OR REPLACE INTO files (folder, name, size, mtime) VALUES (?, ?, ?, ?)", changed)
+            if removed:
+                conn.executemany("DELETE FROM files WHERE folder = ? AND name = ?", removed)
+            conn.execute("INSERT OR REPLACE INTO folders (folder, dir_mtime, scanned_at) VALUES (?, ?, ?)",
+                         (folder_path, dir_mtime, time.time()))
+    return bool(changed or removed)
+
+
+def query_files(folder_path, search="", sort_by="date", descending=True, limit=None, offset=0):
+    """
+    Page through the catalog of a folder.
+    Returns (rows, total) where rows are dicts with name, size (bytes) and mtime.
+    """
+    folder_path = os.path.abspath(folder_path)
+    conn = _connect()
+    where = "folder = ?"
+    params = [folder_path]
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where += " AND name LIKE ? ESCAPE '\\'"
+        params.append(f"%{escaped}%")
+
+    total = conn.execute(f"SELECT COUNT(*) FROM files WHERE {where}", params).fetchone()[0]
+
+    order = SORT_COLUMNS.get(sort_by, 'mtime')
+    direction = "DESC" if descending else "ASC"
+    sql = f"SELECT name, size, mtime FROM files WHERE {where} ORDER BY {order} {direction}, name"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    rows = [{'name': name, 'size': size, 'mtime': mtime} for name, size, mtime in conn.execute(sql, params)]
+    return rows, total
+
+
+def get_file_list_with_info(folder_path, search="", sort_by="date", descending=True, limit=None, offset=0):
+    """
+    Daftar file dan informasi tambahan (name, size, date) dari catalog
+    """
+    sync_folder(folder_path)
+    rows, _ = query_files(folder_path, search, sort_by, descending, limit, offset)
+    return [{'name': row['name'], 'size': format_size(row['size']), 'date': format_mtime(row['mtime'])} for row in rows]
+
+
+def remove_file(folder_path, name):
+    """
+    Delete a file from disk and from the catalog
+    """
+    os.remove(os.path.join(folder_path, name))
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM files WHERE folder = ? AND name = ?", (os.path.abspath(folder_path), name))
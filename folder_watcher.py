@@ -0,0 +1,173 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+from file_catalog import LOG_FOLDERS, sync_folder
+
+# Background watcher for the FTP log folders.
+# Uses Linux inotify (through ctypes) to keep the file catalog up to date as dumps
+# arrive or are deleted, and falls back to polling the folders when inotify is not
+# available. Every change bumps a per-folder version that open pages poll cheaply
+# (see file_browser) to refresh themselves without a manual rescan.
+
+POLL_INTERVAL = float(os.environ.get("G2L_WATCH_POLL", "5"))  # seconds
+DEBOUNCE = 0.5  # seconds of quiet before a changed folder is re-synced
+
+# inotify event masks (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+_lock = threading.Lock()
+_versions = {}
+_watched = set()
+_watcher = None
+
+
+def _bump(folder_path):
+    with _lock:
+        _versions[folder_path] = _versions.get(folder_path, 0) + 1
+
+
+def folder_version(folder_path):
+    """
+    Change counter of a folder; increases every time its listing changes
+    """
+    return _versions.get(os.path.abspath(folder_path), 0)
+
+
+def is_watched(folder_path):
+    """
+    True when the background watcher keeps this folder's catalog current
+    """
+    return os.path.abspath(folder_path) in _watched
+
+
+def _load_libc():
+    if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+        return None
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return None
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class FolderWatcher(threading.Thread):
+    def __init__(self, folders):
+        super().__init__(name="folder-watcher", daemon=True)
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        self.libc = _load_libc()
+        self.fd = -1
+        self.wd_to_folder = {}
+        self.dirty = {}  # folder -> time of last event
+        self.last_poll = 0.0
+
+    def _init_inotify(self):
+        if self.libc is None:
+            return
+        fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            print(f"inotify not available (errno {ctypes.get_errno()}), polling log folders instead")
+            return
+        self.fd = fd
+
+    def _add_watches(self):
+        # (Re)try folders that are not watched yet, e.g. created after startup
+        if self.fd < 0:
+            return
+        watched_folders = set(self.wd_to_folder.values())
+        for folder in self.folders:
+            if folder in watched_folders or not os.path.isdir(folder):
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+            if wd >= 0:
+                self.wd_to_folder[wd] = folder
+                self.dirty[folder] = 0.0  # catch up on changes made before the watch existed
+
+    def _read_events(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size + name_len
+            folder = self.wd_to_folder.get(wd)
+            if folder is None:
+                continue
+            if mask & IN_IGNORED:
+                # Folder was deleted or moved: drop the watch and pick it up again later
+                del self.wd_to_folder[wd]
+            self.dirty[folder] = time.monotonic()
+
+    def _sync_dirty(self):
+        now = time.monotonic()
+        for folder, changed_at in list(self.dirty.items()):
+            if now - changed_at < DEBOUNCE:
+                continue
+            del self.dirty[folder]
+            if sync_folder(folder, force=True):
+                _bump(folder)
+
+    def _poll(self):
+        # Polling fallback for unwatched folders and periodic safety net for watched ones:
+        # files still growing (appended, not closed) produce no event we listen to.
+        # sync_folder is a cheap stat and rescans at least every RESCAN_INTERVAL.
+        for folder in self.folders:
+            if sync_folder(folder):
+                _bump(folder)
+
+    def run(self):
+        self._init_inotify()
+        with _lock:
+            _watched.update(self.folders)
+        while True:
+            try:
+                self._add_watches()
+                if self.fd >= 0:
+                    self._read_events(DEBOUNCE if self.dirty else POLL_INTERVAL)
+                else:
+                    time.sleep(DEBOUNCE if self.dirty else POLL_INTERVAL)
+                self._sync_dirty()
+                if time.monotonic() - self.last_poll >= POLL_INTERVAL:
+                    self.last_poll = time.monotonic()
+                    self._poll()
+            except Exception as e:
+                # Never let the watcher die silently; retry on the next round
+                print(f"Folder watcher error: {e}")
+                time.sleep(POLL_INTERVAL)
+
+
+def start_folder_watcher(folders=None):
+    """
+    Start the watcher thread once per process (safe to call on every rerun)
+    """
+    global _watcher
+    with _lock:
+        if _watcher is None:
+            _watcher = FolderWatcher(folders or LOG_FOLDERS.values())
+            _watcher.start()
+    return _watcher
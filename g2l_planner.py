@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from spatial_index import SiteIndex, gsm_sites, lte_sites
+
+# G2L relation planner: derives the LTE EARFCNs of every GSM cell from the LTE cells around
+# it, instead of a hand-curated 'GSM-LTE-Relation' sheet.
+# - co-located LTE cells (same site) are related when they serve the same sector
+#   (GSM azimuth and LTE posCellBearing within BEARING_TOLERANCE)
+# - nearby LTE cells are related when the LTE cell points at the GSM site (within half its
+#   opening angle) and the GSM cell does not point away from the LTE site
+# Cells without a known direction are related on distance alone.
+
+COLOCATED_DISTANCE = 100  # meters
+MAX_DISTANCE = 3000  # meters
+CANDIDATES = 12  # nearest LTE cells considered per GSM cell
+BEARING_TOLERANCE = 60  # degrees
+DEFAULT_OPENING_ANGLE = 120  # degrees
+
+RELATION_COLUMNS = ['BSC', 'CELL_GSM', 'EARFCN', 'EutranCellFDDId', 'distance_m']
+
+
+def bearing(lat1, lon1, lat2, lon2):
+    """
+    Initial bearing in degrees (0 = north, clockwise) from point 1 to point 2
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2))
+    y = np.sin(lon2 - lon1) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(lon2 - lon1)
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+def angle_difference(a, b):
+    """
+    Absolute difference between two directions in degrees (0..180)
+    """
+    return np.abs((np.asarray(a, dtype=float) - b + 180) % 360 - 180)
+
+
+def lte_directions(excel_data, lte):
+    """
+    posCellBearing and posCellOpeningAngle (0.1 degree units in eUtranCellCoverage) of the
+    lte_sites rows, in degrees (NaN / DEFAULT_OPENING_ANGLE when unknown)
+    """
+    azimuth = np.full(len(lte), np.nan)
+    opening = np.full(len(lte), float(DEFAULT_OPENING_ANGLE))
+    coverage = excel_data.get('eUtranCellCoverage')
+    if coverage is None or 'EutranCellFDDId' not in coverage.columns:
+        return azimuth, opening
+    coverage = coverage.assign(EutranCellFDDId=coverage['EutranCellFDDId'].astype("string").str.strip())
+    coverage = coverage.drop_duplicates('EutranCellFDDId').set_index('EutranCellFDDId')
+    row = coverage.index.get_indexer(lte['EutranCellFDDId'])
+    found = row >= 0
+    if 'posCellBearing' in coverage.columns:
+        values = pd.to_numeric(coverage['posCellBearing'].astype(object), errors='coerce').to_numpy(dtype=float) / 10
+        azimuth[found] = values[row[found]]
+    if 'posCellOpeningAngle' in coverage.columns:
+        values = pd.to_numeric(coverage['posCellOpeningAngle'].astype(object), errors='coerce').to_numpy(dtype=float) / 10
+        opening[found] = np.where(np.isnan(values[row[found]]), DEFAULT_OPENING_ANGLE, values[row[found]])
+    return azimuth, opening
+
+
+def plan_relations(excel_data, max_distance=MAX_DISTANCE, candidates=CANDIDATES, colocated_distance=COLOCATED_DISTANCE,
+                   tolerance=BEARING_TOLERANCE):
+    """
+    Planned GSM-LTE relations: one row per (GSM cell, EARFCN) with the nearest related LTE
+    cell on that EARFCN, ordered by BSC, GSM cell and distance. The BSC, CELL_GSM and EARFCN
+    columns are what generate_scripts_grouped_by_bsc expects.
+    Needs the 'GSM Cells' and 'eUtran Parameters' (with earfcnDl) sheets; returns None otherwise.
+    """
+    gsm = gsm_sites(excel_data)
+    if gsm is None or 'eUtran Parameters' not in excel_data or 'earfcnDl' not in excel_data['eUtran Parameters']:
+        return None
+    lte = lte_sites(excel_data)
+    # earfcnDl stays object when typing failed (e.g. 'N/A' cells): only numeric EARFCNs are planned
+    lte = lte.assign(earfcnDl=pd.to_numeric(lte['earfcnDl'], errors='coerce'))
+    lte = lte[lte['earfcnDl'].notna()].reset_index(drop=True)
+    gsm = gsm.reset_index(drop=True)
+
+    index = SiteIndex(lte['latitude'].to_numpy(), lte['longitude'].to_numpy())
+    neighbours, distances = index.nearest(gsm['latitude'].to_numpy(), gsm['longitude'].to_numpy(), candidates,
+                                          max_distance)
+    gsm_row, _ = np.nonzero(neighbours >= 0)
+    lte_row = neighbours[neighbours >= 0]
+    distance = distances[neighbours >= 0]
+
+    # Direction checks over all candidate pairs at once
+    lte_azimuth, lte_opening = lte_directions(excel_data, lte)
+    lte_azimuth, lte_opening = lte_azimuth[lte_row], lte_opening[lte_row]
+    gsm_azimuth = gsm['azimuth'].to_numpy(dtype=float)[gsm_row] if 'azimuth' in gsm.columns else np.full(len(gsm_row), np.nan)
+    gsm_lat, gsm_lon = gsm['latitude'].to_numpy()[gsm_row], gsm['longitude'].to_numpy()[gsm_row]
+    lte_lat, lte_lon = lte['latitude'].to_numpy()[lte_row], lte['longitude'].to_numpy()[lte_row]
+    with np.errstate(invalid='ignore'):
+        same_sector = ~(angle_difference(gsm_azimuth, lte_azimuth) > tolerance)
+        lte_faces_gsm = ~(angle_difference(lte_azimuth, bearing(lte_lat, lte_lon, gsm_lat, gsm_lon)) > lte_opening / 2)
+        gsm_faces_lte = ~(angle_difference(gsm_azimuth, bearing(gsm_lat, gsm_lon, lte_lat, lte_lon)) > 90)
+    related = np.where(distance <= colocated_distance, same_sector, lte_faces_gsm & gsm_faces_lte)
+
+    relations = pd.DataFrame({
+        'BSC': gsm['BSC'].to_numpy()[gsm_row] if 'BSC' in gsm.columns else "",
+        'CELL_GSM': gsm['CELL_GSM'].to_numpy()[gsm_row],
+        'EARFCN': lte['earfcnDl'].to_numpy()[lte_row].astype(np.int64),
+        'EutranCellFDDId': lte['EutranCellFDDId'].to_numpy()[lte_row],
+        'distance_m': distance.round(1),
+    })[related]
+    # Candidates come nearest first per GSM cell: keep the nearest cell of every EARFCN
+    relations = relations.drop_duplicates(['CELL_GSM', 'EARFCN'])
+    relations = relations.sort_values(['BSC', 'CELL_GSM', 'distance_m'], kind='stable')
+    return relations[RELATION_COLUMNS].reset_index(drop=True)
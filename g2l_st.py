@@ -1,29 +1,63 @@
+import zlib
+from datetime import datetime
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 
+from ciq_picker import ciq_picker
+from ciq_repository import load_sheets, read_sheet_columns
 from g2l_app import generate_scripts_grouped_by_bsc
-from datetime import datetime
-
-
+from g2l_planner import plan_relations
+from metrics import record_zip_size, time_generation, time_sheet_parse
+from profiling import attach_profile, profile_once, profiling_enabled
 
 
 st.title("GSM to LTE Script Generator")
 st.divider()
 
-st.markdown('Upload a CIQ or Excel file. Please make sure has :red["GSM-LTE-Relation"] Sheet.')
-uploaded_file = st.file_uploader("Upload Excel file", type=["xlsx"])
+st.markdown('Select or upload a CIQ or Excel file. Please make sure has :red["GSM-LTE-Relation"] Sheet, '
+            'or :red["GSM Cells"] and :red["eUtran Parameters"] sheets to plan the relations.')
+ciq = ciq_picker("g2l", required_sheets=[["GSM-LTE-Relation"], ["GSM Cells", "eUtran Parameters"]])
 
 now_str = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-if uploaded_file:
-    df = pd.read_excel(uploaded_file, header=None, sheet_name="GSM-LTE-Relation")
-    df = df.iloc[:, :3]
-    df.columns = ['BSC','CELL_GSM', 'EARFCN']   
-    df.dropna(subset=['BSC','CELL_GSM', 'EARFCN'], inplace=True)
-    df = df[df['CELL_GSM'].str.upper() != 'CELL_GSM']
+if ciq:
+    source = st.radio("Relations", ["From GSM-LTE-Relation sheet", "Planned from cell locations"], horizontal=True)
+    if source == "From GSM-LTE-Relation sheet":
+        # Light pass: only the BSC, CELL_GSM and EARFCN columns; every complete row gets the
+        # code of its cell so the relation rows can be read for the selected cells only (below)
+        with time_sheet_parse("GSM-LTE-Relation"):
+            relation_cells = read_sheet_columns(ciq, "GSM-LTE-Relation", [0, 1, 2])
+        cells = relation_cells[1][relation_cells.notna().all(axis=1)]
+        cell_codes, cell_names = pd.factorize(cells)
+        cell_rows = cells.index.to_numpy()
+        df = None
+    else:
+        # Co-located and nearby LTE cells facing the GSM cell give its EARFCNs
+        with time_sheet_parse("GSM Cells"):
+            sheets = load_sheets(ciq, ["GSM Cells", "eUtran Parameters", "eUtranCellCoverage"])
+        with time_generation("g2l_plan"):
+            df = plan_relations(sheets)
+        if df is None:
+            st.error('Planning needs the "GSM Cells" (CELL_GSM, latitude, longitude; BSC and azimuth optional) '
+                     'and "eUtran Parameters" sheets.')
+            st.stop()
+        no_bsc = df['BSC'].isna() | (df['BSC'].astype(str).str.strip() == "")
+        if no_bsc.any():
+            st.warning(f'⚠️ {df.loc[no_bsc, "CELL_GSM"].nunique()} planned GSM cell(s) have no BSC in "GSM Cells"; '
+                       'their scripts are grouped under an empty BSC name.')
+        planned_cells = df['CELL_GSM'].nunique()
+        st.info(f"Planned {len(df)} relations for {planned_cells} of {len(sheets['GSM Cells'])} GSM cells")
+        with st.expander("Planned relations"):
+            st.dataframe(df, hide_index=True)
+            st.download_button("Download Planned Relations (CSV)", df.to_csv(index=False),
+                               file_name=f"G2L_relations_{now_str}.csv", mime="text/csv")
 
-    cell_options = sorted(df['CELL_GSM'].unique().tolist())
+    if df is None:
+        cell_options = sorted(cell for cell in cell_names if str(cell).upper() != 'CELL_GSM')
+    else:
+        cell_options = sorted(df['CELL_GSM'].unique().tolist())
     
     select_all = st.checkbox("Select All Cells")
 
@@ -32,6 +66,23 @@ if uploaded_file:
     else:
         selected_cells = st.multiselect("Select cells to include:", options=cell_options)
 
+    if selected_cells and df is None:
+        rows = cell_rows[np.isin(cell_codes, cell_names.get_indexer(selected_cells))]
+        with time_sheet_parse("GSM-LTE-Relation rows"):
+            df = read_sheet_columns(ciq, "GSM-LTE-Relation", [0, 1, 2], rows)
+        df.columns = ['BSC','CELL_GSM', 'EARFCN']
+        df.dropna(subset=['BSC','CELL_GSM', 'EARFCN'], inplace=True)
+
     if selected_cells:
-        zip_buffer = generate_scripts_grouped_by_bsc(df, selected_cells)
+        # Profiled once per CIQ and cell selection, not on every rerun
+        selection = zlib.crc32("\n".join(map(str, selected_cells)).encode())
+        job_key = f"g2l_scripts_{ciq['sha256'][:8]}_{selection:08x}"
+        with profile_once(st.session_state, job_key, profiling_enabled(st.query_params)) as profile:
+            with time_generation("g2l_scripts"):
+                zip_buffer = generate_scripts_grouped_by_bsc(df, selected_cells)
+        record_zip_size("g2l_scripts", zip_buffer.getbuffer().nbytes)
+        if profile:
+            # The profile goes into the script ZIP, next to the scripts
+            zip_buffer = attach_profile(zip_buffer.getvalue(), profile)
+            st.info(f"Profiled run `{profile['run_id']}` took {profile['duration']:.2f} s (files under profile/ in the ZIP)")
         st.download_button("Download Script", zip_buffer, file_name=f"G2L_scripts_{now_str}.zip", mime="application/zip")
\ No newline at end of file
@@ -1,72 +1,58 @@
 import pandas as pd
 import streamlit as st
-import zipfile
-import io
-import re
+
+from ciq_model import CELL_RECORD_COLUMNS, build_cell_table, cell_records, type_ciq
+from ciq_picker import ciq_picker
+from ciq_repository import wait_parsed
+from ciq_snapshot import load_workbook
+from ciq_validation import ERROR, summarize_report, validate_ciq
+from metrics import record_cache_access, record_zip_size, time_generation, time_sheet_parse
+from mo_templates import DEFAULT_PROFILE, list_profiles, template_entry
+from netconf_builder import cells_session
+from pci_checker import check_conflicts, enb_conflicts
+from polygon_engine import detect_polygon_column_mapping, lte_coordinates, lte_polygon_commands, polygon_geometry_report
+from profiling import attach_profile, profile_once, profiling_enabled
+from zip_bundle import zip_entries
 
 # Step 1: Read the Excel file
 #@st.cache
-def load_excel(file):
-    return pd.read_excel(file, sheet_name=None)  # Read all sheets into a dictionary
-
-def format_coordinates(coord):
+def load_excel(file, digest=None):
     """
-    Takes a coordinate (latitude or longitude) and converts it into an 8-digit format.
-    Maximum 8 digits as per requirement.
+    Read all sheets into a dictionary with typed CIQ columns; a CIQ that was loaded before
+    comes from its memory-mapped snapshot instead of being parsed again (digest: the known
+    content hash, e.g. of a repository CIQ, so the file is not read and hashed first).
+    Returns (excel_data, issues) where issues lists the cells that failed validation.
     """
-    if coord is None:
-        return None
-    
-    # Convert to the required format and ensure max 8 digits
-    formatted = round(float(coord) * (10 ** 7))
-    
-    # Convert to string and limit to 8 digits
-    coord_str = str(abs(formatted))
-    if len(coord_str) > 8:
-        coord_str = coord_str[:8]
-    
-    # Convert back to int and restore sign
-    result = int(coord_str)
-    if coord < 0:  # Use original coord sign, not formatted
-        result = -result
-        
-    return result
+    raw_sheets, from_snapshot = load_workbook(file, digest=digest)
+    record_cache_access("ciq_snapshot", from_snapshot)
+    return type_ciq(raw_sheets)
 
-def convert_degree_to_decimal(degree_str):
+def load_ciq_cached(ciq):
     """
-    Convert degree format (e.g., "45°29'53.0"N") to decimal format
+    Parsed CIQ, its validation issues and the per-cell table, kept in the session per
+    repository CIQ so reruns (typing the eNB name, downloads) do not load and merge it again.
     """
-    if pd.isna(degree_str) or degree_str == '':
-        return None
-    
-    # Remove any whitespace
-    degree_str = str(degree_str).strip()
-    
-    # Pattern to match degrees, minutes, seconds format
-    # Example: 45°29'53.0"N or -73°33'1.0"W
-    pattern = r"(-?\d+)°(\d+)'([\d.]+)\"?([NSEW])?"
-    match = re.match(pattern, degree_str)
-    
-    if match:
-        degrees = int(match.group(1))
-        minutes = int(match.group(2))
-        seconds = float(match.group(3))
-        direction = match.group(4) if match.group(4) else ''
-        
-        # Convert to decimal
-        decimal = abs(degrees) + minutes/60 + seconds/3600
-        
-        # Apply sign based on direction or original sign
-        if degrees < 0 or direction in ['S', 'W']:
-            decimal = -decimal
-            
-        return decimal
-    else:
-        # Try to parse as already decimal format
-        try:
-            return float(degree_str)
-        except:
-            return None
+    cached = st.session_state.get('lte_ciq')
+    hit = cached is not None and cached['sha256'] == ciq['sha256']
+    record_cache_access("lte_ciq", hit)
+    if not hit:
+        wait_parsed(ciq)
+        with time_sheet_parse("all"):
+            excel_data, ciq_issues = load_excel(ciq['path'], ciq['sha256'])
+        with time_generation("cell_table"):
+            cell_table = build_cell_table(excel_data) if {'eUtran Parameters', 'PCI', 'eNB Info'} <= excel_data.keys() else None
+        cached = {'sha256': ciq['sha256'], 'excel_data': excel_data, 'issues': ciq_issues, 'cell_table': cell_table}
+        st.session_state['lte_ciq'] = cached
+    return cached
+
+def pci_conflicts_cached(ciq):
+    """
+    PCI/RACH conflicts of the whole CIQ, computed once per loaded CIQ (None without a cell table)
+    """
+    if 'pci_conflicts' not in ciq:
+        with time_generation("pci_check"):
+            ciq['pci_conflicts'] = check_conflicts(ciq['cell_table']) if ciq['cell_table'] is not None else None
+    return ciq['pci_conflicts']
 
 # Step 2: Generate XML for 04_LNR_Function.xml
 def generate_lnr_function_xml(enbname, excel_data, template_xml):
@@ -102,57 +88,69 @@ def generate_lnr_function_xml(enbname, excel_data, template_xml):
     return xml_data
 
 # Step 3: Generate LTE_Cells_template.xml
-def generate_lte_cells_xml(excel_data, enbname, template_xml):
-    # Get the relevant sheet data
-    sheet_data = excel_data['eUtran Parameters']  # Assuming 'eUtran Parameters' contains the cells data
-    pci_data = excel_data['PCI']  # Assuming 'PCI' sheet contains the additional parameters
-    enb_info_data = excel_data['eNB Info']  # 'eNB Info' sheet contains the tac value
-
-    # Filter rows from the 'eUtran Parameters' sheet that match the enbname
-    cell_data = sheet_data[sheet_data['eNBName'] == enbname]
-
-    # Merge PCI data based on EutranCellFDDId
-    merged_data = pd.merge(cell_data, pci_data[['EutranCellFDDId', 'rachRootSequence', 'cellId', 'sectorId', 'PhysicalLayerCellIdGroup', 'physicalLayerSubCellId']], on='EutranCellFDDId', how='left')
-
-    # Get the TAC value from the 'eNB Info' sheet based on eNBname
-    tac = enb_info_data[enb_info_data['eNodeB Name'] == enbname]['tac'].values
+# Template placeholder -> CellRecord field
+LTE_CELL_PLACEHOLDERS = {
+    'EutranCellFDDId': 'cell_name',
+    'AUG': 'sector_id',  # sectorId from the PCI sheet
+    'configuredMaxTxPower': 'configured_max_tx_power',
+    'rachRootSequence': 'rach_root_sequence',
+    'cellId': 'cell_id',
+    'cellRange': 'cell_range',
+    'earfcnDl': 'earfcn_dl',
+    'earfcnUl': 'earfcn_ul',
+    'dlChannelBandwidth': 'dl_channel_bandwidth',
+    'qRxLevMin': 'q_rx_lev_min',
+    'PhysicalLayerCellIdGroup': 'physical_layer_cell_id_group',
+    'physicalLayerSubCellId': 'physical_layer_sub_cell_id',
+}
+RECORD_COLUMNS = {field: column for column, field in CELL_RECORD_COLUMNS.items()}
+
+def _missing_fields(record):
+    return [field for field in LTE_CELL_PLACEHOLDERS.values() if getattr(record, field) is None]
+
+def incomplete_cells(cell_table, enbname):
+    """
+    Cells of the eNB with an empty LTE_Cells value (e.g. no row in the 'PCI' sheet): one row
+    per cell with the missing CIQ columns. These cells are left out of LTE_Cells.
+    """
+    rows = [(str(record.cell_name), ", ".join(RECORD_COLUMNS[field] for field in missing))
+            for record in cell_records(cell_table, enbname) if (missing := _missing_fields(record))]
+    return pd.DataFrame(rows, columns=['EutranCellFDDId', 'missing'])
+
+def generate_lte_cells_xml(excel_data, enbname, template_xml, cell_table=None):
+    # The eUtran Parameters / PCI / eNB Info join is built once per workbook (see load_ciq_cached);
+    # per eNB it is only a slice, read as per-cell records
+    if cell_table is None:
+        cell_table = build_cell_table(excel_data)
+    records = cell_records(cell_table, enbname)
+
+    # TAC value from the 'eNB Info' sheet for this eNB
+    tac = [record.tac for record in records if record.tac is not None]
     if len(tac) == 0:
         # If eNBname doesn't exist in 'eNB Info', handle this case
-        tac_value = "Error: eNB name '{enbname}' not found in eNB Info sheet."
+        tac_value = f"Error: eNB name '{enbname}' not found in eNB Info sheet."
     else:
-        tac_value = tac[0]  # Assuming only one match for eNBname
+        tac_value = tac[0]
 
-    # Generate XML for each row
-    cell_xml_data = []
-    for idx, row in merged_data.iterrows():
-        cell_xml = template_xml
+    # Cells with empty values (incomplete_cells) are left out instead of writing 'None' into
+    # the NETCONF payload
+    records = [record for record in records if not _missing_fields(record)]
+    if not records:
+        return ""
 
-        latitude = format_coordinates(row['latitude'])
-        longitude = format_coordinates(row['longitude'])
-        
-        # Replace the placeholders with actual data from the merged data
-        cell_xml = cell_xml.replace("{EutranCellFDDId}", str(row['EutranCellFDDId']))
-        cell_xml = cell_xml.replace("{AUG}", str(row['sectorId']))  # Use sectorId from PCI sheet
-        cell_xml = cell_xml.replace("{configuredMaxTxPower}", str(row['configuredMaxTxPower']))
-        cell_xml = cell_xml.replace("{rachRootSequence}", str(row['rachRootSequence']))  
-        cell_xml = cell_xml.replace("{cellId}", str(row['cellId'])) 
-        cell_xml = cell_xml.replace("{latitude}", str(latitude))
-        cell_xml = cell_xml.replace("{longitude}", str(longitude))
-        cell_xml = cell_xml.replace("{cellRange}", str(row['cellRange']))
-        cell_xml = cell_xml.replace("{earfcnDl}", str(row['earfcnDl']))
-        cell_xml = cell_xml.replace("{earfcnUl}", str(row['earfcnUl']))
-        cell_xml = cell_xml.replace("{dlChannelBandwidth}", str(row['dlChannelBandwidth']))
-        cell_xml = cell_xml.replace("{qRxLevMin}", str(row['qRxLevMin']))
-        cell_xml = cell_xml.replace("{PhysicalLayerCellIdGroup}", str(row['PhysicalLayerCellIdGroup']))
-        cell_xml = cell_xml.replace("{physicalLayerSubCellId}", str(row['physicalLayerSubCellId']))
-         #  # Use cellId from PCI sheet
-        
-        # Replace the {tac} placeholder with the value from the 'eNB Info' sheet
-        cell_xml = cell_xml.replace("{tac}", str(tac_value))
-        
-        cell_xml_data.append(cell_xml)
+    # Coordinates of all cells encoded at once
+    latitudes = lte_coordinates(pd.to_numeric(pd.Series([record.latitude for record in records], dtype=object),
+                                              errors='coerce'))
+    longitudes = lte_coordinates(pd.to_numeric(pd.Series([record.longitude for record in records], dtype=object),
+                                               errors='coerce'))
 
-    return "\n".join(cell_xml_data)
+    # Placeholder values per cell (template placeholder -> record field)
+    cells = [dict({placeholder: str(getattr(record, field)) for placeholder, field in LTE_CELL_PLACEHOLDERS.items()},
+                  latitude=str(latitude), longitude=str(longitude), tac=str(tac_value))
+             for record, latitude, longitude in zip(records, latitudes, longitudes)]
+
+    # One NETCONF session for all cells of the eNB
+    return cells_session(template_xml, cells)
 
 # Step 4: Generate 05_Cell_Add_MO.xml  
 def generate_cell_add_mo_xml(excel_data, enbname, template_xml):
@@ -162,77 +160,30 @@ def generate_cell_add_mo_xml(excel_data, enbname, template_xml):
     # Filter rows from the 'eUtran Parameters' sheet that match the enbname
     cell_data = sheet_data[sheet_data['eNBName'] == enbname]
 
-    # Generate XML for each row
-    cell_xml_data = []
-    for idx, row in cell_data.iterrows():
-        cell_xml = template_xml
-        
-        # Replace the placeholder {EutranCellFDDId} with actual data
-        cell_xml = cell_xml.replace("{EutranCellFDDId}", str(row['EutranCellFDDId']))
-        
-        cell_xml_data.append(cell_xml)
+    if not len(cell_data):
+        return ""
 
-    return "\n".join(cell_xml_data)
+    # One NETCONF session for all cells of the eNB
+    cells = [{'EutranCellFDDId': str(cell)} for cell in cell_data['EutranCellFDDId']]
+    return cells_session(template_xml, cells)
 
-def generate_polygon_command(row, column_mappings=None):
+def enb_polygon_data(excel_data, enbname):
     """
-    Generate the polygon command for a single row
-    Based on CIQ_LTE.xlsx format where:
-    - Corner X columns contain latitude values
-    - Unnamed: Y columns contain longitude values (paired with Corner columns)
+    Rows of the eUtranCellPolygon sheet belonging to the eNB (None when there is no polygon data)
     """
-    cell_id = row['EutranCellFDDId']
-    corners = []
-    
-    # Use provided mappings or default mappings
-    if column_mappings is None:
-        corner_mappings = [
-            ('Corner 1', 'Unnamed: 3'),
-            ('Corner 2', 'Unnamed: 5'), 
-            ('Corner 3', 'Unnamed: 7'),
-            ('Corner 4', 'Unnamed: 9'),
-            ('Corner 5', 'Unnamed: 11'),
-            ('Corner 6', 'Unnamed: 13'),
-            ('Corner 7', 'Unnamed: 15'),
-            ('Corner 8', 'Unnamed: 17'),
-            ('Corner 9', 'Unnamed: 19'),
-            ('Corner 10', 'Unnamed: 21'),
-            ('Corner 11', 'Unnamed: 23'),
-            ('Corner 12', 'Unnamed: 25'),
-            ('Corner 13', 'Unnamed: 27'),
-            ('Corner 14', 'Unnamed: 29'),
-            ('Corner 15', 'Unnamed: 31')
-        ]
-    else:
-        corner_mappings = column_mappings
-    
-    for lat_col, lon_col in corner_mappings:
-        if lat_col in row.index and lon_col in row.index:
-            lat_degree = row[lat_col]
-            lon_degree = row[lon_col]
-            
-            if pd.notna(lat_degree) and pd.notna(lon_degree) and lat_degree != '' and lon_degree != '':
-                # Convert to decimal
-                lat_decimal = convert_degree_to_decimal(lat_degree)
-                lon_decimal = convert_degree_to_decimal(lon_degree)
-                
-                if lat_decimal is not None and lon_decimal is not None:
-                    # For North American coordinates, longitude should typically be negative
-                    # If longitude is positive and appears to be North American (typical range), make it negative
-                    if lon_decimal > 0 and 60 <= lon_decimal <= 180:
-                        lon_decimal = -lon_decimal
-                    
-                    # Format for polygon using the specified calculation
-                    lat_formatted = format_coordinates(lat_decimal)
-                    lon_formatted = format_coordinates(lon_decimal)
-                    
-                    corners.append(f"cornerLatitude={lat_formatted},cornerLongitude={lon_formatted}")
-    
-    if corners:
-        corner_string = ";".join(corners)
-        return f"set EUtranCellFDD={cell_id} eutranCellPolygon {corner_string};"
-    else:
-        return f"# No valid corners found for {cell_id}"
+    if 'eUtranCellPolygon' not in excel_data:
+        return None
+    polygon_data = excel_data['eUtranCellPolygon']
+    if 'EutranCellFDDId' not in polygon_data.columns:
+        return None
+
+    if 'eUtran Parameters' in excel_data:
+        enb_cells = excel_data['eUtran Parameters'][excel_data['eUtran Parameters']['eNBName'] == enbname]['EutranCellFDDId'].values
+        return polygon_data[polygon_data['EutranCellFDDId'].isin(enb_cells)]
+    # If no eUtran Parameters sheet, try to filter by eNBName in polygon sheet
+    if 'eNBName' in polygon_data.columns:
+        return polygon_data[polygon_data['eNBName'] == enbname]
+    return polygon_data
 
 def generate_polygon_mos_file(excel_data, enbname):
     """
@@ -242,30 +193,10 @@ def generate_polygon_mos_file(excel_data, enbname):
         polygon_commands = []
         coverage_commands = []
         
-        # Generate polygon commands
-        if 'eUtranCellPolygon' in excel_data:
-            polygon_data = excel_data['eUtranCellPolygon']
-            
-            if 'EutranCellFDDId' in polygon_data.columns:
-                # Detect the correct column mapping for this file
-                column_mappings = detect_polygon_column_mapping(polygon_data)
-                
-                # Filter polygon data for the specified eNB
-                if 'eUtran Parameters' in excel_data:
-                    enb_cells = excel_data['eUtran Parameters'][excel_data['eUtran Parameters']['eNBName'] == enbname]['EutranCellFDDId'].values
-                    filtered_polygon_data = polygon_data[polygon_data['EutranCellFDDId'].isin(enb_cells)]
-                else:
-                    # If no eUtran Parameters sheet, try to filter by eNBName in polygon sheet
-                    if 'eNBName' in polygon_data.columns:
-                        filtered_polygon_data = polygon_data[polygon_data['eNBName'] == enbname]
-                    else:
-                        filtered_polygon_data = polygon_data
-                
-                # Generate polygon commands
-                for idx, row in filtered_polygon_data.iterrows():
-                    if pd.notna(row['EutranCellFDDId']) and row['EutranCellFDDId'] != '':
-                        command = generate_polygon_command(row, column_mappings)
-                        polygon_commands.append(command)
+        # Generate polygon commands (whole sheet at once, invalid polygons become comments)
+        polygon_data = enb_polygon_data(excel_data, enbname)
+        if polygon_data is not None:
+            polygon_commands = lte_polygon_commands(polygon_data, detect_polygon_column_mapping(polygon_data))
         
         # Generate coverage commands
         coverage_commands = generate_coverage_commands(excel_data, enbname)
@@ -364,74 +295,94 @@ def generate_coverage_commands(excel_data, enbname):
     except Exception as e:
         return []
 
-# Smart column detection function
-def detect_polygon_column_mapping(polygon_data):
-    """
-    Detect the correct column mapping for polygon data based on the actual columns in the file
-    """
-    columns = list(polygon_data.columns)
-    mappings = []
-    
-    # Look for Corner columns and their corresponding Unnamed columns
-    for i in range(1, 16):  # Check up to 15 corners
-        corner_col = f'Corner {i}'
-        if corner_col in columns:
-            corner_idx = columns.index(corner_col)
-            
-            # The longitude column should be the very next column after Corner
-            # and it should be an Unnamed column
-            if corner_idx + 1 < len(columns) and columns[corner_idx + 1].startswith('Unnamed:'):
-                lon_col = columns[corner_idx + 1]
-                mappings.append((corner_col, lon_col))
-    
-    return mappings
-
 # Step 5: Create ZIP file with all generated XML files
 def create_zip_file(lnr_function_xml, lte_cells_xml, cell_add_mo_xml, mo_function_xml, feature_activation_xml, polygon_mos, enbname):
     """
-    Create a ZIP file containing all generated XML files and polygon .mos file
+    Create a ZIP file containing all generated XML files and polygon .mos file.
+    mo_function_xml and feature_activation_xml may be pre-compressed static entries.
     """
-    zip_buffer = io.BytesIO()
-    
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Add each XML file to the zip
-        zip_file.writestr(f"09_{enbname}_MO_Function.xml", mo_function_xml)
-        zip_file.writestr(f"08_{enbname}_LNR_Function.xml", lnr_function_xml)
-        zip_file.writestr(f"12_{enbname}_FeatureActivation.xml", feature_activation_xml)
-        zip_file.writestr(f"10_{enbname}_LTE_Cells.xml", lte_cells_xml)
-        zip_file.writestr(f"11_{enbname}_Cell_Add_MO.xml", cell_add_mo_xml)
-        
-        # Add polygon .mos file if available
-        if polygon_mos:
-            zip_file.writestr(f"13_{enbname}_Polygon.mos", polygon_mos)
-    
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
+    entries = [
+        (f"09_{enbname}_MO_Function.xml", mo_function_xml),
+        (f"08_{enbname}_LNR_Function.xml", lnr_function_xml),
+        (f"12_{enbname}_FeatureActivation.xml", feature_activation_xml),
+        (f"10_{enbname}_LTE_Cells.xml", lte_cells_xml),
+        (f"11_{enbname}_Cell_Add_MO.xml", cell_add_mo_xml),
+    ]
+    # Add polygon .mos file if available
+    if polygon_mos:
+        entries.append((f"13_{enbname}_Polygon.mos", polygon_mos))
+    return zip_entries(entries)
 
 # Streamlit App Interface
 def main():
     st.title("XML Generator for eNB Configuration")
     
-    # Step 1: Upload the Excel File
-    uploaded_file = st.file_uploader("Upload Excel File", type=["xlsx"])
+    # Step 1: Select or upload the CIQ (shared repository)
+    ciq_entry = ciq_picker("lte", "Upload Excel File", [["eUtran Parameters", "Cluster"]])
     
-    if uploaded_file:
-        excel_data = load_excel(uploaded_file)
+    if ciq_entry:
+        ciq = load_ciq_cached(ciq_entry)
+        excel_data, ciq_issues = ciq['excel_data'], ciq['issues']
+
+        # Problems in the CIQ are reported up front instead of ending up as garbage in the XML
+        with time_generation("ciq_validation"):
+            validation_report = validate_ciq(excel_data, ciq_issues)
+        if len(validation_report):
+            error_count = int((validation_report['severity'] == ERROR).sum())
+            message = f"CIQ validation: {error_count} error(s), {len(validation_report) - error_count} warning(s)"
+            if error_count:
+                st.error(f"❌ {message}")
+            else:
+                st.warning(f"⚠️ {message}")
+            with st.expander("CIQ validation report", expanded=bool(error_count)):
+                st.dataframe(summarize_report(validation_report), hide_index=True)
+                st.dataframe(validation_report, use_container_width=True, hide_index=True)
+                st.download_button("Download Validation Report (CSV)", validation_report.to_csv(index=False),
+                                   "ciq_validation_report.csv", mime="text/csv")
+        else:
+            st.success("✅ CIQ validation passed")
         
         # Step 2: Input enbname
         enbname = st.text_input("Enter eNB Name:")
+        profiles = list_profiles() or [DEFAULT_PROFILE]
+        market_profile = st.selectbox("Market profile", profiles,
+                                      index=profiles.index(DEFAULT_PROFILE) if DEFAULT_PROFILE in profiles else 0)
         
         if enbname:
-            # Load the templates for the XML files
-            with open("/Users/wisbay/Documents/ypndev/g2l_generator/03_MO_Function.xml", 'r') as f:
-                mo_function_xml = f.read()
-                
+            # PCI/RACH conflicts with neighbour cells are checked before the bundle is emitted
+            conflicts = pci_conflicts_cached(ciq)
+            if conflicts is not None:
+                enb_report = enb_conflicts(conflicts, ciq['cell_table'], enbname)
+                if len(enb_report):
+                    st.error(f"❌ {len(enb_report)} PCI/RACH conflict(s) with neighbour cells for {enbname}")
+                    with st.expander("PCI/RACH conflict report", expanded=True):
+                        st.dataframe(enb_report, use_container_width=True, hide_index=True)
+                        st.download_button("Download Conflict Report (CSV)", enb_report.to_csv(index=False),
+                                           f"{enbname}_pci_conflicts.csv", mime="text/csv")
+                    if not st.checkbox("Generate the files anyway"):
+                        return
+
+            # Cells with empty values (e.g. no 'PCI' row) cannot be configured and are left out
+            if ciq['cell_table'] is not None:
+                missing_report = incomplete_cells(ciq['cell_table'], enbname)
+                if len(missing_report):
+                    st.error(f"❌ {len(missing_report)} cell(s) of {enbname} have empty values and are left out "
+                             f"of LTE_Cells")
+                    st.dataframe(missing_report, use_container_width=True, hide_index=True)
+                    if not st.checkbox("Generate the files without these cells"):
+                        return
+
+            # Load the templates for the XML files (MO_Function and FeatureActivation are rendered
+            # for the market profile once and kept pre-compressed)
+            mo_function_xml = template_entry("/Users/wisbay/Documents/ypndev/g2l_generator/03_MO_Function.xml",
+                                             market_profile)
+
             with open("/Users/wisbay/Documents/ypndev/g2l_generator/04_LNR_Function.xml", 'r') as f:
                 lnr_template = f.read()
                 
-            with open("/Users/wisbay/Documents/ypndev/g2l_generator/08_FeatureActivation.xml", 'r') as f:
-                feature_activation_xml = f.read()
-            
+            feature_activation_xml = template_entry("/Users/wisbay/Documents/ypndev/g2l_generator/08_FeatureActivation.xml",
+                                                    market_profile)
+
             with open("/Users/wisbay/Documents/ypndev/g2l_generator/LTE_Cells_Template.xml", 'r') as f:
                 lte_cells_template = f.read()
                 
@@ -439,12 +390,27 @@ def main():
                 cell_add_mo_template = f.read()
 
             # Step 3: Generate XML files based on the enbname
-            lnr_function_xml = generate_lnr_function_xml(enbname, excel_data, lnr_template)
-            lte_cells_xml = generate_lte_cells_xml(excel_data, enbname, lte_cells_template)
-            cell_add_mo_xml = generate_cell_add_mo_xml(excel_data, enbname, cell_add_mo_template)
-
-            # Generate polygon .mos file content
-            polygon_mos_content = generate_polygon_mos_file(excel_data, enbname)
+            # (optionally profiled with G2L_PROFILE=1 or ?profile=1, once per eNB, CIQ and market)
+            job_key = f"lte_{enbname}_{ciq_entry['sha256'][:8]}_{market_profile}"
+            with profile_once(st.session_state, job_key, profiling_enabled(st.query_params)) as profile:
+                with time_generation("lnr_function"):
+                    lnr_function_xml = generate_lnr_function_xml(enbname, excel_data, lnr_template)
+                with time_generation("lte_cells"):
+                    lte_cells_xml = generate_lte_cells_xml(excel_data, enbname, lte_cells_template, ciq['cell_table'])
+                with time_generation("cell_add_mo"):
+                    cell_add_mo_xml = generate_cell_add_mo_xml(excel_data, enbname, cell_add_mo_template)
+
+                # Generate polygon .mos file content
+                with time_generation("polygon_mos"):
+                    polygon_mos_content = generate_polygon_mos_file(excel_data, enbname)
+
+                # Create ZIP file with all XML files and polygon .mos file
+                with time_generation("zip_bundle"):
+                    zip_data = create_zip_file(lnr_function_xml, lte_cells_xml, cell_add_mo_xml, mo_function_xml, feature_activation_xml, polygon_mos_content, enbname)
+            record_zip_size("lte_bundle", len(zip_data))
+            if profile:
+                # The profile goes into the bundle, next to the generated files
+                zip_data = attach_profile(zip_data, profile)
 
             # Step 4: Display or download the generated XML files
             #st.subheader("Generated 04_LNR_Function.xml")
@@ -459,8 +425,17 @@ def main():
             else:
                 st.warning("⚠️ No polygon or coverage data found in Excel file")
 
-            # Create ZIP file with all XML files and polygon .mos file
-            zip_data = create_zip_file(lnr_function_xml, lte_cells_xml, cell_add_mo_xml, mo_function_xml, feature_activation_xml, polygon_mos_content, enbname)
+            # Polygons that were repaired (duplicates, winding) or left out as invalid
+            polygon_data = enb_polygon_data(excel_data, enbname)
+            if polygon_data is not None and len(polygon_data):
+                geometry_report = polygon_geometry_report(polygon_data, detect_polygon_column_mapping(polygon_data))
+                geometry_report = geometry_report[geometry_report['issues'] != '']
+                if len(geometry_report):
+                    invalid_count = int((~geometry_report['valid']).sum())
+                    st.warning(f"⚠️ Polygon geometry: {invalid_count} invalid polygon(s) skipped, "
+                               f"{len(geometry_report) - invalid_count} repaired")
+                    with st.expander("Polygon geometry report", expanded=bool(invalid_count)):
+                        st.dataframe(geometry_report, use_container_width=True, hide_index=True)
 
             # Option to download individual XML files
             # Option to download all files as ZIP
@@ -473,5 +448,8 @@ def main():
                 mime="application/zip"
             )
 
+            if profile:
+                st.info(f"Profiled run `{profile['run_id']}` took {profile['duration']:.2f} s (files under profile/ in the ZIP)")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from log_index import parse_log_lines
+
+# Comparison of PRE and POST health-check logs (WinFIOL logs of the scripts made by prepost_app).
+# Each log is split into command blocks (RLDEP:CELL=...;, RXMOP:MO=...; ...), the printouts are
+# parsed into (cell, command, object, attribute, value) records, volatile fields are normalized,
+# and PRE/POST records are compared per cell with a vectorized outer merge.
+
+# Command echo in WinFIOL logs, e.g. "<RLDEP:CELL=ABC1;" or "RLNRP:CELL=ABC1,CELLR=ALL,NODATA;"
+_COMMAND = re.compile(r"^\s*<?\s*([A-Z]{4,5}):([^;]*);")
+# Volatile content that differs between PRE and POST without being a regression
+VOLATILE_PATTERNS = [
+    (re.compile(r"\b\d{6}\s+\d{4}\b"), "<DATE TIME>"),    # APG printout header: 250101 1200
+    (re.compile(r"\b\d{1,2}:\d{2}(:\d{2})?\b"), "<TIME>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}\b"), "<DATE>"),
+]
+VOLATILE_ATTRIBUTES = {'DATE', 'TIME', 'DAY', 'TIMESTAMP'}
+# TG names change with the migration (RXOTG-x on the legacy BSC, RXSTG-y on the new one)
+_TG_ARG = re.compile(r"\bMO=RX[OS]TG-\w+", re.IGNORECASE)
+# TG and its subordinate MOs in printouts: RXOTG-12, RXOTRX-12-0, RXSCF-99 ...
+_TG_MO = re.compile(r"^RX[OS]([A-Z]+)-[^-\s]+")
+
+STATUS_CHANGED = "CHANGED"
+STATUS_MISSING = "MISSING_IN_POST"
+STATUS_NEW = "NEW_IN_POST"
+REGRESSION_STATUSES = (STATUS_CHANGED, STATUS_MISSING)
+
+RECORD_COLUMNS = ['cell', 'command', 'object', 'attribute', 'value']
+KEY_COLUMNS = ['cell', 'command', 'object', 'attribute']
+
+
+def normalize_value(value):
+    for pattern, replacement in VOLATILE_PATTERNS:
+        value = pattern.sub(replacement, value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def _split_commands(lines):
+    """
+    Yield (command, args, printout lines) for every command echo in a log
+    """
+    command = args = None
+    block = []
+    for line in lines:
+        match = _COMMAND.match(line)
+        if match:
+            if command is not None:
+                yield command, args, block
+            command, args, block = match.group(1), match.group(2), []
+        elif command is not None:
+            block.append(line)
+    if command is not None:
+        yield command, args, block
+
+
+def parse_hc_log(text):
+    """
+    Parse one PRE/POST log into a list of (cell, command, object, attribute, value) records
+    """
+    records = []
+    tg_records = []
+    file_cells = set()
+    for command, args, block in _split_commands(text.splitlines()):
+        arg_map = {}
+        for part in args.split(","):
+            key, _, value = part.partition("=")
+            arg_map.setdefault(key.strip().upper(), value.strip())
+        arg_cells = [cell.strip() for cell in arg_map.get('CELL', '').split("&") if cell.strip()]
+        file_cells.update(arg_cells)
+        command_key = _TG_ARG.sub("MO=<TG>", f"{command}:{args}".upper())
+        if arg_cells:
+            # Per-cell printouts: group the command key by command and the non-CELL arguments
+            command_key = command + "".join(f",{k}={v}" if v else f",{k}" for k, v in arg_map.items() if k != 'CELL' and k)
+
+        # Printouts for several cells come one cell after the other: rows without the
+        # cell name (CGI lines, ...) belong to the last cell seen
+        current_cell = arg_cells[0] if len(arg_cells) == 1 else None
+        for _, _, obj, attribute, value in parse_log_lines(block, ""):
+            if attribute.upper() in VOLATILE_ATTRIBUTES:
+                continue
+            value = normalize_value(value)
+            if not arg_cells:
+                tg_records.append((command_key, obj, attribute, value))
+                continue
+            if obj in arg_cells:
+                current_cell = obj
+            if current_cell is None:
+                continue
+            records.append((current_cell, command_key, obj, attribute, value))
+
+    # TG level printouts (RXMOP, RXMFP, ...) belong to every cell of the log
+    for cell in file_cells:
+        for command_key, obj, attribute, value in tg_records:
+            records.append((cell, command_key, _TG_MO.sub(r"RX*\1-<TG>", obj), attribute, value))
+    return records
+
+
+def _parse_named_log(item):
+    name, text = item
+    return parse_hc_log(text)
+
+
+def parse_logs(logs, max_workers=None):
+    """
+    Parse many (name, text) logs, in parallel processes when there is more than a few
+    """
+    if len(logs) <= 2:
+        results = [_parse_named_log(item) for item in logs]
+    else:
+        # Never fork the Streamlit server (its threads and locks would be copied mid-state)
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(logs), os.cpu_count() or 1),
+                                 mp_context=context) as executor:
+            results = list(executor.map(_parse_named_log, logs))
+    records = [record for result in results for record in result]
+    df = pd.DataFrame(records, columns=RECORD_COLUMNS)
+    # Repeated rows for the same key (e.g. neighbour lists) are compared as a sorted set
+    return (df.groupby(KEY_COLUMNS, sort=False)['value']
+              .agg(lambda values: " | ".join(sorted(set(values))))
+              .reset_index())
+
+
+def diff_hc_logs(pre_logs, post_logs, max_workers=None):
+    """
+    Compare PRE and POST logs; returns a DataFrame with one row per differing parameter
+    """
+    pre = parse_logs(pre_logs, max_workers)
+    post = parse_logs(post_logs, max_workers)
+    # Only cells present on both sides are compared (a PRE log may cover more cells of the site)
+    cells = set(pre['cell']) & set(post['cell'])
+    pre = pre[pre['cell'].isin(cells)]
+    post = post[post['cell'].isin(cells)]
+
+    merged = pre.merge(post, on=KEY_COLUMNS, how='outer', suffixes=('_pre', '_post'), indicator=True)
+    merged['status'] = ""
+    merged.loc[merged['_merge'] == 'left_only', 'status'] = STATUS_MISSING
+    merged.loc[merged['_merge'] == 'right_only', 'status'] = STATUS_NEW
+    both = merged['_merge'] == 'both'
+    merged.loc[both & (merged['value_pre'] != merged['value_post']), 'status'] = STATUS_CHANGED
+    report = merged[merged['status'] != ""].drop(columns='_merge')
+    report = report.assign(regression=report['status'].isin(REGRESSION_STATUSES))
+    return report.sort_values(['cell', 'command', 'object', 'attribute']).reset_index(drop=True)
+
+
+def summarize_diff(report, cells=None):
+    """
+    Per cell counts of changed / missing / new parameters
+    """
+    summary = pd.crosstab(report['cell'], report['status']) if len(report) else pd.DataFrame()
+    for status in (STATUS_CHANGED, STATUS_MISSING, STATUS_NEW):
+        if status not in summary.columns:
+            summary[status] = 0
+    if cells is not None:
+        summary = summary.reindex(sorted(cells), fill_value=0)
+    summary = summary[[STATUS_CHANGED, STATUS_MISSING, STATUS_NEW]]
+    summary['regression'] = (summary[STATUS_CHANGED] + summary[STATUS_MISSING]) > 0
+    return summary.reset_index().rename(columns={'index': 'cell'})
@@ -0,0 +1,47 @@
+import streamlit as st
+
+from hc_diff import diff_hc_logs, summarize_diff
+from metrics import time_generation
+
+
+st.title("Pre/Post HC Log Compare")
+st.divider()
+
+st.markdown('Upload the :orange[PreHC] and :green[PostHC] logs produced by the WinFIOL scripts of the Pre/Post HC Log Generator.')
+col_pre, col_post = st.columns(2)
+with col_pre:
+    pre_files = st.file_uploader("PreHC logs", type=["log", "txt"], accept_multiple_files=True)
+with col_post:
+    post_files = st.file_uploader("PostHC logs", type=["log", "txt"], accept_multiple_files=True)
+
+
+def read_logs(uploaded_files):
+    # WinFIOL logs are not always UTF-8
+    return [(f.name, f.getvalue().decode("utf-8", errors="replace")) for f in uploaded_files]
+
+
+if pre_files and post_files:
+    with st.spinner("Comparing logs..."):
+        with time_generation("hc_diff"):
+            report = diff_hc_logs(read_logs(pre_files), read_logs(post_files))
+
+    if report.empty:
+        st.success("No parameter differences between PreHC and PostHC.")
+    else:
+        summary = summarize_diff(report)
+        regressions = summary[summary['regression']]
+        if len(regressions):
+            st.error(f"{len(regressions)} of {len(summary)} cells have regressions.")
+        else:
+            st.success("No regressions, only new parameters in PostHC.")
+
+        st.subheader("Summary per cell")
+        st.dataframe(summary, hide_index=True)
+
+        st.subheader("Parameter differences")
+        only_regressions = st.checkbox("Show regressions only", value=True)
+        shown = report[report['regression']] if only_regressions else report
+        st.dataframe(shown, hide_index=True)
+        st.download_button("Download Report (CSV)", report.to_csv(index=False), file_name="prepost_hc_diff.csv", mime="text/csv")
+else:
+    st.warning("Please upload both PreHC and PostHC logs.")
@@ -0,0 +1,281 @@
+import gzip
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from file_catalog import LOG_FOLDERS, query_files, sync_folder
+
+# Parsed index over the contents of the FTP log folders.
+# MO dumps (moshell get/kget output) and APG printouts (ALLIP and other listings) are
+# stream-parsed line by line into a SQLite table keyed by node, MO class, MO and
+# attribute, so "which dump holds this cell's parameter" is a single indexed query.
+# Only files that changed since the last run are (re)parsed; gzip'ed dumps are read as well.
+
+INDEX_DB = os.environ.get("G2L_LOG_INDEX_DB", "log_index.sqlite")
+INDEX_INTERVAL = float(os.environ.get("G2L_LOG_INDEX_INTERVAL", "600"))  # seconds
+INDEX_FOLDERS = ['bscallip', 'migration', 'rbsdump', 'ModumpRNC']
+BATCH_SIZE = 5000
+
+# moshell "get" table row: <MO> <attribute> <value>
+_GET_ROW = re.compile(r"^((?:[A-Za-z][\w-]*=[^,\s]+,)*[A-Za-z][\w-]*=[^,\s]+)\s+([A-Za-z]\w*)\s+(.*?)\s*$")
+# kget block header: "MO <ldn>" followed by "<attribute> <value>" rows
+_KGET_MO = re.compile(r"^MO\s+((?:[A-Za-z][\w-]*=[^,\s]+,)*[A-Za-z][\w-]*=[^,\s]+)\s*$")
+_KGET_ATTR = re.compile(r"^\s*([A-Za-z]\w*)\s+(.*?)\s*$")
+# moshell prompt "RNC01> get ..." gives the node name
+_PROMPT = re.compile(r"^([A-Za-z0-9_-]+)>\s")
+# APG printout header line: only upper case words, e.g. "MO  RSITE  CLASS"
+_PRINTOUT_HEADER = re.compile(r"^[A-Z][A-Z0-9_/-]*(\s+[A-Z][A-Z0-9_/-]*)+\s*$")
+# Alarm/printout header with quoted node name: A1/EXT "BSC01" 123 240101 1200
+_APG_NODE = re.compile(r'^\S+\s+"([^"\s]+)')
+
+_local = threading.local()
+_lock = threading.Lock()
+_indexer = None
+
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(INDEX_DB, timeout=60)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS log_files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                node TEXT,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS log_values (
+                file_id INTEGER NOT NULL,
+                node TEXT,
+                mo_class TEXT,
+                mo TEXT,
+                attribute TEXT,
+                value TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_values_node ON log_values (node, mo_class, attribute);
+            CREATE INDEX IF NOT EXISTS idx_values_class ON log_values (mo_class, attribute);
+            CREATE INDEX IF NOT EXISTS idx_values_mo ON log_values (mo);
+            CREATE INDEX IF NOT EXISTS idx_values_file ON log_values (file_id);
+        """)
+        _local.conn = conn
+    return conn
+
+
+def _open_log(file_path):
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rt", encoding="utf-8", errors="replace")
+    return open(file_path, "r", encoding="utf-8", errors="replace")
+
+
+def node_from_file_name(name):
+    """
+    Dump files are named <NODE>_<something>.log; use the first token as node name
+    """
+    base = os.path.basename(name)
+    return re.split(r"[_.\s]", base, maxsplit=1)[0]
+
+
+def mo_class_of(mo):
+    """
+    Class of the last RDN: 'ManagedElement=1,...,UtranCell=ABC' -> 'UtranCell'
+    """
+    last = mo.rsplit(",", 1)[-1]
+    return last.split("=", 1)[0]
+
+
+def _aligned(line, header):
+    """
+    A printout data row has no text running across the start of a header column
+    """
+    for _, start in header[1:]:
+        if start < len(line) and start > 0 and not line[start - 1].isspace():
+            return False
+    return True
+
+
+def parse_log_lines(lines, default_node):
+    """
+    Stream-parse dump/printout lines into (node, mo_class, mo, attribute, value) tuples
+    """
+    node = default_node
+    kget_mo = None
+    header = None  # (columns, start positions) of the current printout table
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        stripped = line.strip()
+
+        prompt = _PROMPT.match(line)
+        if prompt:
+            node = prompt.group(1)
+            kget_mo = header = None
+            continue
+        if not stripped:
+            kget_mo = header = None
+            continue
+
+        match = _KGET_MO.match(stripped)
+        if match:
+            kget_mo = match.group(1)
+            header = None
+            continue
+        if kget_mo is not None and not stripped.startswith(("=", "-", ">>>")):
+            match = _KGET_ATTR.match(line)
+            if match:
+                yield node, mo_class_of(kget_mo), kget_mo, match.group(1), match.group(2)
+                continue
+
+        match = _GET_ROW.match(stripped)
+        if match:
+            mo = match.group(1)
+            yield node, mo_class_of(mo), mo, match.group(2), match.group(3)
+            continue
+
+        match = _APG_NODE.match(stripped)
+        if match and header is None:
+            node = match.group(1)
+            continue
+
+        if header is None or not _aligned(line, header):
+            if _PRINTOUT_HEADER.match(line):
+                header = [(m.group(0), m.start()) for m in re.finditer(r"\S+", line)]
+            continue
+        # Printout data row: cut values at the header column positions
+        values = []
+        for i, (column, start) in enumerate(header):
+            end = header[i + 1][1] if i + 1 < len(header) else None
+            values.append((column, line[start:end].strip()))
+        mo = values[0][1]
+        if not mo:
+            continue
+        mo_class = re.match(r"[A-Za-z]*", mo).group(0) or header[0][0]
+        for column, value in values[1:]:
+            if value:
+                yield node, mo_class, mo, column, value
+
+
+def index_file(file_path):
+    """
+    (Re)parse one log file into the index. Returns the number of indexed values.
+    """
+    conn = _connect()
+    stat = os.stat(file_path)
+    node = node_from_file_name(file_path)
+    # Parse before opening the write transaction, so searches and other writers are
+    # only blocked for the inserts, not for reading and parsing the dump
+    with _open_log(file_path) as f:
+        records = list(parse_log_lines(f, node))
+    with conn:
+        row = conn.execute("SELECT id FROM log_files WHERE path = ?", (file_path,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM log_values WHERE file_id = ?", (row[0],))
+            conn.execute("UPDATE log_files SET size = ?, mtime = ?, node = ?, indexed_at = ? WHERE id = ?",
+                         (stat.st_size, stat.st_mtime, node, time.time(), row[0]))
+            file_id = row[0]
+        else:
+            file_id = conn.execute("INSERT INTO log_files (path, size, mtime, node, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                                   (file_path, stat.st_size, stat.st_mtime, node, time.time())).lastrowid
+        for start in range(0, len(records), BATCH_SIZE):
+            conn.executemany("INSERT INTO log_values VALUES (?, ?, ?, ?, ?, ?)",
+                             ((file_id,) + record for record in records[start:start + BATCH_SIZE]))
+    return len(records)
+
+
+def index_folder(folder_path):
+    """
+    Index new/changed files of a folder and drop files that disappeared
+    """
+    conn = _connect()
+    sync_folder(folder_path)
+    files, _ = query_files(folder_path)
+    folder_path = os.path.abspath(folder_path)
+    prefix = folder_path + os.sep
+    known = {path: (size, mtime) for path, size, mtime in
+             conn.execute("SELECT path, size, mtime FROM log_files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))}
+    indexed = 0
+    current = set()
+    for file_data in files:
+        file_path = os.path.join(folder_path, file_data['name'])
+        current.add(file_path)
+        if known.get(file_path) == (file_data['size'], file_data['mtime']):
+            continue
+        try:
+            index_file(file_path)
+            indexed += 1
+        except OSError:
+            continue  # removed or unreadable while indexing
+    with conn:
+        for path in known.keys() - current:
+            file_id = conn.execute("SELECT id FROM log_files WHERE path = ?", (path,)).fetchone()[0]
+            conn.execute("DELETE FROM log_values WHERE file_id = ?", (file_id,))
+            conn.execute("DELETE FROM log_files WHERE id = ?", (file_id,))
+    return indexed
+
+
+def index_all():
+    indexed = 0
+    for key in INDEX_FOLDERS:
+        folder_path = LOG_FOLDERS.get(key)
+        if folder_path and os.path.isdir(folder_path):
+            indexed += index_folder(folder_path)
+    return indexed
+
+
+def search_values(node="", mo_class="", attribute="", mo="", value="", limit=1000):
+    """
+    Search the index; empty filters are ignored. node/mo_class/attribute match exactly,
+    mo and value match as substrings. Returns a list of dicts (newest dumps first).
+    """
+    where = []
+    params = []
+    for column, term in (("v.node", node), ("v.mo_class", mo_class), ("v.attribute", attribute)):
+        if term:
+            where.append(f"{column} = ?")
+            params.append(term)
+    for column, term in (("v.mo", mo), ("v.value", value)):
+        if term:
+            # Substring match on the literal term: escape the LIKE wildcards % and _
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+    sql = ("SELECT v.node, v.mo_class, v.mo, v.attribute, v.value, f.path, f.mtime "
+           "FROM log_values v JOIN log_files f ON f.id = v.file_id")
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY f.mtime DESC LIMIT ?"
+    params.append(limit)
+    columns = ['node', 'mo_class', 'mo', 'attribute', 'value', 'file', 'mtime']
+    return [dict(zip(columns, row)) for row in _connect().execute(sql, params)]
+
+
+def index_stats():
+    conn = _connect()
+    files = conn.execute("SELECT COUNT(*), MAX(indexed_at) FROM log_files").fetchone()
+    values = conn.execute("SELECT COUNT(*) FROM log_values").fetchone()[0]
+    return {'files': files[0], 'values': values, 'last_indexed': files[1]}
+
+
+def _indexer_loop(interval):
+    while True:
+        try:
+            index_all()
+        except Exception as e:
+            print(f"Log indexing failed: {e}")
+        time.sleep(interval)
+
+
+def start_log_indexer(interval=INDEX_INTERVAL):
+    """
+    Start the background ingestion thread once per process (safe to call on every rerun)
+    """
+    global _indexer
+    with _lock:
+        if _indexer is None:
+            _indexer = threading.Thread(target=_indexer_loop, args=(interval,), name="log-indexer", daemon=True)
+            _indexer.start()
+    return _indexer
@@ -0,0 +1,49 @@
+import streamlit as st
+import pandas as pd
+
+from file_catalog import format_mtime
+from log_index import index_all, index_stats, search_values, start_log_indexer
+
+
+st.title("Log Search")
+st.divider()
+
+start_log_indexer()
+
+stats = index_stats()
+last_indexed = format_mtime(stats['last_indexed']) if stats['last_indexed'] else "never"
+st.caption(f"{stats['files']} dumps, {stats['values']} values indexed (last update: {last_indexed})")
+
+if st.button("Index new dumps now"):
+    with st.spinner("Indexing..."):
+        indexed = index_all()
+    st.success(f"{indexed} files (re)indexed.")
+
+st.markdown('Search MO dumps and Allip printouts by :red["Node"], :red["MO Class"] and :red["Attribute"].')
+col1, col2, col3 = st.columns(3)
+with col1:
+    node = st.text_input("Node (exact)", "").strip()
+with col2:
+    mo_class = st.text_input("MO Class (exact), e.g. UtranCell", "").strip()
+with col3:
+    attribute = st.text_input("Attribute (exact), e.g. primaryScramblingCode", "").strip()
+col4, col5, col6 = st.columns(3)
+with col4:
+    mo = st.text_input("MO contains, e.g. cell name", "").strip()
+with col5:
+    value = st.text_input("Value contains", "").strip()
+with col6:
+    limit = st.number_input("Max rows", min_value=10, max_value=100000, value=1000, step=100)
+
+if any([node, mo_class, attribute, mo, value]):
+    results = search_values(node, mo_class, attribute, mo, value, limit=int(limit))
+    if results:
+        df = pd.DataFrame(results)
+        df['mtime'] = df['mtime'].map(format_mtime)
+        df.columns = ['Node', 'MO Class', 'MO', 'Attribute', 'Value', 'File', 'Date Modified']
+        st.dataframe(df, hide_index=True)
+        st.download_button("Download Result (CSV)", df.to_csv(index=False), file_name="log_search.csv", mime="text/csv")
+    else:
+        st.warning("No matching values in the indexed dumps.")
+else:
+    st.info("Enter at least one search filter.")
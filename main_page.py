@@ -1,22 +1,35 @@
 import streamlit as st
 
+from metrics import record_page_view, start_metrics_server
+
 
 g2l_generator = st.Page("g2l_st.py", title="GSM To LTE Script Generator", icon="⚙️")
 lte_script_generator = st.Page("generateLTE.py", title="Generate LTE Script", icon="📝")
 prepost_hc = st.Page("prepost_st.py", title="Pre/Post HC Log Generator", icon="🩺")
+prepost_diff = st.Page("hc_diff_st.py", title="Pre/Post HC Log Compare", icon="🔍")
 polygon_app = st.Page("polygon_app.py", title="Polygon Converter", icon="✴️")
 modump_downloader = st.Page("getlistfile.py", title="RNC Modump Sunset", icon="🔽")
 allip_downloader = st.Page("allip.py", title="Allip BSC", icon="🔽")
 migration = st.Page("migration.py", title="Migration Modump", icon="🔽")
 rbsdump = st.Page("rbsdump.py", title="RBS Modump Sunset", icon="🔽")
+log_search = st.Page("log_search.py", title="Log Search", icon="🔎")
 
 pg = st.navigation(
     {
-        "2G Migration" : [g2l_generator, prepost_hc],
+        "2G Migration" : [g2l_generator, prepost_hc, prepost_diff],
         "3G Migration" : [polygon_app],
-        "4G Scripting" : [lte_script_generator]
+        "4G Scripting" : [lte_script_generator],
+        "Logs" : [log_search]
         #"Downloader" : [allip_downloader, migration, modump_downloader, rbsdump]
     }
 )
 st.set_page_config(page_title="IRS Migration Tools", page_icon="🛡", layout="wide")
+
+# Prometheus metrics endpoint (started once per process)
+start_metrics_server()
+# One view per navigation in a session, not per rerun (every widget interaction reruns)
+if st.session_state.get('metrics_page') != pg.title:
+    st.session_state['metrics_page'] = pg.title
+    record_page_view(pg.title)
+
 pg.run()
\ No newline at end of file
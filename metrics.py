@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus-style metrics for the generator service.
+# Metrics live in this module (Streamlit keeps imported modules alive between reruns),
+# and are exposed in Prometheus text format from a small HTTP endpoint next to Streamlit.
+
+METRICS_HOST = os.environ.get("G2L_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("G2L_METRICS_PORT", "9108"))
+
+# Buckets in seconds for latency histograms
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Buckets in bytes for upload and ZIP size histograms (1 KB .. 256 MB)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(10))
+RECORDED_UPLOADS = 1000  # upload file ids remembered to count each upload once
+
+_lock = threading.Lock()
+_metric_info = {}  # name -> (type, help)
+_counters = {}     # (name, labels) -> value
+_histograms = {}   # (name, labels) -> {'buckets': tuple, 'counts': list, 'sum': float, 'count': int}
+_server = None
+_recorded_uploads = {}  # file_id -> None, insertion ordered (uploads already counted)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key, extra=None):
+    pairs = list(label_key) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = []
+    for key, value in pairs:
+        value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def inc_counter(name, help_text, value=1, **labels):
+    """
+    Increase a counter metric by value
+    """
+    key = (name, _label_key(labels))
+    with _lock:
+        _metric_info.setdefault(name, ("counter", help_text))
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, help_text, value, buckets=LATENCY_BUCKETS, **labels):
+    """
+    Record one observation in a histogram metric
+    """
+    key = (name, _label_key(labels))
+    with _lock:
+        _metric_info.setdefault(name, ("histogram", help_text))
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = {'buckets': tuple(buckets), 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            _histograms[key] = hist
+        for i, bound in enumerate(hist['buckets']):
+            if value <= bound:
+                hist['counts'][i] += 1
+        hist['sum'] += value
+        hist['count'] += 1
+
+
+@contextmanager
+def time_block(name, help_text, **labels):
+    """
+    Measure the duration of a with-block into a latency histogram
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, help_text, time.perf_counter() - start, LATENCY_BUCKETS, **labels)
+
+
+# Helpers used by the pages so metric names stay consistent
+def record_page_view(page):
+    inc_counter("g2l_page_views_total", "Number of page views (navigations to the page) per page.", page=page)
+
+
+def record_upload(page, uploaded_file):
+    if uploaded_file is None:
+        return
+    # Pages call this on every rerun; a Streamlit file_id is unique per upload and session
+    with _lock:
+        if uploaded_file.file_id in _recorded_uploads:
+            return
+        _recorded_uploads[uploaded_file.file_id] = None
+        if len(_recorded_uploads) > RECORDED_UPLOADS:
+            del _recorded_uploads[next(iter(_recorded_uploads))]
+    observe("g2l_upload_size_bytes", "Size of uploaded CIQ files in bytes.", uploaded_file.size, SIZE_BUCKETS, page=page)
+
+
+def time_sheet_parse(sheet):
+    return time_block("g2l_sheet_parse_seconds", "Time spent parsing a workbook sheet.", sheet=sheet)
+
+
+def time_generation(generator):
+    return time_block("g2l_generation_seconds", "Time spent in a script/XML generator.", generator=generator)
+
+
+def record_zip_size(generator, size):
+    observe("g2l_zip_size_bytes", "Size of generated ZIP bundles in bytes.", size, SIZE_BUCKETS, generator=generator)
+
+
+def record_cache_access(cache, hit):
+    inc_counter("g2l_cache_requests_total", "Cache lookups by cache and result (hit/miss).", cache=cache, result="hit" if hit else "miss")
+
+
+def process_rss_bytes():
+    """
+    Resident set size of this process in bytes
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        return rss_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Non-Linux fallback: peak RSS (KB on Linux, bytes on macOS)
+        import resource
+        import sys
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def render_metrics():
+    """
+    Render all metrics in Prometheus text exposition format
+    """
+    lines = []
+    with _lock:
+        for name, (metric_type, help_text) in sorted(_metric_info.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "counter":
+                for (metric_name, label_key), value in sorted(_counters.items()):
+                    if metric_name == name:
+                        lines.append(f"{name}{_format_labels(label_key)} {value}")
+            else:
+                for (metric_name, label_key), hist in sorted(_histograms.items()):
+                    if metric_name != name:
+                        continue
+                    for bound, count in zip(hist['buckets'], hist['counts']):
+                        lines.append(f"{name}_bucket{_format_labels(label_key, [('le', repr(float(bound)))])} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(label_key, [('le', '+Inf')])} {hist['count']}")
+                    lines.append(f"{name}_sum{_format_labels(label_key)} {hist['sum']}")
+                    lines.append(f"{name}_count{_format_labels(label_key)} {hist['count']}")
+
+    lines.append("# HELP process_resident_memory_bytes Resident memory size in bytes.")
+    lines.append("# TYPE process_resident_memory_bytes gauge")
+    lines.append(f"process_resident_memory_bytes {process_rss_bytes()}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrape requests out of the PM2 logs
+        pass
+
+
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """
+    Start the /metrics HTTP endpoint once per process (safe to call on every rerun)
+    """
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            # Port already taken (e.g. a second Streamlit process): keep serving the app
+            print(f"Metrics endpoint not started on {host}:{port}: {e}")
+            _server = False
+            return _server
+        thread = threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+    return _server
@@ -0,0 +1,136 @@
+import functools
+import hashlib
+import json
+import os
+import re
+
+from zip_bundle import STATIC_LEVEL, deflate
+
+# 03_MO_Function.xml and 08_FeatureActivation.xml built from a skeleton and a per-market
+# profile (JSON in MARKET_PROFILE_DIR). The skeletons keep everything that is the same in
+# every market; their {geran_frequencies} / {feature_states} lines are filled from the
+# profile tables:
+#   "geran": {"groups": [{"id": "GSM850", "frequencyGroupId": 1}],
+#             "frequencies": [{"arfcns": "129-132,157", "bandIndicator": "DCS_1800", "group": "GSM850"}]}
+#   "features": {"ACTIVATED": ["CXC4010319", ...], "UNCHANGED": ["CXC4010953", ...]}
+# Profiles are cached by content hash and every rendered template is kept as a ready
+# DEFLATE entry per (skeleton version, profile hash).
+
+MARKET_PROFILE_DIR = os.environ.get("G2L_MARKET_PROFILE_DIR", "market_profiles")
+DEFAULT_PROFILE = "default"
+UNCHANGED = "UNCHANGED"  # FeatureState created without a featureState value
+PLACEHOLDER_LINE = re.compile(r"^([ \t]*)\{(geran_frequencies|feature_states)\}$", re.MULTILINE)
+GERAN_GROUP_REF = "ManagedElement=1,ENodeBFunction=1,GeraNetwork=1,GeranFreqGroup={}"
+
+_profiles = {}  # profile hash -> parsed profile
+
+
+def list_profiles(profile_dir=MARKET_PROFILE_DIR):
+    """
+    Names of the market profiles (JSON files) in profile_dir
+    """
+    if not os.path.isdir(profile_dir):
+        return []
+    return sorted(name[:-5] for name in os.listdir(profile_dir) if name.endswith('.json'))
+
+
+def load_profile(name, profile_dir=MARKET_PROFILE_DIR):
+    """
+    Hash of the market profile's content; the parsed profile is kept under it (profile(hash))
+    """
+    with open(os.path.join(profile_dir, f"{name}.json"), 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest not in _profiles:
+        _profiles[digest] = json.loads(raw)
+    return digest
+
+
+def profile(digest):
+    return _profiles[digest]
+
+
+def arfcn_list(spec):
+    """
+    ARFCNs of a range list such as "129-132,157,233-239"
+    """
+    arfcns = []
+    for part in str(spec).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        arfcns.extend(range(int(first), int(last or first) + 1))
+    return arfcns
+
+
+def _element(indent, name, children):
+    """
+    Lines of one MO with leaf children ((name, value) pairs), one indent level per depth
+    """
+    unit = "\t" if "\t" in indent else "  "
+    lines = [f"{indent}<{name}>"]
+    lines += [f"{indent}{unit}<{leaf}>{value}</{leaf}>" for leaf, value in children]
+    lines.append(f"{indent}</{name}>")
+    return lines
+
+
+def geran_frequencies(market, indent):
+    """
+    GeranFreqGroup and GeranFrequency MOs of the profile's geran table
+    """
+    geran = market.get('geran', {})
+    lines = []
+    for group in geran.get('groups', []):
+        lines += _element(indent, 'GeranFreqGroup', [('geranFreqGroupId', group['id']),
+                                                     ('frequencyGroupId', group['frequencyGroupId'])])
+    for frequencies in geran.get('frequencies', []):
+        group_ref = GERAN_GROUP_REF.format(frequencies['group'])
+        for arfcn in arfcn_list(frequencies['arfcns']):
+            lines += _element(indent, 'GeranFrequency', [('geranFrequencyId', arfcn),
+                                                         ('bandIndicator', frequencies['bandIndicator']),
+                                                         ('arfcnValueGeranDl', arfcn),
+                                                         ('geranFreqGroupRef', group_ref)])
+    return lines
+
+
+def feature_states(market, indent):
+    """
+    FeatureState MOs of the profile's features table (state -> feature ids), ordered by id
+    """
+    states = {feature: state for state, features in market.get('features', {}).items() for feature in features}
+    lines = []
+    for feature in sorted(states):
+        children = [('featureStateId', feature)]
+        if states[feature] != UNCHANGED:
+            children.append(('featureState', states[feature]))
+        lines += _element(indent, 'FeatureState', children)
+    return lines
+
+
+BLOCKS = {'geran_frequencies': geran_frequencies, 'feature_states': feature_states}
+
+
+def render(skeleton, market):
+    """
+    The skeleton with its placeholder lines replaced by the market's MOs
+    (a skeleton without placeholders is returned unchanged)
+    """
+    return PLACEHOLDER_LINE.sub(lambda match: "\n".join(BLOCKS[match.group(2)](market, match.group(1))), skeleton)
+
+
+@functools.lru_cache(maxsize=32)
+def _template_entry(path, mtime_ns, size, digest):
+    # Text mode, as the templates were always read (CRLF files end up with LF)
+    with open(path, 'r') as f:
+        return deflate(render(f.read(), profile(digest)), STATIC_LEVEL)
+
+
+def template_entry(path, profile_name=DEFAULT_PROFILE, profile_dir=MARKET_PROFILE_DIR):
+    """
+    Pre-compressed ZIP entry of a template skeleton rendered for a market profile,
+    re-rendered only when the skeleton or the profile content changes
+    """
+    digest = load_profile(profile_name, profile_dir)
+    stat = os.stat(path)
+    return _template_entry(path, stat.st_mtime_ns, stat.st_size, digest)
@@ -0,0 +1,160 @@
+import functools
+import io
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import XMLGenerator, escape
+
+# NETCONF output builder for the per-cell templates (LTE_Cells_Template.xml,
+# 05_Cell_Add_MO_Template.xml). A template is one complete NETCONF session for one cell;
+# it is parsed once and only its MOs under ENodeBFunction are kept, pre-rendered as one
+# compact fragment with the {placeholders} left in. The builder writes one session per eNB
+# (one hello, edit-config RPCs carrying BATCH_CELLS cells each, one close-session) through
+# an incremental XML writer; per cell only the XML-escaped values are substituted.
+
+NETCONF_NS = "urn:ietf:params:xml:ns:netconf:base:1.0"
+BASE_CAPABILITY = "urn:ietf:params:netconf:base:1.0"
+COM_TOP_NS = "urn:com:ericsson:ecim:ComTop"
+LRAT_NS = "urn:com:ericsson:ecim:Lrat"
+FRAME_END = "]]>]]>"
+BATCH_CELLS = 64  # cells per edit-config RPC
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+@functools.lru_cache(maxsize=8)
+def template_mos(template_xml):
+    """
+    The MO elements under ENodeBFunction (except eNodeBFunctionId) of the template's
+    edit-config, in template order
+    """
+    for frame in template_xml.split(FRAME_END):
+        if "<edit-config" not in frame:
+            continue
+        # Drop the XML declaration that precedes the first frame's root, if any
+        frame = re.sub(r"^\s*<\?xml[^>]*\?>", "", frame)
+        rpc = ET.fromstring(frame.strip())
+        for element in rpc.iter():
+            if _local(element.tag) == 'ENodeBFunction':
+                return tuple(child for child in element if _local(child.tag) != 'eNodeBFunctionId')
+    raise ValueError("template has no edit-config with an ENodeBFunction")
+
+
+@functools.lru_cache(maxsize=8)
+def template_fragment(template_xml):
+    """
+    The template MOs rendered once as compact XML, placeholders unfilled
+    """
+    out = io.StringIO()
+    writer = NetconfWriter(out)
+    for mo in template_mos(template_xml):
+        writer.element(mo, {})
+    return out.getvalue()
+
+
+def fill(text, values):
+    """
+    Replace {name} placeholders with values[name] (unknown placeholders are kept)
+    """
+    if not text or '{' not in text:
+        return text
+    return PLACEHOLDER.sub(lambda match: values.get(match.group(1), match.group(0)), text)
+
+
+class NetconfWriter:
+    """
+    Incremental writer of one NETCONF 1.0 session to a text stream
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.xml = XMLGenerator(out, encoding="UTF-8", short_empty_elements=True)
+        self.message_id = 0
+
+    def _frame_end(self):
+        self.out.write(f"\n{FRAME_END}\n")
+
+    def _leaf(self, name, text):
+        self.xml.startElement(name, {})
+        self.xml.characters(text)
+        self.xml.endElement(name)
+
+    def hello(self):
+        self.xml.startDocument()
+        self.xml.startElement('hello', {'xmlns': NETCONF_NS})
+        self.xml.startElement('capabilities', {})
+        self._leaf('capability', BASE_CAPABILITY)
+        self.xml.endElement('capabilities')
+        self.xml.endElement('hello')
+        self._frame_end()
+
+    def start_edit_config(self):
+        self.message_id += 1
+        self.xml.startElement('rpc', {'message-id': str(self.message_id), 'xmlns': NETCONF_NS})
+        self.xml.startElement('edit-config', {})
+        self.xml.startElement('target', {})
+        self.xml.startElement('running', {})
+        self.xml.endElement('running')
+        self.xml.endElement('target')
+        self.xml.startElement('config', {'xmlns:xc': NETCONF_NS})
+        self.xml.startElement('ManagedElement', {'xmlns': COM_TOP_NS})
+        self._leaf('managedElementId', "1")
+        self.xml.startElement('ENodeBFunction', {'xmlns': LRAT_NS})
+        self._leaf('eNodeBFunctionId', "1")
+
+    def element(self, element, values):
+        """
+        Write a template element (and its subtree) with its placeholders filled from values
+        """
+        self.xml.startElement(_local(element.tag), {name: fill(value, values) for name, value in element.attrib.items()})
+        if len(element):
+            for child in element:
+                self.element(child, values)
+        elif element.text:
+            self.xml.characters(fill(element.text, values))
+        self.xml.endElement(_local(element.tag))
+
+    def fragment(self, fragment, values):
+        """
+        Write a pre-rendered fragment with its placeholders filled from values (escaped here)
+        """
+        self.xml.ignorableWhitespace("\n")
+        self.out.write(fill(fragment, {name: escape(value, {'"': "&quot;"}) for name, value in values.items()}))
+
+    def end_edit_config(self):
+        for name in ('ENodeBFunction', 'ManagedElement', 'config', 'edit-config', 'rpc'):
+            self.xml.endElement(name)
+        self._frame_end()
+
+    def close_session(self):
+        self.xml.startElement('rpc', {'message-id': "Closing", 'xmlns': NETCONF_NS})
+        self.xml.startElement('close-session', {})
+        self.xml.endElement('close-session')
+        self.xml.endElement('rpc')
+        self._frame_end()
+
+
+def write_cells_session(out, template_xml, cells, batch_cells=BATCH_CELLS):
+    """
+    Write one NETCONF session for all cells (dicts of placeholder values) to out
+    """
+    fragment = template_fragment(template_xml)
+    writer = NetconfWriter(out)
+    writer.hello()
+    for start in range(0, len(cells), batch_cells):
+        writer.start_edit_config()
+        for values in cells[start:start + batch_cells]:
+            writer.fragment(fragment, values)
+        writer.end_edit_config()
+    writer.close_session()
+
+
+def cells_session(template_xml, cells, batch_cells=BATCH_CELLS):
+    """
+    write_cells_session into a string
+    """
+    out = io.StringIO()
+    write_cells_session(out, template_xml, cells, batch_cells)
+    return out.getvalue()
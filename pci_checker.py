@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from polygon_engine import signed_longitudes
+from spatial_index import SiteIndex
+
+# PCI and RACH root sequence conflict checks over the whole CIQ cell table.
+# Neighbours are the cells on the same earfcnDl among the NEIGHBOURS nearest cells within
+# NEIGHBOUR_DISTANCE (co-sited cells are always included). The graph is one edge list
+# (numpy arrays), every check is a vectorized pass over it:
+# - collision: two neighbours with the same PCI
+# - confusion: a cell with two neighbours that share a PCI (handover target ambiguity)
+# - rach: neighbours whose root sequence ranges overlap (preamble ambiguity)
+
+NEIGHBOUR_DISTANCE = 5000  # meters
+NEIGHBOURS = 24
+DEFAULT_CELL_RANGE = 15  # km
+ROOT_SEQUENCES = 838  # logical root sequences 0..837 (preamble formats 0-3)
+
+# PRACH cyclic shifts (Ncs, unrestricted set, 3GPP TS 36.211 table 5.7.2-2)
+CYCLIC_SHIFTS = np.array([13, 15, 18, 22, 26, 32, 38, 46, 59, 76, 93, 119, 167, 279, 419, 839])
+SAMPLE_TIME = 1 / (839 * 1250)  # seconds per preamble sample (1.25 kHz subcarriers)
+DELAY_SPREAD = 5.2e-6  # seconds
+SPEED_OF_LIGHT = 299792458.0
+
+REQUIRED_COLUMNS = ['EutranCellFDDId', 'eNBName', 'latitude', 'longitude', 'earfcnDl', 'PhysicalLayerCellIdGroup',
+                    'physicalLayerSubCellId', 'rachRootSequence']
+CONFLICT_COLUMNS = ['conflict', 'EutranCellFDDId', 'neighbour', 'via', 'earfcnDl', 'PCI', 'rachRootSequence',
+                    'distance_m']
+
+
+def root_sequences_per_cell(cell_range_km):
+    """
+    Consecutive root sequences a cell uses for its 64 preambles: the cyclic shift has to
+    cover the round trip at the cell range plus the delay spread
+    """
+    cell_range = np.where(np.isnan(cell_range_km), DEFAULT_CELL_RANGE, cell_range_km) * 1000
+    needed = (2 * cell_range / SPEED_OF_LIGHT + DELAY_SPREAD) / SAMPLE_TIME + 2
+    ncs = CYCLIC_SHIFTS[np.minimum(np.searchsorted(CYCLIC_SHIFTS, needed), len(CYCLIC_SHIFTS) - 1)]
+    return np.ceil(64 / (839 // ncs)).astype(np.int64)
+
+
+def _numbers(series):
+    return pd.to_numeric(series.astype(object), errors='coerce').to_numpy(dtype=float)
+
+
+def cell_identities(cell_table):
+    """
+    Per cell: id, eNB, site, earfcnDl, PCI (3 x group + sub cell, as written to the XML),
+    rachRootSequence and the number of root sequences it uses
+    """
+    group = _numbers(cell_table['PhysicalLayerCellIdGroup'])
+    sub_cell = _numbers(cell_table['physicalLayerSubCellId'])
+    cell_range = _numbers(cell_table['cellRange']) if 'cellRange' in cell_table.columns else np.full(len(group), np.nan)
+    return pd.DataFrame({
+        'EutranCellFDDId': cell_table['EutranCellFDDId'].astype(str).to_numpy(),
+        # Missing names stay NaN (not 'nan'), so those cells are not taken for one site
+        'eNBName': cell_table['eNBName'].astype(str).where(cell_table['eNBName'].notna()).to_numpy(dtype=object),
+        'latitude': _numbers(cell_table['latitude']),
+        'longitude': signed_longitudes(_numbers(cell_table['longitude'])),
+        'earfcnDl': _numbers(cell_table['earfcnDl']),
+        'PCI': 3 * group + sub_cell,
+        'rachRootSequence': _numbers(cell_table['rachRootSequence']),
+        'rootSequences': root_sequences_per_cell(cell_range),
+    })
+
+
+def neighbour_graph(cells, max_distance=NEIGHBOUR_DISTANCE, neighbours=NEIGHBOURS):
+    """
+    Directed neighbour edges (source, target, distance) between cells on the same earfcnDl.
+    Every undirected pair appears in both directions.
+    """
+    index = SiteIndex(cells['latitude'].to_numpy(), cells['longitude'].to_numpy())
+    # One extra candidate: a cell is its own nearest neighbour
+    nearest, distances = index.nearest(cells['latitude'].to_numpy(), cells['longitude'].to_numpy(), neighbours + 1,
+                                       max_distance)
+    source = np.repeat(np.arange(len(cells)), nearest.shape[1])
+    target = nearest.ravel()
+    distance = distances.ravel()
+
+    # Cells of the same eNB are neighbours whatever their coordinates say (cells without an
+    # eNB name only get their geographic neighbours)
+    named = np.flatnonzero(cells['eNBName'].notna().to_numpy())
+    enb = cells['eNBName'].to_numpy()
+    order = named[np.argsort(enb[named].astype(str), kind='stable')]
+    _, starts, counts = np.unique(enb[order], return_index=True, return_counts=True)
+    sizes = np.repeat(counts, counts)
+    first = np.repeat(starts, counts)
+    co_source = np.repeat(order, sizes)
+    co_target = order[np.repeat(first, sizes) + (np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes))]
+
+    source = np.concatenate([source, co_source])
+    target = np.concatenate([target, co_target])
+    distance = np.concatenate([distance, np.zeros(len(co_source))])
+
+    earfcn = cells['earfcnDl'].to_numpy()
+    keep = (target >= 0) & (source != target)
+    keep[keep] = earfcn[source[keep]] == earfcn[target[keep]]
+    source, target, distance = source[keep], target[keep], distance[keep]
+    # Symmetric (the k nearest relation is not), without duplicates
+    source, target = np.concatenate([source, target]), np.concatenate([target, source])
+    distance = np.concatenate([distance, distance])
+    order = np.argsort(distance, kind='stable')
+    source, target, distance = source[order], target[order], distance[order]
+    _, first = np.unique(source * len(cells) + target, return_index=True)
+    return pd.DataFrame({'source': source[first], 'target': target[first], 'distance_m': distance[first]})
+
+
+def _pairs(conflict, cells, source, target, distance, via=None):
+    return pd.DataFrame({
+        'conflict': conflict,
+        'EutranCellFDDId': cells['EutranCellFDDId'].to_numpy()[source],
+        'neighbour': cells['EutranCellFDDId'].to_numpy()[target],
+        'via': cells['EutranCellFDDId'].to_numpy()[via] if via is not None else "",
+        'earfcnDl': cells['earfcnDl'].to_numpy()[source],
+        'PCI': cells['PCI'].to_numpy()[source],
+        'rachRootSequence': cells['rachRootSequence'].to_numpy()[source],
+        'distance_m': np.round(distance, 1),
+    })
+
+
+def check_conflicts(cell_table, max_distance=NEIGHBOUR_DISTANCE, neighbours=NEIGHBOURS):
+    """
+    PCI collisions, PCI confusions and RACH root sequence overlaps between neighbour cells.
+    Returns the conflict DataFrame (CONFLICT_COLUMNS), one row per conflicting pair, or None
+    when the cell table lacks REQUIRED_COLUMNS.
+    """
+    if any(column not in cell_table.columns for column in REQUIRED_COLUMNS):
+        return None
+    cells = cell_identities(cell_table)
+    edges = neighbour_graph(cells, max_distance, neighbours)
+    source, target = edges['source'].to_numpy(), edges['target'].to_numpy()
+    distance = edges['distance_m'].to_numpy()
+    pci = cells['PCI'].to_numpy()
+    reports = []
+
+    # Collisions: each pair once
+    once = source < target
+    collision = once & (pci[source] == pci[target])
+    reports.append(_pairs("PCI collision", cells, source[collision], target[collision], distance[collision]))
+
+    # Confusions: two neighbours of the same cell with one PCI (and not neighbours of each other
+    # with that PCI, which is already a collision)
+    neighbour_pci = pd.DataFrame({'via': source, 'cell': target, 'pci': pci[target]})
+    neighbour_pci = neighbour_pci[neighbour_pci['pci'].notna()]
+    shared = neighbour_pci[neighbour_pci.duplicated(['via', 'pci'], keep=False)]
+    if len(shared):
+        confused = shared.merge(shared, on=['via', 'pci'], suffixes=('', '_other'))
+        confused = confused[confused['cell'] < confused['cell_other']]
+        linked = pd.MultiIndex.from_arrays([source, target])
+        confused = confused[~pd.MultiIndex.from_arrays([confused['cell'], confused['cell_other']]).isin(linked)]
+        confused = confused.drop_duplicates(['cell', 'cell_other'])
+        cell, other, via = (confused[column].to_numpy() for column in ('cell', 'cell_other', 'via'))
+        reports.append(_pairs("PCI confusion", cells, cell, other, np.full(len(cell), np.nan), via))
+
+    # RACH: root sequence ranges [root, root + n) overlap on the circular 0..837 index
+    root = cells['rachRootSequence'].to_numpy()
+    count = cells['rootSequences'].to_numpy()
+    with np.errstate(invalid='ignore'):
+        offset = (root[target] - root[source]) % ROOT_SEQUENCES
+        overlap = once & ((offset < count[source]) | (ROOT_SEQUENCES - offset < count[target]))
+    reports.append(_pairs("RACH overlap", cells, source[overlap], target[overlap], distance[overlap]))
+
+    report = pd.concat([report for report in reports if len(report)] or [pd.DataFrame(columns=CONFLICT_COLUMNS)],
+                       ignore_index=True)
+    return report[CONFLICT_COLUMNS]
+
+
+def enb_conflicts(conflicts, cell_table, enbname):
+    """
+    Conflicts involving at least one cell of the eNB
+    """
+    enb_cells = cell_table.loc[cell_table['eNBName'] == enbname, 'EutranCellFDDId'].astype(str)
+    return conflicts[conflicts['EutranCellFDDId'].isin(enb_cells) | conflicts['neighbour'].isin(enb_cells)]
@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
 
+from ciq_picker import ciq_picker
+from ciq_repository import read_sheet
+from metrics import time_generation, time_sheet_parse
+from polygon_engine import polygon_geometry_report, rnc_polygon_csv, rnc_polygon_table
+
 st.header('Polygon Converter')
 st.divider()
 
@@ -8,29 +13,11 @@ st.divider()
 if 'button_clicked' not in st.session_state:
     st.session_state['button_clicked'] = False
 
-uploaded_file = st.file_uploader("Choose a CIQ file", type="xlsx")
-if uploaded_file is not None:
+ciq = ciq_picker("polygon", "Choose a CIQ file", [["PolygonData"]])
+if ciq is not None:
     try:
-        df = pd.read_excel(uploaded_file, "PolygonData")
-
-        # Convert degrees, minutes, and seconds (string) into decimal (float)
-        def dms_to_decimal(dms):
-            try:
-                if isinstance(dms, float):
-                    return dms
-                # Split the string into degrees, minutes, and seconds
-                parts = dms.split('°')
-                degrees = float(parts[0])
-                minutes_seconds = parts[1].split("'")
-                minutes = float(minutes_seconds[0])
-                seconds = float(minutes_seconds[1].replace('"', ''))
-                
-                # Convert to decimal
-                decimal = degrees + (minutes / 60) + (seconds / 3600)
-                return decimal
-            except ValueError as e:
-                print(f"Error converting {dms}: {e}")
-                return None
+        with time_sheet_parse("PolygonData"):
+            df = read_sheet(ciq, "PolygonData")
 
         # Text input for filtering
         filter_text = st.text_input("Enter the CELLNAME to filter (comma-separated):", "")
@@ -49,44 +36,17 @@ if uploaded_file is not None:
             if filtered_df.empty:
                 st.error("CELL NAME NOT IN THIS CIQ")
             else:
-                # Column Selection
-                selected_columns = filtered_df[['Sector', 'Corner 1', 'Unnamed: 4', 'Corner 2', 'Unnamed: 6', 'Corner 3', 'Unnamed: 8', 'Corner 4', 'Unnamed: 10', 'Corner 5', 'Unnamed: 12', 'Corner 6', 'Unnamed: 14', 'Corner 7', 'Unnamed: 16', 'Corner 8', 'Unnamed: 18', 'Corner 9', 'Unnamed: 20', 'Corner 10', 'Unnamed: 22', 'Corner 11', 'Unnamed: 24', 'Corner 12', 'Unnamed: 26', 'Corner 13', 'Unnamed: 28', 'Corner 14', 'Unnamed: 30', 'Corner 15', 'Unnamed: 32']]
-
-                # Apply the conversion function only to DMS columns
-                dms_columns = [col for col in selected_columns.columns if col != 'Sector']
-                get_data = selected_columns.copy()
-                get_data[dms_columns] = selected_columns[dms_columns].applymap(dms_to_decimal)
-
-                # Fill NaN values with empty strings
-                get_data = get_data.fillna("")
-
-                # Define the transformation functions
-                def transform_latitude(value):
-                    if value != '':
-                        return f"0,{round(value * 8388608 / 90)}"
-                    return ''
-
-                def transform_longitude(value):
-                    if value != '':
-                        return f"-{round(value * 16777216 / 360)}"
-                    return ''
-                
-                # Apply the transformations
-                for col in dms_columns:
-                    if 'Corner' in col:
-                        get_data[col] = get_data[col].apply(transform_latitude)
-                    elif 'Unnamed' in col:
-                        get_data[col] = get_data[col].apply(transform_longitude)
-
-                # Rename columns for display
-                get_data.columns = ['Sector'] + [f'Latitude {i//2 + 1}' if i % 2 == 0 else f'Longitude {i//2 + 1}' for i in range(len(get_data.columns) - 1)]
-
-                # Convert the transformed DataFrame to CSV string without quotes and trailing comma
-                csv_lines = []
-                for index, row in get_data.iterrows():
-                    csv_lines.append(','.join([str(item) for item in row if item != '' and item != row['Sector']]))
-
-                csv_string = '\n'.join(csv_lines)
+                # Corner columns are decoded and encoded column-wise (RNC corner format)
+                with time_generation("rnc_polygon"):
+                    get_data = rnc_polygon_table(filtered_df, id_column='Sector')
+                    csv_string = rnc_polygon_csv(get_data, id_column='Sector')
+
+                # Duplicate vertices and winding order are fixed in the table; report what was changed
+                geometry_report = polygon_geometry_report(filtered_df, id_column='Sector', rnc=True)
+                geometry_report = geometry_report[geometry_report['issues'] != '']
+                if len(geometry_report):
+                    st.warning(f"{len(geometry_report)} polygon(s) with geometry issues")
+                    st.dataframe(geometry_report[['Sector', 'valid', 'issues']], hide_index=True)
 
                 st.subheader("Data from the Excel file:")
                 st.dataframe(get_data, hide_index=True)
@@ -0,0 +1,233 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from polygon_geometry import clean_polygons
+
+# Polygon engine shared by the polygon pages and the LTE generator.
+# Corner coordinates are parsed and encoded column-wise over the whole sheet (no per-row
+# Python loops). Two encodings are supported:
+# - LTE eutranCellPolygon: decimal degrees x 10^7, at most 8 digits
+# - RNC 3G corners: latitude "0,<|lat| x 2^23 / 90>", longitude "-<|lon| x 2^24 / 360>"
+# Between decoding and encoding the corners go through the geometry stage (polygon_geometry):
+# duplicate vertices removed, winding order made uniform, invalid polygons reported.
+
+MAX_CORNERS = 15
+# Optional vertex budget: larger polygons are simplified (Douglas-Peucker) to this many corners
+MAX_VERTICES = int(os.environ["G2L_POLYGON_MAX_VERTICES"]) if os.environ.get("G2L_POLYGON_MAX_VERTICES") else None
+# Degrees/minutes/seconds, e.g. 45°29'53.0"N or -73°33'1.0"W (anything after it is ignored)
+DMS_PATTERN = r"^(?P<degrees>-?\d+)°(?P<minutes>\d+)'(?P<seconds>[\d.]+)\"?(?P<direction>[NSEW])?"
+
+
+def detect_polygon_column_mapping(polygon_data):
+    """
+    (latitude, longitude) column pairs of a polygon sheet: 'Corner N' followed by its
+    unnamed longitude column
+    """
+    columns = list(polygon_data.columns)
+    mappings = []
+    for i in range(1, MAX_CORNERS + 1):
+        corner_col = f'Corner {i}'
+        if corner_col in columns:
+            corner_idx = columns.index(corner_col)
+            if corner_idx + 1 < len(columns) and str(columns[corner_idx + 1]).startswith('Unnamed:'):
+                mappings.append((corner_col, columns[corner_idx + 1]))
+    return mappings
+
+
+def _to_float(array):
+    """
+    Float64 numpy array of an Arrow string array (invalid numbers -> NaN)
+    """
+    try:
+        return pc.cast(array, pa.float64()).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid:
+        return pd.to_numeric(pd.Series(array.to_pylist(), dtype=object), errors='coerce').to_numpy(dtype=float)
+
+
+def dms_to_decimal(values):
+    """
+    Decimal degrees of a column of DMS strings (or numbers). Unparseable/empty -> NaN.
+    The sign comes from a negative degree value or an S/W direction.
+    """
+    values = pd.Series(values)
+    # Regex extraction runs in Arrow compute (RE2) instead of a Python loop per cell
+    text = pc.utf8_trim_whitespace(pa.array(values.astype("string[pyarrow]")))
+    parts = pc.extract_regex(text, DMS_PATTERN)
+    matched = parts.is_valid().to_numpy(zero_copy_only=False)
+    degrees = _to_float(pc.struct_field(parts, 'degrees'))
+    decimal = (np.abs(degrees) + _to_float(pc.struct_field(parts, 'minutes')) / 60 +
+               _to_float(pc.struct_field(parts, 'seconds')) / 3600)
+    direction = pc.struct_field(parts, 'direction')
+    negative = (degrees < 0) | pc.is_in(direction, pa.array(['S', 'W'])).to_numpy(zero_copy_only=False)
+    decimal = np.where(negative, -decimal, decimal)
+
+    # Not DMS: already decimal degrees
+    plain = ~matched & text.is_valid().to_numpy(zero_copy_only=False)
+    if plain.any():
+        decimal[plain] = _to_float(pc.filter(text, pa.array(plain)))
+    return np.where(matched | plain, decimal, np.nan)
+
+
+def lte_coordinates(decimal):
+    """
+    LTE encoding: round(degrees x 10^7), truncated to its first 8 digits, with the sign of
+    the input. Returns an object array of ints (None where the input is NaN).
+    """
+    decimal = np.asarray(decimal, dtype=float)
+    valid = ~np.isnan(decimal)
+    scaled = np.abs(np.round(np.where(valid, decimal, 0) * (10 ** 7))).astype(np.int64)
+    digits = np.where(scaled > 0, np.floor(np.log10(np.maximum(scaled, 1))).astype(np.int64) + 1, 1)
+    scaled = scaled // (10 ** np.maximum(digits - 8, 0))
+    encoded = np.where(decimal < 0, -scaled, scaled)
+    return np.where(valid, encoded.astype(object), None)
+
+
+def rnc_latitudes(decimal):
+    """
+    RNC 3G encoding of latitudes: "0,<round(|lat| x 8388608 / 90)>" ("" where missing)
+    """
+    decimal = np.abs(np.asarray(decimal, dtype=float))
+    valid = ~np.isnan(decimal)
+    encoded = np.round(np.where(valid, decimal, 0) * 8388608 / 90).astype(np.int64).astype(str)
+    return np.where(valid, np.char.add("0,", encoded), "")
+
+
+def rnc_longitudes(decimal):
+    """
+    RNC 3G encoding of (western) longitudes: "-<round(|lon| x 16777216 / 360)>" ("" where missing)
+    """
+    decimal = np.abs(np.asarray(decimal, dtype=float))
+    valid = ~np.isnan(decimal)
+    encoded = np.round(np.where(valid, decimal, 0) * 16777216 / 360).astype(np.int64).astype(str)
+    return np.where(valid, np.char.add("-", encoded), "")
+
+
+def decode_corners(polygon_data, column_mappings=None):
+    """
+    Decimal corner coordinates as two (rows x corners) arrays: latitudes, longitudes
+    """
+    if column_mappings is None:
+        column_mappings = detect_polygon_column_mapping(polygon_data)
+    column_mappings = [(lat_col, lon_col) for lat_col, lon_col in column_mappings
+                       if lat_col in polygon_data.columns and lon_col in polygon_data.columns]
+    rows = len(polygon_data)
+    if not column_mappings:
+        return np.full((rows, 0), np.nan), np.full((rows, 0), np.nan)
+    # All corner columns parsed in one pass: latitude columns first, then longitude columns
+    stacked = pd.concat([polygon_data[lat_col] for lat_col, _ in column_mappings] +
+                        [polygon_data[lon_col] for _, lon_col in column_mappings], ignore_index=True)
+    decimal = dms_to_decimal(stacked).reshape(2 * len(column_mappings), rows)
+    return decimal[:len(column_mappings)].T.copy(), decimal[len(column_mappings):].T.copy()
+
+
+def _join_parts(parts, valid, separator):
+    """
+    Per row, join the valid parts (rows x columns string arrays) with separator
+    """
+    joined = np.full(parts.shape[0], "", dtype=object)
+    for k in range(parts.shape[1]):
+        joined = np.where(valid[:, k], joined + parts[:, k].astype(object) + separator, joined)
+    return np.array([value[:-len(separator)] if value else value for value in joined], dtype=object)
+
+
+def signed_longitudes(longitudes):
+    """
+    North American CIQs give western longitudes without a sign: 60..180 becomes negative
+    """
+    longitudes = np.asarray(longitudes, dtype=float)
+    return np.where((longitudes > 0) & (longitudes >= 60) & (longitudes <= 180), -longitudes, longitudes)
+
+
+def _named_rows(polygon_data, cell_column):
+    return polygon_data[polygon_data[cell_column].notna() & (polygon_data[cell_column].astype(str) != '')]
+
+
+def lte_corners(polygon_data, column_mappings=None):
+    """
+    Decimal LTE corners (latitudes, longitudes) of a polygon sheet
+    """
+    latitudes, longitudes = decode_corners(polygon_data, column_mappings)
+    return latitudes, signed_longitudes(longitudes)
+
+
+def rnc_corners(polygon_data, column_mappings=None):
+    """
+    Decimal RNC corners (latitudes, longitudes): northern latitudes, western longitudes
+    """
+    latitudes, longitudes = decode_corners(polygon_data, column_mappings)
+    return np.abs(latitudes), -np.abs(longitudes)
+
+
+def polygon_geometry_report(polygon_data, column_mappings=None, id_column='EutranCellFDDId', max_vertices=MAX_VERTICES,
+                            rnc=False):
+    """
+    Geometry annotations (polygon_geometry.ANNOTATION_COLUMNS) per polygon, with its id column
+    """
+    if not rnc:
+        polygon_data = _named_rows(polygon_data, id_column)
+    latitudes, longitudes = (rnc_corners if rnc else lte_corners)(polygon_data, column_mappings)
+    _, _, annotations = clean_polygons(latitudes, longitudes, max_vertices=max_vertices)
+    annotations.insert(0, id_column, polygon_data[id_column].to_numpy())
+    annotations.index = polygon_data.index
+    return annotations
+
+
+def lte_polygon_commands(polygon_data, column_mappings=None, cell_column='EutranCellFDDId', check_geometry=True,
+                         max_vertices=MAX_VERTICES):
+    """
+    "set EUtranCellFDD=<cell> eutranCellPolygon cornerLatitude=..,cornerLongitude=..;..;"
+    per row with a cell name (rows without any valid corner, or with an invalid polygon when
+    check_geometry is set, get a comment line)
+    """
+    polygon_data = _named_rows(polygon_data, cell_column)
+    latitudes, longitudes = lte_corners(polygon_data, column_mappings)
+    invalid = np.zeros(len(polygon_data), dtype=bool)
+    if check_geometry:
+        latitudes, longitudes, annotations = clean_polygons(latitudes, longitudes, max_vertices=max_vertices)
+        # Polygons without any corner keep their "no valid corners" comment
+        invalid = ~annotations['valid'].to_numpy() & (annotations['corners_in'].to_numpy() > 0)
+    valid = ~np.isnan(latitudes) & ~np.isnan(longitudes)
+
+    shape = latitudes.shape
+    lat_text = lte_coordinates(latitudes.ravel()).astype(str).reshape(shape)
+    lon_text = lte_coordinates(longitudes.ravel()).astype(str).reshape(shape)
+    parts = np.char.add(np.char.add(np.char.add("cornerLatitude=", lat_text), ",cornerLongitude="), lon_text)
+    corners = _join_parts(parts, valid, ";") if shape[1] else np.full(shape[0], "", dtype=object)
+
+    cells = polygon_data[cell_column].astype(str).to_numpy(dtype=object)
+    commands = np.where(corners != "",
+                        "set EUtranCellFDD=" + cells + " eutranCellPolygon " + corners + ";",
+                        "# No valid corners found for " + cells)
+    if invalid.any():
+        issues = annotations['issues'].to_numpy(dtype=object)
+        commands = np.where(invalid, "# Invalid polygon for " + cells + ": " + issues, commands)
+    return list(commands)
+
+
+def rnc_polygon_table(polygon_data, column_mappings=None, id_column='Sector', check_geometry=True,
+                      max_vertices=MAX_VERTICES):
+    """
+    RNC corner table: id column, then 'Latitude N' / 'Longitude N' per corner ("" where missing).
+    With check_geometry the corners are cleaned first (see polygon_geometry.clean_polygons).
+    """
+    latitudes, longitudes = rnc_corners(polygon_data, column_mappings)
+    if check_geometry:
+        latitudes, longitudes, _ = clean_polygons(latitudes, longitudes, max_vertices=max_vertices)
+    table = {id_column: polygon_data[id_column].to_numpy()}
+    for k in range(latitudes.shape[1]):
+        table[f'Latitude {k + 1}'] = rnc_latitudes(latitudes[:, k])
+        table[f'Longitude {k + 1}'] = rnc_longitudes(longitudes[:, k])
+    return pd.DataFrame(table, index=polygon_data.index)
+
+
+def rnc_polygon_csv(table, id_column='Sector'):
+    """
+    One comma separated line of encoded corners per row of rnc_polygon_table
+    """
+    values = table.drop(columns=id_column).to_numpy(dtype=str)
+    lines = _join_parts(values, values != "", ",")
+    return "\n".join(lines)
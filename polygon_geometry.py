@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+
+# Geometry stage for cell polygons, run on the decoded corner arrays (rows x corners,
+# NaN where a corner is empty) before they are encoded.
+# All steps work on every cell at once: missing/duplicate vertices are dropped, polygons
+# with fewer than 3 distinct vertices or no area are flagged degenerate, self-intersecting
+# rings are detected with a pairwise edge test, the winding order is made uniform and
+# polygons can be simplified to a vertex budget (Douglas-Peucker, most important vertices kept).
+
+WINDING = 'ccw'  # the CIQ polygons are counter-clockwise (east = +x, north = +y)
+DUPLICATE_TOLERANCE = 1e-7  # degrees, ~1 cm
+MIN_AREA = 1e-12  # square degrees
+
+ANNOTATION_COLUMNS = ['corners_in', 'corners_out', 'duplicates_removed', 'degenerate', 'self_intersecting',
+                      'reversed', 'simplified', 'valid', 'issues']
+
+
+def _compact(latitudes, longitudes, keep):
+    """
+    Move the kept vertices of every row to the front (order preserved), NaN padding after them
+    """
+    order = np.argsort(~keep, axis=1, kind='stable')
+    latitudes = np.take_along_axis(np.where(keep, latitudes, np.nan), order, axis=1)
+    longitudes = np.take_along_axis(np.where(keep, longitudes, np.nan), order, axis=1)
+    return latitudes, longitudes, keep.sum(axis=1)
+
+
+def _planar(latitudes, longitudes):
+    """
+    Local planar coordinates (x = east, y = north) in degrees of latitude
+    """
+    present = ~np.isnan(latitudes)
+    mean = np.where(present, latitudes, 0).sum(axis=1, keepdims=True) / np.maximum(present.sum(axis=1, keepdims=True), 1)
+    return longitudes * np.cos(np.radians(mean)), latitudes
+
+
+def _next_index(counts, width):
+    """
+    Index of the next vertex of each ring (wrapping to 0 after the last valid one)
+    """
+    index = np.arange(width)[None, :] + 1
+    return np.where(index >= counts[:, None], 0, index)
+
+
+def signed_areas(latitudes, longitudes, counts):
+    """
+    Shoelace area per ring (positive = counter-clockwise)
+    """
+    x, y = _planar(latitudes, longitudes)
+    following = _next_index(counts, x.shape[1])
+    x_next = np.take_along_axis(x, following, axis=1)
+    y_next = np.take_along_axis(y, following, axis=1)
+    valid = np.arange(x.shape[1])[None, :] < counts[:, None]
+    return 0.5 * np.where(valid, x * y_next - x_next * y, 0).sum(axis=1)
+
+
+def fan_areas(latitudes, longitudes, counts):
+    """
+    Sum of the unsigned triangle areas (vertex 0, i, i + 1): zero only when all vertices are collinear
+    """
+    x, y = _planar(latitudes, longitudes)
+    x = x - x[:, :1]
+    y = y - y[:, :1]
+    following = _next_index(counts, x.shape[1])
+    x_next = np.take_along_axis(x, following, axis=1)
+    y_next = np.take_along_axis(y, following, axis=1)
+    valid = np.arange(x.shape[1])[None, :] < counts[:, None]
+    return 0.5 * np.where(valid, np.abs(x * y_next - x_next * y), 0).sum(axis=1)
+
+
+def _orientation(ax, ay, bx, by, cx, cy):
+    return np.sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+
+def self_intersecting(latitudes, longitudes, counts):
+    """
+    True for rings where two non-adjacent edges touch or cross
+    """
+    rows, width = latitudes.shape
+    if width < 4:
+        return np.zeros(rows, dtype=bool)
+    x, y = _planar(latitudes, longitudes)
+    following = _next_index(counts, width)
+    x2 = np.take_along_axis(x, following, axis=1)
+    y2 = np.take_along_axis(y, following, axis=1)
+
+    # Edge i = (vertex i, next vertex); compare every edge pair (i, j) with i < j
+    i, j = np.triu_indices(width, k=1)
+    edge_count = counts[:, None]
+    adjacent = (j == i + 1) | ((i == 0) & (j == edge_count - 1))
+    candidate = (j < edge_count) & ~adjacent & (edge_count >= 4)
+
+    ax, ay, bx, by = x[:, i], y[:, i], x2[:, i], y2[:, i]
+    cx, cy, dx, dy = x[:, j], y[:, j], x2[:, j], y2[:, j]
+    o1 = _orientation(ax, ay, bx, by, cx, cy)
+    o2 = _orientation(ax, ay, bx, by, dx, dy)
+    o3 = _orientation(cx, cy, dx, dy, ax, ay)
+    o4 = _orientation(cx, cy, dx, dy, bx, by)
+    crossing = (o1 != o2) & (o3 != o4)
+
+    # Collinear edges that overlap
+    def within(px, py, qx, qy, rx, ry):
+        return ((np.minimum(px, qx) <= rx) & (rx <= np.maximum(px, qx)) &
+                (np.minimum(py, qy) <= ry) & (ry <= np.maximum(py, qy)))
+    touching = (((o1 == 0) & within(ax, ay, bx, by, cx, cy)) | ((o2 == 0) & within(ax, ay, bx, by, dx, dy)) |
+                ((o3 == 0) & within(cx, cy, dx, dy, ax, ay)) | ((o4 == 0) & within(cx, cy, dx, dy, bx, by)))
+    with np.errstate(invalid='ignore'):
+        return (candidate & (crossing | touching)).any(axis=1)
+
+
+def simplify(latitudes, longitudes, counts, max_vertices):
+    """
+    Douglas-Peucker to a vertex budget: start from vertex 0 and the vertex farthest from it,
+    then keep adding the vertex farthest from the segment between its kept neighbours.
+    Returns the keep mask.
+    """
+    rows, width = latitudes.shape
+    index = np.arange(width)[None, :]
+    valid = index < counts[:, None]
+    keep = valid & (counts[:, None] <= max_vertices)  # small enough already
+    todo = counts > max_vertices
+    if not todo.any():
+        return keep
+
+    x, y = _planar(latitudes, longitudes)
+    x = np.nan_to_num(x)
+    y = np.nan_to_num(y)
+    row_index = np.arange(rows)
+    farthest = np.argmax(np.where(valid, np.hypot(x - x[:, :1], y - y[:, :1]), -1), axis=1)
+    keep[todo, 0] = True
+    keep[row_index[todo], farthest[todo]] = True
+
+    for _ in range(max_vertices - 2):
+        # Kept neighbours of every vertex (the ring wraps to vertex 0, which is always kept)
+        previous = np.maximum.accumulate(np.where(keep, index, 0), axis=1)
+        following = np.minimum.accumulate(np.where(keep, index, width)[:, ::-1], axis=1)[:, ::-1]
+        following = np.where(following >= counts[:, None], 0, following)
+        px = np.take_along_axis(x, previous, axis=1)
+        py = np.take_along_axis(y, previous, axis=1)
+        qx = np.take_along_axis(x, following, axis=1)
+        qy = np.take_along_axis(y, following, axis=1)
+        segment = np.hypot(qx - px, qy - py)
+        cross = np.abs((qx - px) * (y - py) - (qy - py) * (x - px))
+        distance = np.where(segment > 0, cross / np.where(segment > 0, segment, 1), np.hypot(x - px, y - py))
+        distance = np.where(valid & ~keep & todo[:, None], distance, -1)
+        best = np.argmax(distance, axis=1)
+        add = distance[row_index, best] >= 0
+        keep[row_index[add], best[add]] = True
+    return keep
+
+
+def _issue_text(annotations):
+    issues = []
+    for row in annotations.itertuples(index=False):
+        parts = []
+        if row.duplicates_removed:
+            parts.append(f"{row.duplicates_removed} duplicate vertex(es) removed")
+        if row.degenerate:
+            parts.append(f"degenerate ({row.corners_out} distinct vertices or no area)")
+        if row.self_intersecting:
+            parts.append("self-intersecting")
+        if row.reversed:
+            parts.append("winding order reversed")
+        if row.simplified:
+            parts.append(f"simplified to {row.corners_out} vertices")
+        issues.append("; ".join(parts))
+    return issues
+
+
+def clean_polygons(latitudes, longitudes, winding=WINDING, max_vertices=None, tolerance=DUPLICATE_TOLERANCE):
+    """
+    Validate and normalize polygons given as (rows x corners) latitude/longitude arrays.
+    Returns (latitudes, longitudes, annotations DataFrame with one row per polygon).
+    """
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    present = ~np.isnan(latitudes) & ~np.isnan(longitudes)
+    corners_in = present.sum(axis=1)
+    latitudes, longitudes, counts = _compact(latitudes, longitudes, present)
+
+    # Consecutive duplicates, and a last vertex repeating the first (explicitly closed ring)
+    with np.errstate(invalid='ignore'):
+        same_as_previous = np.zeros_like(present)
+        same_as_previous[:, 1:] = ((np.abs(np.diff(latitudes, axis=1)) <= tolerance) &
+                                   (np.abs(np.diff(longitudes, axis=1)) <= tolerance))
+        index = np.arange(latitudes.shape[1])[None, :]
+        last = index == (counts[:, None] - 1)
+        closes = last & (index > 0) & (np.abs(latitudes - latitudes[:, :1]) <= tolerance) & \
+            (np.abs(longitudes - longitudes[:, :1]) <= tolerance)
+    keep = (index < counts[:, None]) & ~same_as_previous & ~closes
+    latitudes, longitudes, counts = _compact(latitudes, longitudes, keep)
+    duplicates_removed = corners_in - counts
+
+    area = signed_areas(latitudes, longitudes, counts)
+    # Collinear rings are degenerate; a bow-tie (no net area either) is self-intersecting
+    degenerate = (counts < 3) | (fan_areas(latitudes, longitudes, counts) < MIN_AREA)
+    intersecting = self_intersecting(latitudes, longitudes, counts) & ~degenerate
+
+    # Uniform winding: reverse the vertex order (keeping vertex 0 first) where needed
+    reverse = ~degenerate & ~intersecting & ((area < 0) if winding == 'ccw' else (area > 0))
+    if reverse.any():
+        width = latitudes.shape[1]
+        index = np.arange(width)[None, :]
+        reversed_index = np.where((index > 0) & (index < counts[:, None]), counts[:, None] - index, index)
+        reversed_index = np.where(reverse[:, None], reversed_index, index)
+        latitudes = np.take_along_axis(latitudes, reversed_index, axis=1)
+        longitudes = np.take_along_axis(longitudes, reversed_index, axis=1)
+
+    simplified = np.zeros(len(counts), dtype=bool)
+    if max_vertices is not None:
+        simplified = counts > max_vertices
+        keep = simplify(latitudes, longitudes, counts, max(3, int(max_vertices)))
+        latitudes, longitudes, counts = _compact(latitudes, longitudes, keep)
+
+    annotations = pd.DataFrame({
+        'corners_in': corners_in,
+        'corners_out': counts,
+        'duplicates_removed': duplicates_removed,
+        'degenerate': degenerate,
+        'self_intersecting': intersecting,
+        'reversed': reverse,
+        'simplified': simplified,
+    })
+    annotations['valid'] = ~(annotations['degenerate'] | annotations['self_intersecting'])
+    annotations['issues'] = _issue_text(annotations)
+    return latitudes, longitudes, annotations[ANNOTATION_COLUMNS]
@@ -1,17 +1,21 @@
 import streamlit as st
 import pandas as pd
 from prepost_app import posthc_newbsc, prehc_legacybsc
+from ciq_picker import ciq_picker
+from ciq_repository import read_sheet
+from metrics import time_generation, time_sheet_parse
 
 
 st.title("Generate PreHC and PostHC")
 st.divider()
 
-st.markdown('Please Upload MD Template 2G.')
-uploaded_file = st.file_uploader("Upload Excel file", type=["xlsx"])
+st.markdown('Please Select or Upload MD Template 2G.')
+ciq = ciq_picker("prepost", required_sheets=[["target_cells"]])
 
-if uploaded_file is not None:
+if ciq is not None:
     try:
-        df = pd.read_excel(uploaded_file, header=None, sheet_name="target_cells", skiprows=1)
+        with time_sheet_parse("target_cells"):
+            df = read_sheet(ciq, "target_cells", header=None, skiprows=1)
         
         # Define the expected column names
         expected_columns = ['NODENAME','SITENAME','CELL','CELL_DUMMY','BSC_LEGACY','BSC_NEW','RSITE','LOC_CODE','CGI','BSIC','BCCHNO','RXOTG_LEGACY','RXSTG_NEW']
@@ -34,12 +38,14 @@ if uploaded_file is not None:
                 st.dataframe(df[expected_columns].head())
         
             st.markdown(":orange[PreHC Legacy BSC]")
-            final_output_pre = prehc_legacybsc(df)
+            with time_generation("prehc_legacybsc"):
+                final_output_pre = prehc_legacybsc(df)
             st.expander("Result PreHC").code(final_output_pre)
 
             st.divider()
             st.markdown(":green[PostHC New BSC]")
-            final_output_post = posthc_newbsc(df)
+            with time_generation("posthc_newbsc"):
+                final_output_post = posthc_newbsc(df)
             st.expander("Result PostHC").code(final_output_post)
     except Exception as e:
         st.error(f"Error reading the Excel file: {e}")
@@ -0,0 +1,199 @@
+import cProfile
+import fcntl
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+
+# Opt-in profiling of generator runs.
+# Enable with G2L_PROFILE=1 (whole service) or ?profile=1 in the page URL (single session).
+# The N slowest runs are kept in PROFILE_DIR; the pages also put the run's files into the
+# job's ZIP (attach_profile), next to the generated scripts.
+
+PROFILE_DIR = os.environ.get("G2L_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("G2L_PROFILE_KEEP", "10"))  # keep only the N slowest runs
+INDEX_FILE = "profiles.json"
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+# tracemalloc is process wide while Streamlit sessions are threads: overlapping runs share
+# one tracing session, stopped by the last run that finishes
+_tracing_lock = threading.Lock()
+_tracing_runs = 0
+_tracing_started = False
+_index_lock = threading.Lock()
+
+
+def profiling_enabled(query_params=None):
+    """
+    Check the G2L_PROFILE environment variable or the 'profile' query parameter
+    """
+    if os.environ.get("G2L_PROFILE", "").lower() in _TRUE_VALUES:
+        return True
+    if query_params is not None:
+        return str(query_params.get("profile", "")).lower() in _TRUE_VALUES
+    return False
+
+
+def _start_tracing():
+    global _tracing_runs, _tracing_started
+    with _tracing_lock:
+        if _tracing_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            _tracing_started = True
+        _tracing_runs += 1
+
+
+def _stop_tracing():
+    """
+    Snapshot of the traced allocations; tracing stops when no other run needs it
+    """
+    global _tracing_runs, _tracing_started
+    with _tracing_lock:
+        snapshot = tracemalloc.take_snapshot()
+        _tracing_runs -= 1
+        if _tracing_runs == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+    return snapshot
+
+
+def _load_index(output_dir):
+    index_path = os.path.join(output_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return []
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+@contextmanager
+def _locked_index(output_dir):
+    """
+    Read-modify-write access to the run index, locked across threads and worker processes
+    """
+    with _index_lock, open(os.path.join(output_dir, f"{INDEX_FILE}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            runs = _load_index(output_dir)
+            yield runs
+            tmp_path = os.path.join(output_dir, f"{INDEX_FILE}.tmp{os.getpid()}")
+            with open(tmp_path, "w") as f:
+                json.dump(runs, f, indent=2)
+            os.replace(tmp_path, os.path.join(output_dir, INDEX_FILE))
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _keep_slowest(runs, output_dir, keep):
+    """
+    Remove profile files of every run except the N slowest ones (runs is updated in place)
+    """
+    runs.sort(key=lambda run: run['duration'], reverse=True)
+    for run in runs[keep:]:
+        for path in run['files']:
+            try:
+                os.remove(os.path.join(output_dir, path))
+            except FileNotFoundError:
+                pass
+    del runs[keep:]
+
+
+@contextmanager
+def profile_run(job_name, enabled=True, output_dir=PROFILE_DIR, keep=PROFILE_KEEP):
+    """
+    Run a with-block under cProfile and tracemalloc and save the results.
+
+    Yields a dict that is filled after the block with 'run_id', 'duration', 'files'
+    (paths relative to output_dir) and the text 'summary'. When not enabled the block runs untouched.
+    """
+    result = {}
+    if not enabled:
+        yield result
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", job_name)
+    run_id = f"{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+
+    _start_tracing()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        duration = time.perf_counter() - start
+        snapshot = _stop_tracing()
+
+        prof_file = f"{run_id}.prof"
+        snapshot_file = f"{run_id}.tracemalloc"
+        summary_file = f"{run_id}.txt"
+        profiler.dump_stats(os.path.join(output_dir, prof_file))
+        snapshot.dump(os.path.join(output_dir, snapshot_file))
+
+        # Human readable summary to paste into tickets
+        summary = io.StringIO()
+        summary.write(f"Job: {job_name}\nDuration: {duration:.3f} s\n\n")
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(30)
+        summary.write("\nTop allocations (by line):\n")
+        for stat in snapshot.statistics("lineno")[:20]:
+            summary.write(f"{stat}\n")
+        with open(os.path.join(output_dir, summary_file), "w") as f:
+            f.write(summary.getvalue())
+
+        files = [prof_file, snapshot_file, summary_file]
+        with _locked_index(output_dir) as runs:
+            runs.append({
+                'run_id': run_id,
+                'job': job_name,
+                'duration': duration,
+                'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'files': files
+            })
+            _keep_slowest(runs, output_dir, keep)
+
+        result.update({'run_id': run_id, 'duration': duration, 'files': files, 'summary': summary.getvalue()})
+
+
+@contextmanager
+def profile_once(session_state, job_key, enabled=True, output_dir=PROFILE_DIR, keep=PROFILE_KEEP):
+    """
+    profile_run for a Streamlit page: a job (job_key, e.g. page + input) is profiled once per
+    session; reruns of the same job run unprofiled and get the first run's result again.
+    """
+    profiled = session_state.setdefault('profiled_runs', {})
+    with profile_run(job_key, enabled and job_key not in profiled, output_dir, keep) as result:
+        yield result
+    if result:
+        profiled[job_key] = dict(result)
+    elif enabled:
+        result.update(profiled.get(job_key, {}))
+
+
+def attach_profile(zip_data, result, output_dir=PROFILE_DIR):
+    """
+    The job's ZIP (bytes) with the files of its profiled run added under profile/
+    """
+    zip_buffer = io.BytesIO(zip_data)
+    with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED) as zip_file:
+        for path in result.get('files', []):
+            full_path = os.path.join(output_dir, path)
+            if os.path.exists(full_path):
+                zip_file.write(full_path, f"profile/{path}")
+            elif path.endswith(".txt") and 'summary' in result:
+                # Pruned (not among the slowest runs): the summary is still known
+                zip_file.writestr(f"profile/{path}", result['summary'])
+    return zip_buffer.getvalue()
+
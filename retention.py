@@ -0,0 +1,224 @@
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+
+from file_catalog import LOG_FOLDERS, format_mtime, format_size, query_files, remove_file, sync_folder
+
+# Retention and compaction policy for the FTP log folders.
+# Per folder: compress dumps older than N days in place (gzip, or zstd when the
+# 'zstandard' package is installed), delete dumps older than N days, and delete the
+# oldest dumps while the folder exceeds a file count or total size budget.
+# Scheduled runs only touch files when G2L_RETENTION_ENABLED=1; otherwise only
+# dry-run reports are produced. The file browser shows a folder's dry-run report and
+# applies it after confirmation.
+# By default dumps are only compressed; deleting (by age, count or size) has to be
+# configured per folder in G2L_RETENTION_RULES.
+
+DEFAULT_RULE = {
+    'compress_after_days': 7,
+    'max_age_days': None,
+    'max_count': None,
+    'max_total_gb': None,
+    'compression': 'gzip',  # 'gzip' or 'zstd'
+}
+RETENTION_RULES = {key: dict(DEFAULT_RULE) for key in LOG_FOLDERS}
+
+# Optional JSON file overriding rules per folder key, e.g. {"rbsdump": {"max_age_days": 30}}
+RULES_FILE = os.environ.get("G2L_RETENTION_RULES", "")
+RETENTION_ENABLED = os.environ.get("G2L_RETENTION_ENABLED", "").lower() in ("1", "true", "yes", "on")
+RETENTION_INTERVAL = float(os.environ.get("G2L_RETENTION_INTERVAL", str(6 * 3600)))  # seconds
+
+COMPRESSED_SUFFIXES = ('.gz', '.zst', '.zip', '.bz2', '.xz', '.7z', '.tgz')
+COMPRESSION_SUFFIX = {'gzip': '.gz', 'zstd': '.zst'}
+
+_lock = threading.Lock()
+_scheduler = None
+last_reports = {}  # folder key -> report of the last scheduled run
+
+
+def load_rules():
+    """
+    Retention rules per folder key (defaults merged with RULES_FILE)
+    """
+    rules = {key: dict(rule) for key, rule in RETENTION_RULES.items()}
+    if RULES_FILE and os.path.exists(RULES_FILE):
+        with open(RULES_FILE) as f:
+            for key, overrides in json.load(f).items():
+                rules.setdefault(key, dict(DEFAULT_RULE)).update(overrides)
+    return rules
+
+
+def folder_key(folder_path):
+    """
+    LOG_FOLDERS key of a folder path, None for a folder that is not a log folder
+    """
+    for key, path in LOG_FOLDERS.items():
+        if os.path.normpath(path) == os.path.normpath(folder_path):
+            return key
+    return None
+
+
+def folder_rule(folder_path):
+    """
+    Retention rule of a folder (DEFAULT_RULE for a folder that is not a log folder)
+    """
+    return load_rules().get(folder_key(folder_path), dict(DEFAULT_RULE))
+
+
+def _zstd_available():
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def plan_retention(folder_path, rule, now=None):
+    """
+    Dry run: list the actions the rule would take on a folder.
+    Each action is a dict with action ('compress'/'delete', or 'skip' for a file that cannot
+    be compressed because its compressed name is taken), name, size, mtime and reason.
+    """
+    now = now or time.time()
+    sync_folder(folder_path)
+    files, _ = query_files(folder_path, sort_by="date", descending=True)  # newest first
+    compression = rule.get('compression', 'gzip')
+    if compression == 'zstd' and not _zstd_available():
+        compression = 'gzip'
+    day = 86400
+
+    actions = []
+    kept = []
+    for file_data in files:
+        age_days = (now - file_data['mtime']) / day
+        max_age = rule.get('max_age_days')
+        if max_age is not None and age_days > max_age:
+            actions.append(dict(file_data, action='delete', reason=f"older than {max_age} days"))
+        else:
+            kept.append(file_data)
+
+    # Count / size budgets: drop the oldest remaining files first
+    max_count = rule.get('max_count')
+    max_total = rule.get('max_total_gb')
+    max_total_bytes = max_total * 1024 ** 3 if max_total is not None else None
+    total_size = sum(file_data['size'] for file_data in kept)
+    while kept and ((max_count is not None and len(kept) > max_count) or
+                    (max_total_bytes is not None and total_size > max_total_bytes)):
+        oldest = kept.pop()
+        total_size -= oldest['size']
+        reason = f"more than {max_count} files" if max_count is not None and len(kept) + 1 > max_count else f"folder above {max_total} GB"
+        actions.append(dict(oldest, action='delete', reason=reason))
+
+    compress_after = rule.get('compress_after_days')
+    if compress_after is not None:
+        for file_data in kept:
+            age_days = (now - file_data['mtime']) / day
+            if age_days > compress_after and not file_data['name'].lower().endswith(COMPRESSED_SUFFIXES):
+                target_name = file_data['name'] + COMPRESSION_SUFFIX[compression]
+                if os.path.exists(os.path.join(folder_path, target_name)):
+                    # Never overwrite an earlier compressed dump of the same name
+                    actions.append(dict(file_data, action='skip', reason=f"{target_name} already exists"))
+                    continue
+                actions.append(dict(file_data, action='compress', compression=compression,
+                                    reason=f"older than {compress_after} days"))
+    return actions
+
+
+def format_report(actions):
+    """
+    Report rows for display (st.dataframe) of a retention plan
+    """
+    return [{
+        'Action': action['action'],
+        'File Name': action['name'],
+        'Size': format_size(action['size']),
+        'Date Modified': format_mtime(action['mtime']),
+        'Reason': action['reason'],
+    } for action in actions]
+
+
+def compress_file(folder_path, name, compression='gzip'):
+    """
+    Compress a file in place (name -> name.gz / name.zst), keeping its modification time.
+    Raises FileExistsError (the file is left alone) when the compressed name is taken.
+    """
+    source_path = os.path.join(folder_path, name)
+    target_path = source_path + COMPRESSION_SUFFIX[compression]
+    tmp_path = target_path + ".tmp"
+    if os.path.exists(target_path):
+        raise FileExistsError(f"{os.path.basename(target_path)} already exists")
+    stat = os.stat(source_path)
+    try:
+        with open(source_path, "rb") as source:
+            if compression == 'zstd':
+                import zstandard
+                with open(tmp_path, "wb") as target:
+                    zstandard.ZstdCompressor(level=10).copy_stream(source, target)
+            else:
+                with gzip.open(tmp_path, "wb", compresslevel=6) as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.link(tmp_path, target_path)  # unlike os.replace, fails if the target appeared meanwhile
+        os.remove(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    remove_file(folder_path, name)
+    return target_path
+
+
+def apply_retention(folder_path, actions):
+    """
+    Execute a retention plan. Returns a list of error messages (empty if all went well).
+    """
+    errors = []
+    for action in actions:
+        try:
+            if action['action'] == 'delete':
+                remove_file(folder_path, action['name'])
+            elif action['action'] == 'compress':
+                compress_file(folder_path, action['name'], action.get('compression', 'gzip'))
+        except OSError as e:
+            errors.append(f"{action['action']} '{action['name']}' failed: {e}")
+    sync_folder(folder_path, force=True)
+    return errors
+
+
+def run_retention(dry_run=True):
+    """
+    Plan (and unless dry_run, apply) the retention rules on every log folder
+    """
+    reports = {}
+    for key, rule in load_rules().items():
+        folder_path = LOG_FOLDERS.get(key)
+        if folder_path is None or not os.path.isdir(folder_path):
+            continue
+        actions = plan_retention(folder_path, rule)
+        errors = [] if dry_run else apply_retention(folder_path, actions)
+        reports[key] = {'ran_at': time.time(), 'dry_run': dry_run, 'actions': actions, 'errors': errors}
+    return reports
+
+
+def _scheduler_loop(interval):
+    while True:
+        try:
+            last_reports.update(run_retention(dry_run=not RETENTION_ENABLED))
+        except Exception as e:
+            print(f"Retention run failed: {e}")
+        time.sleep(interval)
+
+
+def start_retention_scheduler(interval=RETENTION_INTERVAL):
+    """
+    Start the periodic retention task once per process (safe to call on every rerun)
+    """
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(target=_scheduler_loop, args=(interval,), name="retention", daemon=True)
+            _scheduler.start()
+    return _scheduler
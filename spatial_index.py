@@ -0,0 +1,310 @@
+import numpy as np
+import pandas as pd
+
+from polygon_engine import detect_polygon_column_mapping, lte_corners, signed_longitudes
+from polygon_geometry import clean_polygons
+
+# In-process spatial index over CIQ cell sites (numpy only, no GIS dependency).
+# Sites are bucketed in a regular latitude/longitude grid; bulk nearest-neighbour queries
+# are answered per grid bucket of queries, so the Python loop runs over occupied buckets and
+# never over individual cells. Longitudes do not wrap around ±180 (CIQs cover one region).
+
+EARTH_RADIUS = 6371008.8  # meters
+GRID_SIZE = 0.05  # degrees (~5.5 km of latitude), the coarsest default bucket
+MIN_GRID_SIZE = 0.001  # degrees
+SITES_PER_BUCKET = 8
+QUERIES_PER_BLOCK = 64
+MAX_BUCKETS = 4_000_000
+SITE_TOLERANCE = 100  # meters: sector polygons usually start at (or next to) the site
+METERS_PER_DEGREE = np.pi * EARTH_RADIUS / 180
+
+# GSM cell coordinates (not part of the LTE CIQ sheets): one row per GSM cell,
+# optionally with its BSC and antenna azimuth (degrees)
+GSM_SHEET = 'GSM Cells'
+GSM_COLUMNS = ['CELL_GSM', 'latitude', 'longitude']
+GSM_OPTIONAL_COLUMNS = ['BSC', 'azimuth']
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in meters (numpy broadcasting)
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+class SiteIndex:
+    """
+    Grid index over site coordinates. Sites without coordinates are left out of the index.
+    Buckets are stored row-major, so the sites of a rectangle of buckets are one contiguous
+    slice of the sorted sites per grid row.
+    """
+
+    def __init__(self, latitudes, longitudes, grid_size=None):
+        self.latitudes = np.asarray(latitudes, dtype=float)
+        self.longitudes = np.asarray(longitudes, dtype=float)
+        located = np.flatnonzero(~np.isnan(self.latitudes) & ~np.isnan(self.longitudes))
+        self.origin = (self.latitudes[located].min(), self.longitudes[located].min()) if len(located) else (0.0, 0.0)
+        extent = ((self.latitudes[located].max() - self.origin[0], self.longitudes[located].max() - self.origin[1])
+                  if len(located) else (0.0, 0.0))
+        if grid_size is None:
+            # About SITES_PER_BUCKET sites per bucket if they were spread evenly
+            area = (extent[0] + GRID_SIZE) * (extent[1] + GRID_SIZE)
+            grid_size = min(GRID_SIZE, np.sqrt(area * SITES_PER_BUCKET / max(len(located), 1)))
+        # Coarser buckets when the sites span a very large area (bounded bucket table)
+        grid_size = max(grid_size, MIN_GRID_SIZE, np.sqrt((extent[0] + grid_size) * (extent[1] + grid_size) / MAX_BUCKETS))
+        self.grid_size = grid_size
+        rows, cols = self._bucket(self.latitudes[located], self.longitudes[located])
+        self.shape = (int(rows.max()) + 1, int(cols.max()) + 1) if len(located) else (1, 1)
+
+        keys = rows * self.shape[1] + cols
+        order = np.argsort(keys, kind='stable')
+        self.sites = located[order]
+        # offsets[key]..offsets[key + 1] are the sorted positions of the sites in bucket key
+        self.offsets = np.searchsorted(keys[order], np.arange(self.shape[0] * self.shape[1] + 1))
+        self.occupancy = len(located) / max(np.count_nonzero(np.diff(self.offsets)), 1)
+        # Trigonometry of the sites, computed once for all distance blocks
+        self.lat_radians = np.radians(self.latitudes)
+        self.lon_radians = np.radians(self.longitudes)
+        self.lat_cosines = np.cos(self.lat_radians)
+
+    def __len__(self):
+        return len(self.sites)
+
+    def _bucket(self, latitudes, longitudes):
+        return (np.floor((latitudes - self.origin[0]) / self.grid_size).astype(np.int64),
+                np.floor((longitudes - self.origin[1]) / self.grid_size).astype(np.int64))
+
+    def _slices(self, row_low, row_high, col_low, col_high):
+        """
+        (starts, ends) in the sorted sites of the bucket rectangle, one slice per grid row
+        """
+        row_low, row_high = max(row_low, 0), min(row_high, self.shape[0] - 1)
+        col_low, col_high = max(col_low, 0), min(col_high, self.shape[1] - 1)
+        if row_low > row_high or col_low > col_high:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        row_keys = np.arange(row_low, row_high + 1) * self.shape[1]
+        return self.offsets[row_keys + col_low], self.offsets[row_keys + col_high + 1]
+
+    def _count(self, row_low, row_high, col_low, col_high):
+        starts, ends = self._slices(row_low, row_high, col_low, col_high)
+        return int((ends - starts).sum())
+
+    def _sites_in(self, row_low, row_high, col_low, col_high):
+        """
+        Site numbers in the buckets of rows row_low..row_high, cols col_low..col_high
+        """
+        starts, ends = self._slices(row_low, row_high, col_low, col_high)
+        lengths = ends - starts
+        positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.sites[positions]
+
+    def _distances(self, latitudes, longitudes, candidates):
+        """
+        Haversine distances (queries x candidates) using the precomputed site trigonometry
+        """
+        lat = np.radians(latitudes)[:, None]
+        lon = np.radians(longitudes)[:, None]
+        a = (np.sin((self.lat_radians[candidates] - lat) / 2) ** 2 +
+             np.cos(lat) * self.lat_cosines[candidates] * np.sin((self.lon_radians[candidates] - lon) / 2) ** 2)
+        return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+    def _cells_for(self, distance, latitude):
+        """
+        Buckets (latitude, longitude) needed to cover distance meters around a latitude
+        """
+        lat_cells = int(np.ceil(distance / METERS_PER_DEGREE / self.grid_size))
+        widest = np.radians(min(89.0, abs(latitude) + (lat_cells + 1) * self.grid_size))
+        return lat_cells, int(np.ceil(distance / (METERS_PER_DEGREE * np.cos(widest)) / self.grid_size))
+
+    def nearest(self, latitudes, longitudes, k=1, max_distance=None, block=None):
+        """
+        k nearest sites of every query point.
+        Returns (site numbers, distances in meters), both (queries x k); missing -> -1 / inf.
+        Queries are handled together per block x block grid buckets (by default sized to
+        hold about QUERIES_PER_BLOCK sites).
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        neighbours = np.full((len(latitudes), k), -1, dtype=np.int64)
+        distances = np.full((len(latitudes), k), np.inf)
+        located = np.flatnonzero(~np.isnan(latitudes) & ~np.isnan(longitudes))
+        if not len(located) or not len(self) or k < 1:
+            return neighbours, distances
+        if block is None:
+            block = max(1, int(round(np.sqrt(QUERIES_PER_BLOCK / self.occupancy))))
+
+        rows, cols = self._bucket(latitudes[located], longitudes[located])
+        rows, cols = rows // block * block, cols // block * block
+        query_keys = (rows - rows.min()) * (cols.max() - cols.min() + 1) + (cols - cols.min())
+        order = np.argsort(query_keys, kind='stable')
+        _, group_starts = np.unique(query_keys[order], return_index=True)
+        for group in np.split(order, group_starts[1:]):
+            queries = located[group]
+            query_lat, query_lon = latitudes[queries], longitudes[queries]
+            row_low, col_low = rows[group[0]], cols[group[0]]
+            row_high, col_high = row_low + block - 1, col_low + block - 1
+            # Grow the search area until it holds k sites (or covers the whole grid / max_distance)
+            whole_grid = max(row_low, self.shape[0] - 1 - row_high, col_low, self.shape[1] - 1 - col_high, 0)
+            if max_distance is not None:
+                whole_grid = min(whole_grid, max(self._cells_for(max_distance, np.abs(query_lat).max())))
+            radius = 0
+            while self._count(row_low - radius, row_high + radius, col_low - radius, col_high + radius) < k \
+                    and radius < whole_grid:
+                radius += 1
+            candidates = self._sites_in(row_low - radius, row_high + radius, col_low - radius, col_high + radius)
+            if not len(candidates):
+                continue
+            distance = self._distances(query_lat, query_lon, candidates)
+            # Sites outside the area may still be closer than the k-th candidate: widen it to
+            # cover the k-th distance (a degree of longitude shrinks with latitude)
+            kth = min(k, len(candidates)) - 1
+            reach = np.partition(distance, kth, axis=1)[:, kth].max()
+            if max_distance is not None:
+                reach = min(reach, max_distance)
+            lat_cells, lon_cells = self._cells_for(reach, np.abs(query_lat).max())
+            if lat_cells > radius or lon_cells > radius:
+                lat_cells, lon_cells = max(lat_cells, radius), max(lon_cells, radius)
+                candidates = self._sites_in(row_low - lat_cells, row_high + lat_cells,
+                                            col_low - lon_cells, col_high + lon_cells)
+                distance = self._distances(query_lat, query_lon, candidates)
+
+            take = min(k, len(candidates))
+            if take < len(candidates):
+                closest = np.argpartition(distance, take - 1, axis=1)[:, :take]
+                closest = np.take_along_axis(closest, np.argsort(np.take_along_axis(distance, closest, axis=1),
+                                                                 axis=1, kind='stable'), axis=1)
+            else:
+                closest = np.argsort(distance, axis=1, kind='stable')
+            neighbours[queries, :take] = candidates[closest]
+            distances[queries, :take] = np.take_along_axis(distance, closest, axis=1)
+        if max_distance is not None:
+            too_far = distances > max_distance
+            neighbours[too_far] = -1
+            distances[too_far] = np.inf
+        return neighbours, distances
+
+
+def points_in_polygons(latitudes, longitudes, polygon_latitudes, polygon_longitudes):
+    """
+    Ray casting, row by row: is point i inside polygon i? Polygons are (rows x corners) arrays.
+    Points or polygons without coordinates give False.
+    """
+    polygon_latitudes, polygon_longitudes, _ = clean_polygons(polygon_latitudes, polygon_longitudes)
+    x = np.asarray(longitudes, dtype=float)[:, None]
+    y = np.asarray(latitudes, dtype=float)[:, None]
+    counts = (~np.isnan(polygon_latitudes)).sum(axis=1)
+    following = np.arange(polygon_latitudes.shape[1])[None, :] + 1
+    following = np.where(following >= counts[:, None], 0, following)
+    x1, y1 = polygon_longitudes, polygon_latitudes
+    x2 = np.take_along_axis(polygon_longitudes, following, axis=1)
+    y2 = np.take_along_axis(polygon_latitudes, following, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        straddles = (y1 > y) != (y2 > y)
+        crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        crossings = straddles & (x < crossing_x) & ~np.isnan(x1) & ~np.isnan(x2)
+    return (crossings.sum(axis=1) % 2 == 1) & (counts >= 3)
+
+
+def distances_to_polygons(latitudes, longitudes, polygon_latitudes, polygon_longitudes):
+    """
+    Row by row distance in meters from point i to the edges of polygon i (local flat
+    approximation, fine at cell scale). Rows without corners give inf.
+    """
+    polygon_latitudes, polygon_longitudes, _ = clean_polygons(polygon_latitudes, polygon_longitudes)
+    latitudes = np.asarray(latitudes, dtype=float)[:, None]
+    longitudes = np.asarray(longitudes, dtype=float)[:, None]
+    x = (polygon_longitudes - longitudes) * np.cos(np.radians(latitudes)) * METERS_PER_DEGREE
+    y = (polygon_latitudes - latitudes) * METERS_PER_DEGREE
+    counts = (~np.isnan(polygon_latitudes)).sum(axis=1)
+    following = np.arange(x.shape[1])[None, :] + 1
+    following = np.where(following >= counts[:, None], 0, following)
+    x2 = np.take_along_axis(x, following, axis=1)
+    y2 = np.take_along_axis(y, following, axis=1)
+    # Closest point of each edge to the origin (the point itself)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        length = (x2 - x) ** 2 + (y2 - y) ** 2
+        t = np.clip(np.where(length > 0, -(x * (x2 - x) + y * (y2 - y)) / length, 0), 0, 1)
+        distance = np.hypot(x + t * (x2 - x), y + t * (y2 - y))
+    return np.where(np.isnan(distance), np.inf, distance).min(axis=1, initial=np.inf)
+
+
+def lte_sites(excel_data):
+    """
+    LTE cells with their site coordinates (signed longitudes) from 'eUtran Parameters'
+    """
+    params = excel_data['eUtran Parameters']
+    sites = pd.DataFrame({
+        'EutranCellFDDId': params['EutranCellFDDId'].astype("string").str.strip(),
+        'eNBName': params['eNBName'].astype("string"),
+        'latitude': pd.to_numeric(params['latitude'].astype(object), errors='coerce').astype(float),
+        'longitude': signed_longitudes(pd.to_numeric(params['longitude'].astype(object), errors='coerce').astype(float)),
+    }, index=params.index)
+    if 'earfcnDl' in params.columns:
+        sites['earfcnDl'] = params['earfcnDl']
+    return sites
+
+
+def gsm_sites(excel_data):
+    """
+    GSM cells with their coordinates (and BSC/azimuth when given) from the 'GSM Cells' sheet
+    (None when the CIQ has none)
+    """
+    cells = excel_data.get(GSM_SHEET)
+    if cells is None or any(column not in cells.columns for column in GSM_COLUMNS):
+        return None
+    sites = cells[GSM_COLUMNS + [column for column in GSM_OPTIONAL_COLUMNS if column in cells.columns]].copy()
+    sites['CELL_GSM'] = sites['CELL_GSM'].astype("string").str.strip()
+    if 'azimuth' in sites.columns:
+        sites['azimuth'] = pd.to_numeric(sites['azimuth'].astype(object), errors='coerce').astype(float)
+    sites['latitude'] = pd.to_numeric(sites['latitude'].astype(object), errors='coerce').astype(float)
+    sites['longitude'] = signed_longitudes(pd.to_numeric(sites['longitude'].astype(object), errors='coerce').astype(float))
+    return sites
+
+
+def sites_outside_polygons(excel_data, tolerance=SITE_TOLERANCE):
+    """
+    LTE cells whose site is not inside their own eUtranCellPolygon polygon and more than
+    tolerance meters away from it (cells without a polygon or without coordinates are left
+    out). Returns the lte_sites rows plus the distance in meters from the site to the polygon.
+    """
+    if 'eUtranCellPolygon' not in excel_data or 'eUtran Parameters' not in excel_data:
+        return None
+    sites = lte_sites(excel_data)
+    polygon_data = excel_data['eUtranCellPolygon']
+    polygon_data = polygon_data[polygon_data['EutranCellFDDId'].notna()]
+    polygon_cells = polygon_data['EutranCellFDDId'].astype("string").str.strip()
+    polygon_data = polygon_data[~polygon_cells.duplicated().to_numpy()]
+    polygon_cells = polygon_cells[polygon_data.index]
+
+    # Row of each site's polygon (-1 when the cell has no polygon)
+    polygon_row = pd.Index(polygon_cells).get_indexer(sites['EutranCellFDDId'])
+    checked = (polygon_row >= 0) & sites['latitude'].notna().to_numpy() & sites['longitude'].notna().to_numpy()
+    sites = sites[checked]
+    latitudes, longitudes = lte_corners(polygon_data, detect_polygon_column_mapping(polygon_data))
+    latitudes, longitudes = latitudes[polygon_row[checked]], longitudes[polygon_row[checked]]
+    inside = points_in_polygons(sites['latitude'].to_numpy(), sites['longitude'].to_numpy(), latitudes, longitudes)
+
+    distance = distances_to_polygons(sites['latitude'].to_numpy(), sites['longitude'].to_numpy(), latitudes, longitudes)
+    outside = ~inside & (distance > tolerance)
+    sites = sites[outside].copy()
+    sites['distance_m'] = distance[outside]
+    return sites
+
+
+def nearest_lte_cells(gsm, lte, k=3, max_distance=None):
+    """
+    The k nearest LTE cells of every GSM cell (both DataFrames with latitude/longitude, as
+    from gsm_sites and lte_sites). One row per (GSM cell, LTE cell) pair with its rank and distance.
+    """
+    index = SiteIndex(lte['latitude'].to_numpy(), lte['longitude'].to_numpy())
+    neighbours, distances = index.nearest(gsm['latitude'].to_numpy(), gsm['longitude'].to_numpy(), k, max_distance)
+    found = neighbours >= 0
+    gsm_row, rank = np.nonzero(found)
+    pairs = lte.iloc[neighbours[found]].reset_index(drop=True)
+    pairs.insert(0, 'CELL_GSM', gsm['CELL_GSM'].to_numpy()[gsm_row])
+    pairs.insert(1, 'rank', rank + 1)
+    pairs = pairs.drop(columns=['latitude', 'longitude'])
+    pairs['distance_m'] = distances[found]
+    return pairs
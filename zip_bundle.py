@@ -0,0 +1,61 @@
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+# ZIP writer for the generated script bundles that can splice in pre-compressed entries.
+# Static templates (03_MO_Function.xml, 08_FeatureActivation.xml) are the bulk of every
+# bundle and never change between eNBs: they are deflated once per version (mo_templates)
+# and their raw DEFLATE stream is copied into each ZIP as-is, so a bundle only spends CPU on the
+# per-eNB files. Plain (no ZIP64) archives, as zipfile writes for files this size.
+
+STATIC_LEVEL = 9  # compressed once, so the best ratio is affordable
+DYNAMIC_LEVEL = 6  # zlib default, what zipfile.ZIP_DEFLATED uses
+ZIP_VERSION = 20  # 2.0: deflate
+DEFLATED = 8
+EXTERNAL_ATTR = 0o600 << 16  # -rw------- as zipfile.writestr sets it
+ZIP_LIMIT = 0xFFFFFFFF
+
+DeflatedEntry = namedtuple('DeflatedEntry', ['data', 'crc', 'size'])
+
+
+def deflate(payload, level=DYNAMIC_LEVEL):
+    """
+    Raw DEFLATE stream (no zlib header, as ZIP stores it) of a str or bytes payload
+    """
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return DeflatedEntry(compressor.compress(payload) + compressor.flush(), zlib.crc32(payload), len(payload))
+
+
+def _dos_date_time(timestamp):
+    year, month, day, hour, minute, second = time.localtime(timestamp)[:6]
+    year = max(year, 1980)
+    return (year - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+
+def zip_entries(entries, timestamp=None):
+    """
+    ZIP archive bytes of (name, payload) pairs, in order. A payload is a str/bytes (deflated
+    here) or a DeflatedEntry (copied as-is).
+    """
+    date, clock = _dos_date_time(time.time() if timestamp is None else timestamp)
+    parts = []
+    central = []
+    offset = 0
+    for name, payload in entries:
+        entry = payload if isinstance(payload, DeflatedEntry) else deflate(payload)
+        if max(offset, len(entry.data), entry.size) > ZIP_LIMIT:
+            raise ValueError(f"{name}: bundle too large for a plain ZIP")
+        encoded_name = name.encode('utf-8')
+        flags = 0 if encoded_name.isascii() else 0x800  # UTF-8 name
+        fields = (ZIP_VERSION, flags, DEFLATED, clock, date, entry.crc, len(entry.data), entry.size, len(encoded_name))
+        header = struct.pack('<IHHHHHIIIHH', 0x04034B50, *fields, 0)
+        central.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014B50, ZIP_VERSION, *fields, 0, 0, 0, 0,
+                                   EXTERNAL_ATTR, offset) + encoded_name)
+        parts += [header, encoded_name, entry.data]
+        offset += len(header) + len(encoded_name) + len(entry.data)
+    directory = b''.join(central)
+    end = struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, len(central), len(central), len(directory), offset, 0)
+    return b''.join(parts) + directory + end